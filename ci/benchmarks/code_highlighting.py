@@ -0,0 +1,77 @@
+''' Benchmark converting notes with many code blocks from markdown to html, with and without the highlight cache (HighlightCache).
+
+    Pygments used to highlight every code block on every build. The html of a code block is now kept by the hash of its language,
+    code and codehilite options, in memory and in the appdir, so that repeated code blocks are highlighted once per build, and
+    unchanged code blocks are not highlighted again on the next build.
+    This converts a vault of notes in which most code blocks are repeated (also without a language, which makes Pygments guess it),
+    without the cache, with an empty cache (the first build), and with a new cache that reads the files of the first one (the next
+    build), and checks that all three return the same html.
+
+    Run from the root of this repo:
+        python ci/benchmarks/code_highlighting.py [number_of_notes]
+'''
+
+import sys
+import random
+import tempfile
+
+from lib import time_it, run_from_command_line, markdown_settings
+
+from obsidianhtml import md2html
+
+snippets = [
+    ("python", "def fib(n):\n    a, b = 0, 1\n    for _ in range(n):\n        a, b = b, a + b\n    return a\n"),
+    ("javascript", "const total = items\n  .filter((x) => x.active)\n  .reduce((sum, x) => sum + x.price, 0);\n"),
+    ("bash", 'for f in *.md; do\n  echo "$f" | sed "s/.md$//"\ndone\n'),
+    ("yaml", "toggles:\n  compile_html: true\n  features:\n    graph:\n      enabled: false\n"),
+    ("sql", "SELECT name, count(*) AS n\nFROM notes JOIN tags USING (note_id)\nGROUP BY name\nORDER BY n DESC;\n"),
+    ("", "#!/usr/bin/env python\nimport sys\nprint(sys.argv[1:])\n"),
+]
+
+
+def create_note(i, rnd):
+    parts = [f"# Note {i}", ""]
+    for j in range(8):
+        lang, code = rnd.choice(snippets)
+        if rnd.random() < 0.2:
+            # a code block that is only used once
+            code = code + f"# {i} {j}\n"
+        parts += ["Some text.", "", f"```{lang}", code.rstrip("\n"), "```", ""]
+    parts += ["An indented code block:", "", f"    print({i % 10})", ""]
+    return "\n".join(parts)
+
+
+def convert(notes, folder):
+    md2html.highlight_cache = None
+    md2html.markdown_renderers.clear()
+    renderer = md2html.get_markdown_renderer({**markdown_settings, "highlight_cache_folder": folder, "highlight_cache_size": 64 * 1024 * 1024})
+    return [renderer.convert(note, "") for note in notes]
+
+
+def run_benchmark(number_of_notes=500):
+    rnd = random.Random(0)
+    notes = [create_note(i, rnd) for i in range(number_of_notes)]
+
+    with tempfile.TemporaryDirectory() as folder:
+        uncached_time, uncached_output = time_it(convert, notes, None)
+        first_time, first_output = time_it(convert, notes, folder)
+        first_stats = md2html.highlight_cache.stats
+        next_time, next_output = time_it(convert, notes, folder)
+        next_stats = md2html.highlight_cache.stats
+
+    if uncached_output != first_output or uncached_output != next_output:
+        print("ERROR: the highlight cache returns other html than Pygments")
+        sys.exit(1)
+
+    def hits(stats):
+        return f"{stats['memory_hits']} memory hits, {stats['disk_hits']} disk hits, {stats['misses']} misses"
+
+    print(f"notes: {number_of_notes}")
+    print(f"  no cache:                {uncached_time:8.3f}s")
+    print(f"  empty cache:             {first_time:8.3f}s  ({hits(first_stats)})")
+    print(f"  cache of earlier build:  {next_time:8.3f}s  ({hits(next_stats)})")
+    print(f"  speedup: {uncached_time / first_time:.1f}x (first build), {uncached_time / next_time:.1f}x (next build)")
+
+
+if __name__ == "__main__":
+    run_from_command_line(run_benchmark)
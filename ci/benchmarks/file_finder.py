@@ -0,0 +1,84 @@
+''' Benchmark FileFinder link resolution on a synthetic vault.
+
+    Compares the SuffixIndex lookup used by FileFinder._GetMatches with the linear scan over every file key
+    that it replaced, and checks that both return the same matches.
+
+    Run from the root of this repo:
+        python ci/benchmarks/file_finder.py [number_of_files] [number_of_links]
+'''
+
+import sys
+import random
+
+from lib import time_it, run_from_command_line
+
+from obsidianhtml.core.FileFinder import SuffixIndex
+
+
+def create_synthetic_file_keys(number_of_files, seed=0):
+    rnd = random.Random(seed)
+    folders = [f"folder{i}" for i in range(40)]
+    files = {}
+    while len(files) < number_of_files:
+        depth = rnd.randint(0, 4)
+        parts = [rnd.choice(folders) for _ in range(depth)]
+        # keep the amount of distinct note names low, so that many notes share a name, like in real vaults
+        parts.append(f"note{rnd.randint(0, number_of_files // 5)}.md")
+        files["/".join(parts)] = None
+    return files
+
+
+def linear_scan_matches(files, link):
+    """The lookup as it was done before the SuffixIndex: compare the tail of every file key"""
+    url_parts = link.split("/")
+    matches = []
+    for rel_path in files.keys():
+        parts = rel_path.split("/")
+        if len(url_parts) > len(parts):
+            continue
+        if parts[-len(url_parts):] == url_parts:
+            matches.append(rel_path)
+    return matches
+
+
+def get_indexed_matches(index, links):
+    return [index.get_matches(link) for link in links]
+
+
+def get_linear_scan_matches(files, links):
+    return [linear_scan_matches(files, link) for link in links]
+
+
+def create_links(files, number_of_links, seed=1):
+    rnd = random.Random(seed)
+    keys = list(files.keys())
+    links = []
+    for _ in range(number_of_links):
+        parts = rnd.choice(keys).split("/")
+        links.append("/".join(parts[-rnd.randint(1, len(parts)):]))
+    # add some links that don't exist
+    links += [f"missing/note{i}.md" for i in range(number_of_links // 10)]
+    return links
+
+
+def run_benchmark(number_of_files=50000, number_of_links=500):
+    files = create_synthetic_file_keys(number_of_files)
+    links = create_links(files, number_of_links)
+
+    build_time, index = time_it(SuffixIndex, files)
+    indexed_time, indexed_results = time_it(get_indexed_matches, index, links)
+    linear_time, linear_results = time_it(get_linear_scan_matches, files, links)
+
+    if indexed_results != linear_results:
+        print("ERROR: SuffixIndex results differ from the linear scan results")
+        sys.exit(1)
+
+    print(f"files: {len(files)}, links resolved: {len(links)}")
+    print(f"  linear scan:          {linear_time:8.3f}s  ({linear_time / len(links) * 1000:.3f}ms per link)")
+    print(f"  suffix index build:   {build_time:8.3f}s  (once per index load)")
+    print(f"  suffix index lookups: {indexed_time:8.3f}s  ({indexed_time / len(links) * 1000:.5f}ms per link)")
+    print(f"  speedup (build + lookups vs linear scan): {linear_time / (build_time + indexed_time):.1f}x")
+
+
+if __name__ == "__main__":
+    run_from_command_line(run_benchmark)
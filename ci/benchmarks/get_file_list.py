@@ -0,0 +1,96 @@
+''' Benchmark finding the files in the vault (GetFileListModule).
+
+    The vault used to be searched with one rglob per include_glob and exclude_glob line, after which the excluded files were
+    removed from the included files with a list lookup per file, and folders were removed with an is_dir() call per file.
+    This compares that with the single os.scandir walk that GetFileListModule now does, which skips excluded folders such as .git,
+    and checks that both select the same files for a number of glob lists.
+
+    Run from the root of this repo:
+        python ci/benchmarks/get_file_list.py [number_of_notes] [number_of_git_objects]
+'''
+
+import sys
+import tempfile
+from pathlib import Path
+
+from lib import time_it, run_from_command_line, create_vault
+
+from obsidianhtml.modules.builtin.get_file_list import GetFileListModule, GlobMatcher
+
+default_exclude_glob = [".obsidian/**/*", ".trash/**/*", ".DS_Store/**/*", ".git/**/*"]
+
+glob_lists = [
+    (["*"], default_exclude_glob),
+    (["*"], []),
+    (["/Home.md", "Blog/**/*"], default_exclude_glob),
+    (["subfolder/*", "*.md"], ["**/*.png", "/Home.md"]),
+    (["Blog/**"], ["folder 1/*"]),
+    (["*"], ["folder 2", ".*"]),
+]
+
+
+def glob_find(folder, glob_list):
+    """GetFileListModule.glob_find() as it was before the single walk"""
+    folder = Path(folder)
+    found_files = []
+    for glob_line in glob_list:
+        if glob_line[0] == "/":
+            glob_line = glob_line[1:]
+            found_files = found_files + [x.as_posix() for x in folder.glob(glob_line)]
+        else:
+            found_files = found_files + [x.as_posix() for x in folder.rglob(glob_line)]
+    found_files = list(set(found_files))
+    found_files.sort()
+    return found_files
+
+
+def select_files_with_rglob(folder, include_glob, exclude_glob):
+    included_files = glob_find(folder, include_glob)
+    excluded_files = glob_find(folder, exclude_glob)
+    selected_files = [x for x in included_files if x not in excluded_files]
+    selected_files.sort()
+    return [x for x in selected_files if Path(x).is_dir() is False]
+
+
+def select_files_with_walk(folder, include_glob, exclude_glob):
+    module = GetFileListModule.__new__(GetFileListModule)
+    selected_files, _, _ = module.walk(folder, GlobMatcher(include_glob, exclude_glob))
+    return selected_files
+
+
+def get_note_folder(i):
+    return f"folder {i % 10}/" + ("Blog" if i % 3 == 0 else "subfolder")
+
+
+def create_vault_with_git_folder(folder, number_of_notes, number_of_git_objects):
+    folder = Path(folder)
+    folder.joinpath("Home.md").write_text("# Home")
+    create_vault(folder, number_of_notes, lambda i: f"{get_note_folder(i)}/note {i}.md", lambda i: f"# Note {i}")
+    # an image next to every fifth note
+    create_vault(folder, (number_of_notes + 4) // 5, lambda i: f"{get_note_folder(i * 5)}/image {i * 5}.png")
+    for name in (".obsidian", ".trash"):
+        folder.joinpath(name).mkdir()
+        folder.joinpath(name, "workspace.json").write_text("{}")
+    create_vault(folder, number_of_git_objects, lambda i: f".git/objects/{i % 256:02x}/{i:038x}")
+
+
+def run_benchmark(number_of_notes=5000, number_of_git_objects=20000):
+    with tempfile.TemporaryDirectory() as folder:
+        create_vault_with_git_folder(folder, number_of_notes, number_of_git_objects)
+
+        for include_glob, exclude_glob in glob_lists:
+            if select_files_with_rglob(folder, include_glob, exclude_glob) != select_files_with_walk(folder, include_glob, exclude_glob):
+                print(f"ERROR: the walk selects different files than rglob for include_glob {include_glob} and exclude_glob {exclude_glob}")
+                sys.exit(1)
+
+        rglob_time, _ = time_it(select_files_with_rglob, folder, ["*"], default_exclude_glob)
+        walk_time, _ = time_it(select_files_with_walk, folder, ["*"], default_exclude_glob)
+
+    print(f"notes: {number_of_notes}, files in .git: {number_of_git_objects}")
+    print(f"  rglob per glob line:  {rglob_time:8.3f}s")
+    print(f"  single walk:          {walk_time:8.3f}s")
+    print(f"  speedup: {rglob_time / walk_time:.1f}x")
+
+
+if __name__ == "__main__":
+    run_from_command_line(run_benchmark)
@@ -0,0 +1,109 @@
+''' Benchmark annotating the files in the vault (HydrateFileListModule).
+
+    Every file used to be annotated with five config lookups, an exists() and getmtime() call and a relative_to() for the entrypoint check,
+    after which Schema.normalize() called dir() on every field. This compares that with the current code, which looks up the
+    config values once (FileClassifier) and takes the modified times from the stat results of get_file_list (index/file_stats.json),
+    and checks that both annotate the files the same.
+
+    Run from the root of this repo:
+        python ci/benchmarks/hydrate_file_list.py [number_of_files]
+'''
+
+import sys
+import os
+import datetime
+import platform
+import tempfile
+from pathlib import Path
+
+from lib import time_it, run_from_command_line, create_vault
+
+from obsidianhtml.modules.builtin.hydrate_file_list import AnnotatedFile
+from obsidianhtml.modules.builtin.get_file_list import GetFileListModule, GlobMatcher
+from obsidianhtml.modules.handlers.config import get_config
+
+config = {
+    "toggles": {"compile_md": True},
+    "included_file_suffixes": ["jpg", "jpeg", "gif", "png", "bmp", "svg", "mp4", "webm", "ogv", "mov", "mkv", "mp3", "wav", "m4a", "ogg", "3gp", "flac", "pdf"],
+    "video_format_suffixes": ["mp4", "webm", "ogv", "mov", "mkv"],
+    "audio_format_suffixes": ["mp3", "webm", "wav", "m4a", "ogg", "3gp", "flac"],
+    "embeddable_file_suffixes": ["pdf"],
+}
+
+
+def gc(path):
+    return get_config(config, path)
+
+
+def annotate_file_before(paths, file_str):
+    """AnnotatedFile.from_file_str() and .normalize() as they were before the FileClassifier and file_stats.json"""
+    af = AnnotatedFile(path=file_str, is_entrypoint=False, is_note=False, is_video=False, is_audio=False, is_embeddable=False, is_includable_file=False, is_parsable_note=False)
+
+    file_path = Path(file_str)
+    suffix = file_path.suffix[1:].lower()
+
+    af.is_entrypoint = AnnotatedFile.check_is_entrypoint(gc, paths, file_path)
+    if suffix == "md":
+        af.is_note = True
+    if suffix in gc("included_file_suffixes"):
+        af.is_includable_file = True
+    if suffix in gc("video_format_suffixes"):
+        af.is_video = True
+    if suffix in gc("audio_format_suffixes"):
+        af.is_audio = True
+    if suffix in gc("embeddable_file_suffixes"):
+        af.is_embeddable = True
+    if file_path.exists() and af.is_note:
+        af.is_parsable_note = True
+
+    af.modified_time = datetime.datetime.fromtimestamp(os.path.getmtime(af.path)).isoformat()
+    if platform.system() == "Windows" or platform.system() == "Darwin":
+        af.creation_time = datetime.datetime.fromtimestamp(os.path.getctime(af.path)).isoformat()
+
+    d = {}
+    for name in af.__annotations__.keys():
+        value = af.__dict__[name]
+        if "__schema__" in dir(value):
+            d[name] = value.normalize()
+        elif isinstance(value, Path):
+            d[name] = value.as_posix()
+        else:
+            d[name] = value
+    return d
+
+
+def annotate_files_before(paths, files):
+    return [annotate_file_before(paths, file_str) for file_str in files]
+
+
+def annotate_files(paths, files, file_stats):
+    return [af.normalize() for af in AnnotatedFile.from_file_strs(gc, paths, files, dict(file_stats))]
+
+
+suffixes = ["md", "md", "md", "png", "pdf", "mp4", "mp3", "txt"]
+
+
+def run_benchmark(number_of_files=100000):
+    with tempfile.TemporaryDirectory() as folder:
+        create_vault(folder, number_of_files, lambda i: f"folder {i % 100}/file {i}.{suffixes[i % len(suffixes)]}")
+        paths = {"input_folder": folder, "rel_obsidian_entrypoint": "folder 0/file 0.md"}
+
+        module = GetFileListModule.__new__(GetFileListModule)
+        files, _, file_stats = module.walk(folder, GlobMatcher(["*"], []))
+
+        before_time, before_output = time_it(annotate_files_before, paths, files)
+        stats_time, stats_output = time_it(annotate_files, paths, files, file_stats)
+        pool_time, pool_output = time_it(annotate_files, paths, files, {})
+
+    if before_output != stats_output or before_output != pool_output:
+        print("ERROR: the files are annotated differently than before")
+        sys.exit(1)
+
+    print(f"files: {number_of_files}")
+    print(f"  before:                        {before_time:8.3f}s")
+    print(f"  with index/file_stats.json:    {stats_time:8.3f}s  (speedup: {before_time / stats_time:.1f}x)")
+    print(f"  stat in thread pool:           {pool_time:8.3f}s  (speedup: {before_time / pool_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    run_from_command_line(run_benchmark)
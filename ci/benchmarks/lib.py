@@ -0,0 +1,75 @@
+''' Helpers that the benchmarks share: timing, running from the command line, and creating synthetic vaults and notes.
+
+    Importing this module adds the root of this repo to the path, so that the benchmarks import obsidianhtml from this repo:
+        from lib import time_it, run_from_command_line
+'''
+
+import sys
+import os
+import time
+from pathlib import Path
+
+# add /obsidian-html to path
+sys.path.insert(1, str(Path(os.path.realpath(__file__)).parent.parent.parent))
+
+
+# settings of get_markdown_renderer() and create_markdown_converter() (see md2html.get_markdown_settings), without the highlight cache
+markdown_settings = {
+    "engine": "python-markdown",
+    "footnotes": True,
+    "mermaid_diagrams": True,
+    "mermaid_strip_special_chars": False,
+    "dataview_export_folder": None,
+    "eraser": True,
+    "embedded_search": False,
+    "highlight_cache_folder": None,
+    "highlight_cache_size": 0,
+}
+
+
+def time_it(function, *args):
+    """Returns the time that function(*args) took in seconds, and its output"""
+    start = time.perf_counter()
+    output = function(*args)
+    return time.perf_counter() - start, output
+
+
+def run_from_command_line(run_benchmark):
+    """Calls run_benchmark with the numbers that were given on the command line, in the order of its parameters.
+    Parameters that are not given keep their default value."""
+    run_benchmark(*[int(arg) for arg in sys.argv[1:]])
+
+
+def create_vault(folder, number_of_files, get_rel_path, get_contents=None):
+    """Writes number_of_files files to folder: file i to get_rel_path(i), with get_contents(i) as its text (or empty when get_contents
+    is None). Returns the paths of the files, as posix strings."""
+    files = []
+    for i in range(number_of_files):
+        file_path = Path(folder).joinpath(get_rel_path(i))
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text("" if get_contents is None else get_contents(i), encoding="utf-8")
+        files.append(file_path.as_posix())
+    return files
+
+
+def create_note(i, rnd):
+    """Returns a small note that uses a random selection of the markdown extensions of ObsidianHtml"""
+    parts = [f"# Note {i}", "", "Some text with a [link](other.html), **bold**, *italic* and ==highlighted== text.", ""]
+    if rnd.random() < 0.5:
+        parts += ["[TOC]", "", "## First header", "", "text", "", "## Second header", "", "text", ""]
+    if rnd.random() < 0.5:
+        parts += [f"A footnote[^1] and an inline footnote^[inline {i}].", "", "[^1]: The footnote.", ""]
+    if rnd.random() < 0.3:
+        parts += ["The HTML spec.", "", "*[HTML]: Hyper Text Markup Language", ""]
+    if rnd.random() < 0.3:
+        parts += ["> [!note] A callout", "> with text", ""]
+    if rnd.random() < 0.3:
+        parts += ["A paragraph with a block id", f"^block-{i}", ""]
+    if rnd.random() < 0.3:
+        parts += ["```python", f"print({i})", "```", ""]
+    if rnd.random() < 0.2:
+        parts += ["Inline math $x^2$ and %% a comment %% text.", ""]
+    if rnd.random() < 0.2:
+        parts += ["```mermaid", "graph TD", f"  A --> B{i}", "```", ""]
+    parts += ["- a list", "- with items", "", "| a | b |", "|---|---|", f"| {i} | x |", ""]
+    return "\n".join(parts)
@@ -0,0 +1,91 @@
+''' Benchmark rewriting the bare links and inline tags of a note (steps [8] and [9] of ConvertObsidianPageToMarkdownPage).
+
+    Every bare link and inline tag used to be replaced with a re.sub() over the whole page, which takes O(links x page size).
+    They are now replaced in one pass (insert_bare_links, replace_inline_tags). This compares the two for a map of content with many
+    links and tags, and checks that both return the same page, also for links with the same base and tags followed by an underscore.
+    The other kinds of links are rewritten the same way, but need a vault to be resolved, see ci/tests/golden_output_test.py.
+
+    Run from the root of this repo:
+        python ci/benchmarks/link_rewriting.py [number_of_links]
+'''
+
+import sys
+import random
+import regex as re
+
+from lib import time_it, run_from_command_line
+
+from obsidianhtml.parser.MarkdownPage import replace_inline_tags, get_inline_tags
+from obsidianhtml.parser.PageRewriter import insert_bare_links
+
+
+def insert_bare_links_before(page):
+    """Step [8] as it was before insert_bare_links()"""
+    matched_links = re.findall(r"(?<![\[\(\"])(https*:\/\/.[^\s|]*)", page)
+    matched_links.sort(reverse=True, key=lambda e: len(e))
+    for matched_link in matched_links:
+        new_md_link = f"[{matched_link}]({matched_link})"
+        safe_link = re.escape(matched_link)
+        page = re.sub(rf"(?<![\[\(])({safe_link})", new_md_link, page)
+    return page
+
+
+def replace_inline_tags_before(page):
+    """Step [9] as it was before replace_inline_tags()"""
+    for tag in get_inline_tags(page):
+        safe_str = "#" + re.escape(tag) + r"(?=[^\p{L}\p{N}/\-\p{Emoji_Presentation}]|$)"
+        page = re.sub(safe_str, f"**{tag}**", page)
+    return page
+
+
+def rewrite_before(page):
+    return replace_inline_tags_before(insert_bare_links_before(page))
+
+
+def rewrite(page):
+    matched_links = sorted(re.findall(r"(?<![\[\(\"])(https*:\/\/.[^\s|]*)", page), reverse=True, key=len)
+    if len(matched_links) > 0:
+        page = insert_bare_links(page, matched_links)
+    replacements = {}
+    for tag in get_inline_tags(page):
+        replacements.setdefault(tag, f"**{tag}**")
+    if len(replacements) > 0:
+        page = replace_inline_tags(page, replacements)
+    return page
+
+
+def create_page(number_of_links, rnd):
+    lines = ["# Map of content", ""]
+    for i in range(number_of_links):
+        site = rnd.randrange(max(1, number_of_links // 4))
+        link = rnd.choice([f"https://example.com/{site}", f"https://example.com/{site}/page", f"http://example.org/{site}?q=1", "https://example.com"])
+        tag = rnd.choice([f"topic/{site}", f"topic_{site}", "topic", "status/open", f"t{site}_x"])
+        lines.append(rnd.choice([f"- {link} #{tag}", f"- [name]({link}) #{tag} and #{tag}_suffix", f'- <a href="{link}">link</a> word#{tag}', f"- ({link}) #{tag}"]))
+    return "\n".join(lines)
+
+
+def run_benchmark(number_of_links=2000):
+    rnd = random.Random(0)
+
+    for _ in range(200):
+        page = create_page(rnd.randint(0, 30), rnd)
+        if rewrite_before(page) != rewrite(page):
+            print(f"ERROR: the page is rewritten differently than before:\n{page}")
+            sys.exit(1)
+
+    page = create_page(number_of_links, rnd)
+    before_time, before_output = time_it(rewrite_before, page)
+    one_pass_time, one_pass_output = time_it(rewrite, page)
+
+    if before_output != one_pass_output:
+        print("ERROR: the map of content is rewritten differently than before")
+        sys.exit(1)
+
+    print(f"links: {number_of_links}, page size: {len(page)} characters")
+    print(f"  re.sub per link:  {before_time:8.3f}s")
+    print(f"  one pass:         {one_pass_time:8.3f}s")
+    print(f"  speedup: {before_time / one_pass_time:.1f}x")
+
+
+if __name__ == "__main__":
+    run_from_command_line(run_benchmark)
@@ -0,0 +1,49 @@
+''' Benchmark converting many small notes from markdown to html with python-markdown (PythonMarkdownRenderer).
+
+    A new markdown.Markdown instance, with all its extensions, used to be created for every page. Now every process creates one
+    converter per set of settings (get_markdown_renderer), which is reset before every page.
+    This compares the two for a vault of small notes, and checks that both return the same html, also for notes with footnotes,
+    a table of contents, abbreviations, callouts and mermaid diagrams, which keep state while converting a page.
+
+    Run from the root of this repo:
+        python ci/benchmarks/markdown_converter.py [number_of_notes]
+'''
+
+import sys
+import random
+
+from lib import time_it, run_from_command_line, markdown_settings, create_note
+
+from obsidianhtml.md2html import create_markdown_converter, get_markdown_renderer
+
+
+def convert_with_new_converters(notes):
+    return [create_markdown_converter(markdown_settings).convert(note) for note in notes]
+
+
+def convert_with_reused_converter(notes):
+    output = []
+    for note in notes:
+        output.append(get_markdown_renderer(markdown_settings).convert(note, ""))
+    return output
+
+
+def run_benchmark(number_of_notes=1000):
+    rnd = random.Random(0)
+    notes = [create_note(i, rnd) for i in range(number_of_notes)]
+
+    new_time, new_output = time_it(convert_with_new_converters, notes)
+    reused_time, reused_output = time_it(convert_with_reused_converter, notes)
+
+    if new_output != reused_output:
+        print("ERROR: the reused converter returns other html than a new converter")
+        sys.exit(1)
+
+    print(f"notes: {number_of_notes}")
+    print(f"  new converter per note:  {new_time:8.3f}s  ({new_time / number_of_notes * 1000:.2f} ms per note)")
+    print(f"  reused converter:        {reused_time:8.3f}s  ({reused_time / number_of_notes * 1000:.2f} ms per note)")
+    print(f"  speedup: {new_time / reused_time:.1f}x")
+
+
+if __name__ == "__main__":
+    run_from_command_line(run_benchmark)
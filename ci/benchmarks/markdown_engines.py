@@ -0,0 +1,56 @@
+''' Benchmark converting many small notes from markdown to html with both markdown engines (markdown_engine).
+
+    python-markdown runs its extensions as preprocessors, block processors and tree processors over an ElementTree, and serializes
+    the tree at the end. markdown-it-py (markdown_engine: markdown-it) parses the note into a flat list of tokens in one pass, and
+    renders them with the plugins in obsidianhtml/markdown_it_plugins, which create the same html as the python-markdown extensions.
+    This converts a vault of small notes with both engines (reusing the renderer of each, as the build does), and checks that the
+    html of every note is the same after normalizing it, like ci/tests/renderer_conformance_test.py does.
+    Needs markdown-it-py (pip install obsidianhtml[markdown-it]).
+
+    Run from the root of this repo:
+        python ci/benchmarks/markdown_engines.py [number_of_notes]
+'''
+
+import sys
+import os
+import random
+from pathlib import Path
+
+# add /obsidian-html/ci to path
+sys.path.insert(1, str(Path(os.path.realpath(__file__)).parent.parent))
+
+from lib import time_it, run_from_command_line, markdown_settings, create_note
+
+from obsidianhtml.md2html import get_markdown_renderer
+from tests.renderer_conformance_test import normalize_html
+
+
+def convert(engine, notes):
+    renderer = get_markdown_renderer({**markdown_settings, "engine": engine})
+    return [renderer.convert(note, "") for note in notes]
+
+
+def run_benchmark(number_of_notes=1000):
+    rnd = random.Random(0)
+    notes = [create_note(i, rnd) for i in range(number_of_notes)]
+
+    # the first call creates the renderers
+    convert("python-markdown", notes[:1])
+    convert("markdown-it", notes[:1])
+
+    pm_time, pm_output = time_it(convert, "python-markdown", notes)
+    mdit_time, mdit_output = time_it(convert, "markdown-it", notes)
+
+    for note, pm_html, mdit_html in zip(notes, pm_output, mdit_output):
+        if normalize_html(f'<div class="content">{pm_html}</div>') != normalize_html(f'<div class="content">{mdit_html}</div>'):
+            print(f"ERROR: the markdown engines return other html for:\n{note}")
+            sys.exit(1)
+
+    print(f"notes: {number_of_notes}")
+    print(f"  python-markdown:  {pm_time:8.3f}s  ({pm_time / number_of_notes * 1000:.2f} ms per note)")
+    print(f"  markdown-it:      {mdit_time:8.3f}s  ({mdit_time / number_of_notes * 1000:.2f} ms per note)")
+    print(f"  speedup: {pm_time / mdit_time:.1f}x")
+
+
+if __name__ == "__main__":
+    run_from_command_line(run_benchmark)
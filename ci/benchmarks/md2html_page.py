@@ -0,0 +1,117 @@
+''' Benchmark converting a link-heavy note from markdown to html (convert_markdown_page_to_html_and_export and render_html_page).
+
+    Every link in the markdown ( ](...), <source src>, <img src>, <embed src>, bare links) and every <a href> in the html used to be
+    replaced with a re.sub() or str.replace() over the whole page. They are now replaced in one pass per kind of link.
+    This converts a vault with a map of content that links to all other notes in every possible way, and prints the time that
+    each of the two steps took for the map of content and (on average) for the other notes.
+    To compare with the previous code, run this on both commits. ci/tests/golden_output_test.py checks the output of the conversion.
+
+    Run from the root of this repo:
+        python ci/benchmarks/md2html_page.py [number_of_links]
+'''
+
+import sys
+import io
+import contextlib
+import tempfile
+import time
+import yaml
+from pathlib import Path
+
+from lib import run_from_command_line, create_vault
+
+from obsidianhtml import md2html
+from obsidianhtml.controller.ConvertVault import ConvertVault
+
+
+def create_link_heavy_vault(folder, number_of_links):
+    vault = Path(folder).joinpath("vault")
+    vault.joinpath(".obsidian").mkdir(parents=True)
+    vault.joinpath("index.md").write_text("# Index\n[[Map of content]]\n")
+
+    number_of_notes = max(1, number_of_links // 10)
+    create_vault(vault, number_of_notes, lambda i: f"Note {i}.md", lambda i: f"# Note {i}\nSome text, and a link back to the [[Map of content]].\n")
+    vault.joinpath("image.png").write_bytes(b"\x89PNG\r\n\x1a\n")
+    vault.joinpath("audio.mp3").write_bytes(b"ID3")
+    vault.joinpath("document.pdf").write_bytes(b"%PDF-1.4")
+
+    lines = ["# Map of content", ""]
+    for i in range(number_of_links):
+        note = (i // 10) % number_of_notes
+        lines.append(
+            [
+                f"- [[Note {note}]]",
+                f"- [Note {note}](Note%20{note}.md)",
+                f"- [header of note {note}](Note%20{note}.md#note-{note})",
+                "- ![[image.png]]",
+                '- <img src="image.png" width="50">',
+                "- ![[audio.mp3]]",
+                "- ![[document.pdf]]",
+                f"- https://example.com/{i}",
+                f"- [external](https://example.com/page/{i})",
+                f"- [[#Map of content|anchor {i}]]",
+            ][i % 10]
+        )
+    vault.joinpath("Map of content.md").write_text("\n".join(lines) + "\n")
+
+    config = {
+        "obsidian_entrypoint_path_str": vault.joinpath("index.md").as_posix(),
+        "md_folder_path_str": Path(folder).joinpath("output/md").as_posix(),
+        "md_entrypoint_path_str": Path(folder).joinpath("output/md/index.md").as_posix(),
+        "html_output_folder_path_str": Path(folder).joinpath("output/html").as_posix(),
+        "module_data_folder": Path(folder).joinpath("output/mod").as_posix(),
+        "copy_vault_to_tempdir": False,
+    }
+    config_path = Path(folder).joinpath("config.yml")
+    config_path.write_text(yaml.dump(config))
+    return config_path
+
+
+def timed(function, timings, get_name):
+    """Wraps function so that the time of every call is added to timings[name]"""
+
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        output = function(*args, **kwargs)
+        name = get_name(*args)
+        timings[name] = timings.get(name, 0) + time.perf_counter() - start
+        return output
+
+    return wrapper
+
+
+def run_benchmark(number_of_links=2000):
+    convert_timings = {}
+    render_timings = {}
+    md2html.convert_markdown_page_to_html_and_export = timed(
+        md2html.convert_markdown_page_to_html_and_export, convert_timings, lambda fo, *args: fo.path["markdown"]["file_relative_path"].as_posix()
+    )
+    md2html.render_html_page = timed(md2html.render_html_page, render_timings, lambda pb, job: job["rel_dst_path"].as_posix().replace(".html", ".md"))
+
+    with tempfile.TemporaryDirectory() as folder:
+        config_path = create_link_heavy_vault(folder, number_of_links)
+        sys.argv = ["obsidianhtml", "convert", "-i", config_path.as_posix()]
+        with contextlib.redirect_stdout(io.StringIO()):
+            ConvertVault()
+
+    moc = "Map of content.md"
+    others = [x for x in convert_timings.keys() if x.startswith("Note ") and x in render_timings]
+    if moc not in convert_timings or moc not in render_timings or len(others) == 0:
+        print("ERROR: the map of content or the other notes were not converted")
+        sys.exit(1)
+
+    # with jobs: 1 the page is rendered in convert_markdown_page_to_html_and_export() (see HtmlRenderQueue.submit)
+    for name, render_time in render_timings.items():
+        convert_timings[name] -= render_time
+
+    def average(timings):
+        return sum(timings[x] for x in others) / len(others)
+
+    print(f"links: {number_of_links}, notes: {len(others)}")
+    print("                     convert_markdown_page_to_html_and_export   render_html_page")
+    print(f"  map of content:    {convert_timings[moc]:8.3f}s                                 {render_timings[moc]:8.3f}s")
+    print(f"  other notes (avg): {average(convert_timings):8.3f}s                                 {average(render_timings):8.3f}s")
+
+
+if __name__ == "__main__":
+    run_from_command_line(run_benchmark)
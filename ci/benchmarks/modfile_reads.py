@@ -0,0 +1,91 @@
+''' Benchmark reading module files (modfiles).
+
+    Every modfile read used to call inspect.stack() to find out whether it was done by integrate_load/integrate_save.
+    This compares that with the access context that run_module() now sets around the integrate methods
+    (ObsidianHtmlModule.integration()), and checks that both record the same reads.
+
+    Run from the root of this repo:
+        python ci/benchmarks/modfile_reads.py [number_of_reads]
+'''
+
+import sys
+import inspect
+import tempfile
+from pathlib import Path
+
+from lib import time_it, run_from_command_line
+
+from obsidianhtml.modules.base_classes import ObsidianHtmlModule
+from obsidianhtml.modules.handlers.file import File
+
+
+class BenchmarkModule(ObsidianHtmlModule):
+    @staticmethod
+    def requires():
+        return tuple(["input.json"])
+
+    @staticmethod
+    def provides():
+        return tuple()
+
+    @staticmethod
+    def alters():
+        return tuple()
+
+    def accept(self, module_data_folder):
+        return True
+
+    def run(self):
+        pass
+
+
+class InspectStackFile(File):
+    """File.read() as it was before the access context was added"""
+
+    def read(self, sneak=False):
+        if self.is_module_file and sneak is False and self.resource_rel_path not in self.module.requires_files() and self.resource_rel_path not in self.module.written_files.listing():
+            stack = inspect.stack()
+            if stack[1][3] not in ("integrate_save", "integrate_load"):
+                if len(stack) > 3 and stack[3][3] in ["write", "print"]:
+                    pass
+                else:
+                    raise Exception(f"ModuleMisConfiguration: Module {self.module.module_name} reads from {self.resource_rel_path} but this is not reported in self.requires.")
+
+        if sneak is False and inspect.stack()[1][3] not in ("integrate_save",):
+            self.module.read_files.add(self.resource_rel_path)
+
+        with open(self.path, "r", encoding=self.encoding) as f:
+            self.contents = f.read()
+
+        return self
+
+
+def read_modfile(module, file_class, number_of_reads):
+    for _ in range(number_of_reads):
+        file_class(resource_rel_path="input.json", path=module.path("input.json"), module=module).read().from_json()
+
+
+def run_benchmark(number_of_reads=10000):
+    with tempfile.TemporaryDirectory() as module_data_folder:
+        Path(module_data_folder).joinpath("input.json").write_text('{"a": 1}')
+
+        module = BenchmarkModule(module_data_folder=module_data_folder, module_name="benchmark_module")
+        stack_time, _ = time_it(read_modfile, module, InspectStackFile, number_of_reads)
+        stack_reads = module.read_files.listing()
+
+        module = BenchmarkModule(module_data_folder=module_data_folder, module_name="benchmark_module")
+        context_time, _ = time_it(read_modfile, module, File, number_of_reads)
+        context_reads = module.read_files.listing()
+
+    if stack_reads != context_reads:
+        print("ERROR: the recorded reads differ between inspect.stack() and the access context")
+        sys.exit(1)
+
+    print(f"modfile reads: {number_of_reads}")
+    print(f"  inspect.stack():  {stack_time:8.3f}s  ({stack_time / number_of_reads * 1000:.3f}ms per read)")
+    print(f"  access context:   {context_time:8.3f}s  ({context_time / number_of_reads * 1000:.3f}ms per read)")
+    print(f"  speedup: {stack_time / context_time:.1f}x")
+
+
+if __name__ == "__main__":
+    run_from_command_line(run_benchmark)
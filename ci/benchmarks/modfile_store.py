@@ -0,0 +1,106 @@
+''' Benchmark passing a large json modfile (such as index/files_annotated.json) from one module to the next.
+
+    json modfiles used to be written to disk with indent=2 by one module, and then read and parsed again by every module that needed them.
+    They are now kept in memory by the modfile store (obsidianhtml/modules/handlers/modfile_store.py).
+    This compares the two, and checks that both read back the same list.
+
+    Run from the root of this repo:
+        python ci/benchmarks/modfile_store.py [number_of_files] [number_of_reads]
+'''
+
+import sys
+import os
+import json
+import tempfile
+from pathlib import Path
+
+from lib import time_it, run_from_command_line
+
+from obsidianhtml.modules.base_classes import ObsidianHtmlModule
+from obsidianhtml.modules.handlers.file import to_json_encoder
+from obsidianhtml.modules.handlers.modfile_store import modfile_store
+
+
+class BenchmarkModule(ObsidianHtmlModule):
+    @staticmethod
+    def requires():
+        return tuple(["index/files_annotated.json"])
+
+    @staticmethod
+    def provides():
+        return tuple(["index/files_annotated.json"])
+
+    @staticmethod
+    def alters():
+        return tuple()
+
+    def accept(self, module_data_folder):
+        return True
+
+    def run(self):
+        pass
+
+
+def create_annotated_files(number_of_files):
+    return [
+        {
+            "path": f"/vault/folder {i % 100}/note {i}.md",
+            "is_entrypoint": i == 0,
+            "is_note": True,
+            "is_video": False,
+            "is_audio": False,
+            "is_embeddable": False,
+            "is_includable_file": True,
+            "is_parsable_note": True,
+            "is_generated": False,
+            "modified_time": "2024-01-02T03:04:05",
+            "creation_time": None,
+        }
+        for i in range(number_of_files)
+    ]
+
+
+def pass_through_disk(module, files, number_of_reads):
+    """modfile(...).to_json().write() and modfile(...).read().from_json() as they were before the modfile store"""
+    path = module.path("index/files_annotated.json")
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(files, indent=2, cls=to_json_encoder))
+
+    for _ in range(number_of_reads):
+        with open(path, "r", encoding="utf-8") as f:
+            output = json.loads(f.read())
+    return output
+
+
+def pass_through_store(module, files, number_of_reads):
+    module.modfile("index/files_annotated.json", files).to_json().write()
+    for _ in range(number_of_reads):
+        output = module.modfile("index/files_annotated.json").read().from_json()
+    return output
+
+
+def run_benchmark(number_of_files=100000, number_of_reads=2):
+    files = create_annotated_files(number_of_files)
+
+    with tempfile.TemporaryDirectory() as module_data_folder:
+        Path(module_data_folder).joinpath("config.yml").write_text("keep_module_file_versions: False\nverbosity: error\n")
+        os.environ["OBS_MODULE_DATA_FOLDER"] = module_data_folder
+        module = BenchmarkModule(module_data_folder=module_data_folder, module_name="benchmark_module")
+
+        disk_time, disk_output = time_it(pass_through_disk, module, files, number_of_reads)
+        store_time, store_output = time_it(pass_through_store, module, files, number_of_reads)
+        modfile_store.clear()
+
+    if disk_output != store_output:
+        print("ERROR: reading from the modfile store returns something else than reading from disk")
+        sys.exit(1)
+
+    print(f"files: {number_of_files}, written once and read {number_of_reads} times")
+    print(f"  disk (indent=2):  {disk_time:8.3f}s")
+    print(f"  modfile store:    {store_time:8.3f}s")
+    print(f"  speedup: {disk_time / store_time:.1f}x")
+
+
+if __name__ == "__main__":
+    run_from_command_line(run_benchmark)
@@ -0,0 +1,111 @@
+''' Benchmark building the NetworkTree on a synthetic vault.
+
+    Replays the add_node() and AddLink() calls that add_file_object_to_node_list() does for every note that is
+    converted, and compares the id and (source, target) lookups of NetworkTree with the linear scans over
+    tree["nodes"] and tree["links"] that they replaced. Both have to produce the same tree.
+    The linear scans are quadratic, so they are only timed up to --linear-max nodes.
+
+    Run from the root of this repo:
+        python ci/benchmarks/network_tree.py [number_of_nodes ...] [--linear-max n]
+        python ci/benchmarks/network_tree.py 2000 10000 50000 100000
+'''
+
+import sys
+import random
+from types import SimpleNamespace
+
+from lib import time_it
+
+from obsidianhtml.core.NetworkTree import NetworkTree
+
+
+class LinearScanNetworkTree(NetworkTree):
+    """The NetworkTree as it was before the lookups were added"""
+
+    def add_node(self, node_obj):
+        for node in self.tree["nodes"]:
+            if node["id"] == node_obj["id"]:
+                node["metadata"] = node_obj["metadata"].copy()
+                return
+        self.nid_inc += 1
+        node_obj["nid"] = self.nid_inc
+        self.tree["nodes"].append(node_obj)
+
+    def AddLink(self, link_obj):
+        for link in self.tree["links"]:
+            if link["source"] == link_obj["source"] and link["target"] == link_obj["target"]:
+                return
+        self.tree["links"].append(link_obj)
+
+
+def create_calls(number_of_nodes, links_per_node=3, seed=0):
+    """Every note is added once when it is converted, and again for every note that links to it (as backlink_node)"""
+    rnd = random.Random(seed)
+    calls = []
+    for i in range(number_of_nodes):
+        calls.append(("node", f"folder{i % 40}/note{i}.md", None))
+        if i == 0:
+            continue
+        for _ in range(links_per_node):
+            j = rnd.randrange(i)
+            source = f"folder{j % 40}/note{j}.md"
+            calls.append(("node", source, None))
+            calls.append(("link", source, f"folder{i % 40}/note{i}.md"))
+    return calls
+
+
+def new_tree(tree_class):
+    tree = tree_class()
+    tree.pb = SimpleNamespace(verbose=False)
+    return tree
+
+
+def replay_calls(tree, calls):
+    for call, a, b in calls:
+        if call == "node":
+            node = tree.NewNode()
+            node["id"] = a
+            node["metadata"] = {"tags": []}
+            tree.add_node(node)
+        else:
+            link = tree.NewLink()
+            link["source"] = a
+            link["target"] = b
+            link["type"] = "reference"
+            tree.AddLink(link)
+
+
+def run_benchmark(number_of_nodes, linear_max):
+    calls = create_calls(number_of_nodes)
+    tree = new_tree(NetworkTree)
+    indexed_time, _ = time_it(replay_calls, tree, calls)
+
+    print(f"nodes: {len(tree.tree['nodes'])}, links: {len(tree.tree['links'])}, calls: {len(calls)}")
+    print(f"  lookups:      {indexed_time:8.3f}s")
+
+    if number_of_nodes > linear_max:
+        print(f"  linear scan:  skipped (more than {linear_max} nodes)")
+        return
+
+    linear_tree = new_tree(LinearScanNetworkTree)
+    linear_time, _ = time_it(replay_calls, linear_tree, calls)
+    if linear_tree.tree != tree.tree:
+        print("ERROR: NetworkTree output differs from the linear scan output")
+        sys.exit(1)
+    print(f"  linear scan:  {linear_time:8.3f}s")
+    print(f"  speedup: {linear_time / indexed_time:.1f}x")
+
+
+if __name__ == "__main__":
+    sizes = []
+    linear_max = 2000
+    args = sys.argv[1:]
+    while args:
+        arg = args.pop(0)
+        if arg == "--linear-max":
+            linear_max = int(args.pop(0))
+        else:
+            sizes.append(int(arg))
+
+    for number_of_nodes in sizes or [10000, 50000, 100000]:
+        run_benchmark(number_of_nodes, linear_max)
@@ -0,0 +1,87 @@
+''' Benchmark parsing the frontmatter and inline tags of the notes in the vault (ParseMetadataModule).
+
+    This compares parsing the notes one by one, parsing them on a process pool, and getting them from the metadata cache
+    (which is what happens for notes that did not change since the previous run), and checks that all three return the same metadata.
+
+    Run from the root of this repo:
+        python ci/benchmarks/parse_metadata.py [number_of_notes] [jobs]
+'''
+
+import sys
+import json
+import tempfile
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from lib import time_it, run_from_command_line, create_vault
+
+from obsidianhtml.modules.builtin.parse_metadata import parse_file, MetadataCache
+from obsidianhtml.modules.handlers.file import to_json_encoder
+
+note_template = """---
+title: Note {i}
+date: 2024-01-{day:02}
+tags: [project/{project}, status/open]
+aliases:
+  - note {i}
+---
+# Note {i}
+Some text with an #inline/tag and a [[link to note {other}]].
+
+- a list item with #another-tag
+- and one without
+"""
+
+
+def parse_serially(files):
+    return [parse_file(file)[0] for file in files]
+
+
+def parse_on_pool(files, jobs):
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return [x[0] for x in executor.map(parse_file, files, chunksize=max(1, len(files) // (jobs * 4)))]
+
+
+def get_from_cache(files, cache_path):
+    cache = MetadataCache(cache_path)
+    return [cache.get(file) for file in files]
+
+
+def normalize(metadata_list):
+    """Sorts the tags, which come from a set, and converts the values the way index/metadata.json does"""
+    for metadata in metadata_list:
+        metadata["tags"] = sorted(metadata["tags"])
+    return json.loads(json.dumps(metadata_list, cls=to_json_encoder))
+
+
+def run_benchmark(number_of_notes=10000, jobs=4):
+    with tempfile.TemporaryDirectory() as folder:
+        files = create_vault(
+            Path(folder).joinpath("vault"),
+            number_of_notes,
+            lambda i: f"folder {i % 100}/note {i}.md",
+            lambda i: note_template.format(i=i, day=i % 28 + 1, project=i % 10, other=(i + 1) % number_of_notes),
+        )
+
+        serial_time, serial_output = time_it(parse_serially, files)
+        pool_time, pool_output = time_it(parse_on_pool, files, jobs)
+
+        cache_path = Path(folder).joinpath("metadata_cache.json")
+        cache = MetadataCache(cache_path)
+        for file, metadata in zip(files, serial_output):
+            cache.set(file, metadata)
+        cache.save()
+        cache_time, cache_output = time_it(get_from_cache, files, cache_path)
+
+    if normalize(serial_output) != normalize(pool_output) or normalize(serial_output) != normalize(cache_output):
+        print("ERROR: the metadata differs between parsing serially, on the process pool, and getting it from the cache")
+        sys.exit(1)
+
+    print(f"notes: {number_of_notes}")
+    print(f"  serially:            {serial_time:8.3f}s")
+    print(f"  process pool ({jobs}):   {pool_time:8.3f}s  (speedup: {serial_time / pool_time:.1f}x)")
+    print(f"  metadata cache:      {cache_time:8.3f}s  (speedup: {serial_time / cache_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    run_from_command_line(run_benchmark)
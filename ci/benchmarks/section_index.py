@@ -0,0 +1,144 @@
+''' Benchmark including sections and blocks of a note (![[note#header]], ![[note#^block]]).
+
+    Every section inclusion used to build the header tree of the included note (convert_markdown_to_header_tree), look up the header in it
+    (GetSubHeaderTree) and print it (PrintHeaderTree), and every block inclusion went through all the blocks of the note (get_referenced_block).
+    The note is now indexed once (SectionIndex), after which every inclusion is a slice.
+    This compares the two for a note that is included many times, and checks that both return the same sections and blocks,
+    also for notes with duplicate headers, skipped levels, and lines that start with # but are no header.
+
+    Run from the root of this repo:
+        python ci/benchmarks/section_index.py [number_of_headers] [number_of_inclusions]
+'''
+
+import sys
+import os
+import random
+import regex as re
+
+from lib import time_it, run_from_command_line
+
+from obsidianhtml.parser.HeaderTree import SectionIndex, PrintHeaderTree, GetSubHeaderTree, convert_markdown_to_header_tree
+
+
+def get_referenced_block_before(reference, contents, rel_path_str):
+    """get_referenced_block() as it was before the SectionIndex"""
+    chunks = []
+    current_chunk = ""
+    last_line = ""
+    for line in contents.split("\n"):
+        if line.strip() == "":
+            if reference == last_line.strip().rsplit(" ", maxsplit=1)[-1]:
+                clean_chunk = re.sub(r"(?<=\s|^)(\^\S*?)(?=$|\n)", "", current_chunk.strip())
+                if clean_chunk == "":
+                    clean_chunk = re.sub(r"(?<=\s|^)(\^\S*?)(?=$|\n)", "", chunks[-1].strip())
+                return clean_chunk
+            if current_chunk.strip() != "":
+                chunks.append(current_chunk)
+            current_chunk = ""
+            last_line = ""
+        else:
+            current_chunk += line
+            last_line = line
+
+    if reference == last_line.strip().split(" ")[-1]:
+        clean_chunk = re.sub(r"(?<=\s|^)(\^\S*?)(?=$|\n)", "", current_chunk.strip())
+        if clean_chunk == "":
+            clean_chunk = re.sub(r"(?<=\s|^)(\^\S*?)(?=$|\n)", "", chunks[-1].strip())
+        return clean_chunk
+
+    return f"Unable to find section #{reference} in {rel_path_str}"
+
+
+def get_section_before(page, header):
+    header_dict, root_element = convert_markdown_to_header_tree(page)
+    header_tree = GetSubHeaderTree(root_element, header)
+    if header_tree is False:
+        return None
+    return PrintHeaderTree(header_tree)
+
+
+def create_page(number_of_headers, rnd):
+    lines = ["", "Intro paragraph", ""]
+    for i in range(number_of_headers):
+        level = rnd.choice([1, 2, 2, 3, 3, 4, 6])
+        title = rnd.choice([f"Header {i}", "Duplicate", "Term A", "Odd: title!", ""])
+        lines.append(rnd.choice(["#" * level + " " + title, "#" * level + "  " + title, "#" * level + "x " + title]))
+        for j in range(rnd.randint(0, 4)):
+            lines.append(rnd.choice(["", "", "some text", f"text with a block reference ^block{i}-{j}", "#tag", "#", "^lonely", "- list item", "   "]))
+    return "\n".join(lines)
+
+
+def get_selectors(page):
+    header_dict, root_element = convert_markdown_to_header_tree(page)
+    selectors = list(header_dict.keys()) + ["Duplicate", "Term A#Duplicate", "Header 1#Header 2", "Missing", "Duplicate#Duplicate", "Term A##Duplicate"]
+    references = re.findall(r"\^\S+", page) + ["^missing"]
+    return selectors, references
+
+
+def check_equivalence(rnd):
+    for _ in range(200):
+        page = create_page(rnd.randint(0, 30), rnd)
+        selectors, references = get_selectors(page)
+        index = SectionIndex(page)
+        for selector in selectors:
+            if get_section_before(page, selector) != index.get_section(selector):
+                return f"section {selector} of page:\n{page}"
+        for reference in references:
+            try:
+                expected = get_referenced_block_before(reference, page, "note.md")
+            except IndexError:
+                continue
+            if expected != index.get_block(reference, "note.md"):
+                return f"block {reference} of page:\n{page}"
+
+        header_dict, root_element = convert_markdown_to_header_tree(page)
+        starts_with_h1 = len(root_element["content"]) > 0 and isinstance(root_element["content"][0], dict) and root_element["content"][0]["level"] == 1
+        if starts_with_h1 != index.starts_with_h1():
+            return f"h1 check of page:\n{page}"
+    return None
+
+
+def include_before(page, selectors, references):
+    return [get_section_before(page, x) for x in selectors] + [get_referenced_block_before(x, page, "note.md") for x in references]
+
+
+def include_with_index(page, selectors, references):
+    index = SectionIndex(page)
+    return [index.get_section(x) for x in selectors] + [index.get_block(x, "note.md") for x in references]
+
+
+def run_benchmark(number_of_headers=300, number_of_inclusions=500):
+    rnd = random.Random(0)
+
+    # the old code prints an error for headers that are not found, which the index does as well
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    error = check_equivalence(rnd)
+    sys.stdout.close()
+    sys.stdout = stdout
+    if error is not None:
+        print(f"ERROR: the SectionIndex returns something else than the header tree for {error}")
+        sys.exit(1)
+
+    lines = []
+    for i in range(number_of_headers):
+        lines.append(f"## Term {i}\nThe meaning of term {i}, in a few sentences of text. ^term{i}\n")
+    page = "# Glossary\n" + "\n".join(lines)
+    selectors = [f"Term {rnd.randrange(number_of_headers)}" for _ in range(number_of_inclusions // 2)]
+    references = [f"^term{rnd.randrange(number_of_headers)}" for _ in range(number_of_inclusions // 2)]
+
+    before_time, before_output = time_it(include_before, page, selectors, references)
+    index_time, index_output = time_it(include_with_index, page, selectors, references)
+
+    if before_output != index_output:
+        print("ERROR: the SectionIndex returns something else than the header tree for the glossary")
+        sys.exit(1)
+
+    print(f"headers: {number_of_headers}, inclusions: {number_of_inclusions}")
+    print(f"  header tree per inclusion:  {before_time:8.3f}s")
+    print(f"  section index:              {index_time:8.3f}s")
+    print(f"  speedup: {before_time / index_time:.1f}x")
+
+
+if __name__ == "__main__":
+    run_from_command_line(run_benchmark)
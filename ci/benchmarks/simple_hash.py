@@ -0,0 +1,73 @@
+''' Benchmark lib.simpleHash, which hashes the html of every page (for the id of its graph), and the search data of the vault (gzip_hash).
+
+    simpleHash used to loop over every character in Python, with arithmetic on 128 bit integers, which took seconds for the search
+    data of a large vault. It now uses hashlib.blake2b, with the same output format: a 128 bit number as a string of digits.
+    The hashes are not the same as before, which only means that browsers load the search data from file once more (see the note
+    about search_hash in obsidianhtml/src/search/search.js).
+    This hashes pages and search data of several sizes with both, and checks that the new hashes have the same format as the old
+    ones, and are different for every page.
+
+    Run from the root of this repo:
+        python ci/benchmarks/simple_hash.py [number_of_pages] [search_data_mb]
+'''
+
+import sys
+import random
+import string
+
+from lib import time_it, run_from_command_line
+
+from obsidianhtml.lib import simpleHash
+
+
+def simple_hash_before(text: str):
+    """simpleHash() as it was before it used blake2b"""
+    hash = 0
+    for ch in text:
+        hash = (hash * 281 ^ ord(ch) * 997) & 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF
+    return str(hash)
+
+
+def create_text(rnd, size):
+    words = ["".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(2, 9))) for _ in range(500)] + ["<p>", "</p>", "ünïcödé", "✓"]
+    text = []
+    length = 0
+    while length < size:
+        word = rnd.choice(words)
+        text.append(word)
+        length += len(word) + 1
+    return " ".join(text)
+
+
+def hash_all(function, texts):
+    return [function(text) for text in texts]
+
+
+def run_benchmark(number_of_pages=1000, search_data_mb=10):
+    rnd = random.Random(0)
+    pages = [create_text(rnd, rnd.randint(1000, 20000)) for _ in range(number_of_pages)]
+    search_data = [create_text(rnd, search_data_mb * 1024 * 1024)]
+
+    before_pages_time, before_pages = time_it(hash_all, simple_hash_before, pages)
+    pages_time, new_pages = time_it(hash_all, simpleHash, pages)
+    before_search_time, before_search = time_it(hash_all, simple_hash_before, search_data)
+    search_time, new_search = time_it(hash_all, simpleHash, search_data)
+
+    for hash in new_pages + new_search:
+        if not hash.isdigit() or int(hash) >= 2**128:
+            print(f"ERROR: simpleHash returns a hash in another format than before: {hash}")
+            sys.exit(1)
+    if len(set(new_pages)) != len(set(pages)):
+        print("ERROR: simpleHash returns the same hash for different pages")
+        sys.exit(1)
+    if hash_all(simpleHash, pages) != new_pages:
+        print("ERROR: simpleHash returns another hash for the same page")
+        sys.exit(1)
+
+    print(f"pages: {number_of_pages}, search data: {search_data_mb} MB")
+    print(f"  pages        before: {before_pages_time:8.3f}s   now: {pages_time:8.3f}s   speedup: {before_pages_time / pages_time:.0f}x")
+    print(f"  search data  before: {before_search_time:8.3f}s   now: {search_time:8.3f}s   speedup: {before_search_time / search_time:.0f}x")
+
+
+if __name__ == "__main__":
+    run_from_command_line(run_benchmark)
@@ -7,6 +7,7 @@ import yaml
 import subprocess
 import time
 import shutil
+import json
 
 # web stuff
 from bs4 import BeautifulSoup
@@ -303,6 +304,130 @@ class TestAFiltering2(ModeTemplate):
         issues, actual_files = check_md_output('md/filtering/neutral', ['neutral.md'])
         self.assertEqual(len(issues), 0, msg=f"Issues found with filtering\n{actual_files}\n{yaml.dump(issues)}")
 
+class TestJobsMode(ModeTemplate):
+    """Convert the vault without and with worker processes (and concurrent modules), the output should be the same"""
+    testcase_name = "Jobs"
+    testcase_custom_config_values = [
+        ('toggles/process_all', True),
+        ('jobs', 4),
+        ('module_jobs', 4),
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        print(f'\n\n--------------------- {cls.testcase_name} <custom> -----------------------------', flush=True)
+
+        # tags are ordered by way of a set, fix the hash seed so that both runs order them the same way
+        os.environ['PYTHONHASHSEED'] = '0'
+
+        # serial run
+        customize_default_config(cls.testcase_custom_config_values + [('jobs', 1), ('module_jobs', 1)])
+        convert_vault(USE_PIP_INSTALL)
+
+        serial_dir = paths['temp_dir'].joinpath('serial')
+        if serial_dir.exists():
+            shutil.rmtree(serial_dir)
+        serial_dir.mkdir()
+        shutil.move(paths['temp_dir'].joinpath('md'), serial_dir.joinpath('md'))
+        shutil.move(paths['temp_dir'].joinpath('html'), serial_dir.joinpath('html'))
+
+        # parallel run
+        cls.testcase_config = customize_default_config(cls.testcase_custom_config_values)
+        convert_vault(USE_PIP_INSTALL)
+
+    def test_output_should_equal_serial_output(self):
+        self.scribe('md and html output should be the same as the output of the serial run')
+        for folder in ['md', 'html']:
+            issues = compare_output_folders(paths['temp_dir'].joinpath('serial', folder), paths['temp_dir'].joinpath(folder))
+            self.assertEqual(len(issues), 0, msg=f"Output of jobs=4 differs from jobs=1 ({folder})\n{yaml.dump(issues)}")
+
+class TestIncrementalBuildMode(ModeTemplate):
+    """Convert the vault, edit it, and convert it again into the same output folders, the output should be the same as a clean build"""
+    testcase_name = "IncrementalBuild"
+    testcase_custom_config_values = [
+        ('obsidian_entrypoint_path_str', 'tmp/incremental_vault/entrypoint.md'),
+        ('toggles/process_all', True),
+        ('toggles/incremental_build', True),
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        print(f'\n\n--------------------- {cls.testcase_name} <custom> -----------------------------', flush=True)
+
+        # tags are ordered by way of a set, fix the hash seed so that all runs order them the same way
+        os.environ['PYTHONHASHSEED'] = '0'
+
+        # the vault is edited, so work on a copy
+        vault = paths['temp_dir'].joinpath('incremental_vault')
+        if vault.exists():
+            shutil.rmtree(vault)
+        shutil.copytree(paths['test_vault'], vault)
+
+        # the build manifest and report are kept in the appdir, per vault and output folders
+        sys.path.insert(1, str(paths['root']))
+        from obsidianhtml.lib import get_build_cache_folder_path, get_obshtml_appdir_folder_path
+        build_cache_folder = get_build_cache_folder_path({
+            'appdir': get_obshtml_appdir_folder_path(),
+            'original_input_folder': vault.resolve(),
+            'md_folder': paths['temp_dir'].joinpath('md').resolve(),
+            'html_output_folder': paths['html_output_folder'].resolve(),
+        })
+        if build_cache_folder.exists():
+            shutil.rmtree(build_cache_folder)
+
+        # first run
+        cls.testcase_config = customize_default_config(cls.testcase_custom_config_values)
+        convert_vault(USE_PIP_INSTALL)
+
+        # edit a note, and a note that is included in another note
+        with open(vault.joinpath('BacklinkTestNote.md'), 'a', encoding="utf-8") as f:
+            f.write('\n[[Markdown link]]\n')
+        with open(vault.joinpath('note_inclusion/level1/noteB.md'), 'a', encoding="utf-8") as f:
+            f.write('\n\nAn edit of an included note.\n')
+
+        # incremental run
+        convert_vault(USE_PIP_INSTALL)
+        with open(build_cache_folder.joinpath('build_report.json'), 'r', encoding="utf-8") as f:
+            cls.build_report = json.loads(f.read())
+
+        # add the note that an unchanged note links to, which changes where that link resolves to
+        vault.joinpath('link_rewriting/Does not exist.md').write_text('# Does not exist\n', encoding="utf-8")
+        convert_vault(USE_PIP_INSTALL)
+        with open(build_cache_folder.joinpath('build_report.json'), 'r', encoding="utf-8") as f:
+            cls.link_target_build_report = json.loads(f.read())
+
+        incremental_dir = paths['temp_dir'].joinpath('incremental')
+        if incremental_dir.exists():
+            shutil.rmtree(incremental_dir)
+        incremental_dir.mkdir()
+        shutil.move(paths['temp_dir'].joinpath('md'), incremental_dir.joinpath('md'))
+        shutil.move(paths['temp_dir'].joinpath('html'), incremental_dir.joinpath('html'))
+
+        # clean run
+        shutil.rmtree(build_cache_folder)
+        convert_vault(USE_PIP_INSTALL)
+
+    def test_output_should_equal_clean_output(self):
+        self.scribe('md and html output should be the same as the output of a clean run on the edited vault')
+        for folder in ['md', 'html']:
+            issues = compare_output_folders(paths['temp_dir'].joinpath('incremental', folder), paths['temp_dir'].joinpath(folder))
+            self.assertEqual(len(issues), 0, msg=f"Output of the incremental run differs from a clean run ({folder})\n{yaml.dump(issues)}")
+
+    def test_build_report_should_list_changed_pages(self):
+        self.scribe('only the edited note, the note that includes the edited note, and the pages whose backlinks changed should be rendered again')
+        pages = sorted(set(x['page'] for x in self.build_report))
+        expected_pages = ['BacklinkTestNote.html', 'Markdown link.html', 'note_inclusion/level1/noteB.html', 'note_inclusion/noteA.html']
+        self.assertEqual(pages, expected_pages, msg=f"Unexpected pages in the build report\n{yaml.dump(self.build_report)}")
+
+    def test_note_should_be_converted_again_when_link_target_is_added(self):
+        self.scribe('an unchanged note should be converted again when a note that it links to is added')
+        md = paths['temp_dir'].joinpath('incremental/md/link_rewriting/Link rewriting.md').read_text(encoding="utf-8")
+        self.assertIn('[Does not exist](../link_rewriting/Does%20not%20exist.md)', md, msg="Markdown of link_rewriting/Link rewriting.md was reused")
+
+        reasons = [x['reasons'] for x in self.link_target_build_report if x['page'] == 'link_rewriting/Link rewriting.html' and x['pass'] == 'first pass']
+        self.assertEqual(len(reasons), 1, msg=f"Page of link_rewriting/Link rewriting.md was not rendered again\n{yaml.dump(self.link_target_build_report)}")
+        self.assertIn('markdown changed', reasons[0])
+
 
 if __name__ == '__main__':
     # Args
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+''' Converts all the notes in ci/test_vault to markdown, and checks that the markdown is exactly the same as the expected output
+    in ci/tests/golden/<mode>/. ci/test_vault/link_rewriting/Link rewriting.md contains every kind of link that is rewritten.
+
+    Run from the root of this repo:
+        python ci/tests/golden_output_test.py
+
+    After an intended change of the output, write the new expected output with:
+        OBS_HTML_UPDATE_GOLDEN=true python ci/tests/golden_output_test.py
+'''
+
+from pathlib import Path
+import os
+import sys
+import yaml
+import shutil
+import subprocess
+import unittest
+
+# add /obsidian-html/ci to path
+sys.path.insert(1, str(Path(os.path.realpath(__file__)).parent.parent))
+from tests.lib import get_paths, customize_default_config
+
+UPDATE_GOLDEN = (os.getenv('OBS_HTML_UPDATE_GOLDEN') == 'true')
+
+paths = get_paths()
+golden_folder = paths['ci_tests'].joinpath('golden')
+
+modes = {
+    'default': [],
+    'absolute_links': [
+        ('toggles/relative_path_md', False),
+        ('toggles/preserve_inline_tags', False),
+    ],
+}
+
+
+def convert_mode(mode):
+    """Converts ci/test_vault with the settings of the mode, and returns the folder with the markdown output"""
+    output_folder = paths['temp_dir'].joinpath('golden', mode)
+    if output_folder.exists():
+        shutil.rmtree(output_folder)
+    output_folder.mkdir(parents=True)
+
+    items = [
+        ('toggles/process_all', True),
+        ('toggles/compile_html', False),
+        ('md_folder_path_str', output_folder.joinpath('md').as_posix()),
+        ('md_entrypoint_path_str', output_folder.joinpath('md/index.md').as_posix()),
+        ('html_output_folder_path_str', output_folder.joinpath('html').as_posix()),
+        ('module_data_folder', output_folder.joinpath('mod').as_posix()),
+    ] + modes[mode]
+    config = customize_default_config(items, write_to_tmp_config=False)
+
+    config_path = output_folder.joinpath('config.yml')
+    with open(config_path, 'w', encoding="utf-8") as f:
+        f.write(yaml.dump(config))
+
+    # the tags in the frontmatter are combined through a set, so the hash seed is fixed to get the same order every run.
+    # the app dir is moved to the temp dir, so that the metadata cache of earlier runs (with another hash seed) is not used.
+    env = dict(os.environ, PYTHONHASHSEED='0', XDG_CONFIG_HOME=output_folder.joinpath('appdir').as_posix())
+    subprocess.call(['python', '-m', 'obsidianhtml', 'convert', '-i', config_path.as_posix()], cwd=paths['root'], env=env, stdout=subprocess.DEVNULL)
+    return output_folder.joinpath('md')
+
+
+def get_markdown_files(folder):
+    return {x.relative_to(folder).as_posix(): x for x in folder.rglob('*.md')}
+
+
+class TestGoldenOutput(unittest.TestCase):
+    def check_mode(self, mode):
+        md_folder = convert_mode(mode)
+        expected_folder = golden_folder.joinpath(mode)
+
+        if UPDATE_GOLDEN:
+            if expected_folder.exists():
+                shutil.rmtree(expected_folder)
+            for rel_path, path in get_markdown_files(md_folder).items():
+                expected_folder.joinpath(rel_path).parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(path, expected_folder.joinpath(rel_path))
+
+        output = get_markdown_files(md_folder)
+        expected = get_markdown_files(expected_folder)
+        self.assertEqual(sorted(output.keys()), sorted(expected.keys()), msg=f"[{mode}] the notes that were converted differ from the expected output")
+
+        for rel_path in sorted(expected.keys()):
+            self.assertEqual(output[rel_path].read_bytes(), expected[rel_path].read_bytes(), msg=f"[{mode}] {rel_path} differs from the expected output")
+
+    def test_default(self):
+        self.check_mode('default')
+
+    def test_absolute_links(self):
+        self.check_mode('absolute_links')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import os
 import sys
+import gzip
 import subprocess
 import yaml
 import shutil
@@ -312,4 +313,28 @@ def check_md_output(folder, expected_files):
         if file not in actual_files:
             issues.append(f"File {file} should exist but it does not.")
 
-    return (issues, actual_files)
\ No newline at end of file
+    return (issues, actual_files)
+
+def compare_output_folders(folder_a, folder_b):
+    """Returns the relative paths of all files that are missing from one of the folders, or that differ between them"""
+    def list_files(folder):
+        return set(x.relative_to(folder).as_posix() for x in Path(folder).rglob('*') if x.is_file())
+
+    def read(path):
+        # gzip files contain the time of compression, compare the contents instead
+        if path.suffix == '.gzip':
+            with gzip.open(path, 'rb') as f:
+                return f.read()
+        with open(path, 'rb') as f:
+            return f.read()
+
+    files_a = list_files(folder_a)
+    files_b = list_files(folder_b)
+
+    issues = [f"File {x} only exists in {folder_a}" for x in sorted(files_a - files_b)]
+    issues += [f"File {x} only exists in {folder_b}" for x in sorted(files_b - files_a)]
+    for rel_path in sorted(files_a & files_b):
+        if read(Path(folder_a).joinpath(rel_path)) != read(Path(folder_b).joinpath(rel_path)):
+            issues.append(f"File {rel_path} differs")
+
+    return issues
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+''' Converts all the notes in ci/test_vault to html with both markdown engines (markdown_engine: python-markdown and markdown-it),
+    and checks that the html of every note is the same, after normalizing it (see normalize_html).
+    ci/test_vault/Markdown features.md uses every markdown extension of ObsidianHtml.
+
+    markdown-it-py follows the CommonMark spec, and python-markdown does not, so some markdown is read differently by both engines.
+    Notes in which this happens are listed in known_differences, with the reason, and are not compared.
+
+    Needs markdown-it-py (pip install obsidianhtml[markdown-it]).
+
+    Run from the root of this repo:
+        python ci/tests/renderer_conformance_test.py
+'''
+
+from pathlib import Path
+import os
+import re
+import sys
+import yaml
+import shutil
+import difflib
+import subprocess
+import unittest
+
+from bs4 import BeautifulSoup, NavigableString, Comment
+
+# add /obsidian-html/ci to path
+sys.path.insert(1, str(Path(os.path.realpath(__file__)).parent.parent))
+from tests.lib import get_paths, customize_default_config
+
+try:
+    import markdown_it
+    import mdit_py_plugins
+    HAS_MARKDOWN_IT = True
+except ModuleNotFoundError:
+    HAS_MARKDOWN_IT = False
+
+paths = get_paths()
+
+engines = ['python-markdown', 'markdown-it']
+
+# html file (relative to the html output folder) -> why the engines create different html for it
+media_html = 'python-markdown reads a line that starts with <video> as an html block, and <audio> over more lines as a paragraph (with a <br /> per line), CommonMark the other way around'
+known_differences = {
+    'filtering/home.html': 'a blank line between two items of a list makes every item of the list a paragraph in CommonMark, python-markdown only does this for the items next to the blank line',
+    'link_rewriting/Link rewriting.html': 'in CommonMark an html block (here <figure>) goes on until the next blank line, so the markdown right after it is not converted. ' + media_html,
+    'note_inclusion/noteA.html': media_html,
+    'note_inclusion/level1/noteB.html': media_html,
+    'video/mp4_inclusion.html': media_html,
+}
+
+
+def convert_engine(engine):
+    """Converts ci/test_vault to html with the markdown engine, and returns the folder with the html output"""
+    output_folder = paths['temp_dir'].joinpath('conformance', engine)
+    if output_folder.exists():
+        shutil.rmtree(output_folder)
+    output_folder.mkdir(parents=True)
+
+    items = [
+        ('markdown_engine', engine),
+        ('toggles/process_all', True),
+        ('md_folder_path_str', output_folder.joinpath('md').as_posix()),
+        ('md_entrypoint_path_str', output_folder.joinpath('md/index.md').as_posix()),
+        ('html_output_folder_path_str', output_folder.joinpath('html').as_posix()),
+        ('module_data_folder', output_folder.joinpath('mod').as_posix()),
+    ]
+    config = customize_default_config(items, write_to_tmp_config=False)
+
+    config_path = output_folder.joinpath('config.yml')
+    with open(config_path, 'w', encoding="utf-8") as f:
+        f.write(yaml.dump(config))
+
+    # see golden_output_test.py
+    env = dict(os.environ, PYTHONHASHSEED='0', XDG_CONFIG_HOME=output_folder.joinpath('appdir').as_posix())
+    subprocess.call(['python', '-m', 'obsidianhtml', 'convert', '-i', config_path.as_posix()], cwd=paths['root'], env=env, stdout=subprocess.DEVNULL)
+    return output_folder.joinpath('html')
+
+
+def get_html_files(folder):
+    # obs.html holds the generated pages (tags, search, etc.), which are not rendered from markdown
+    return {x.relative_to(folder).as_posix(): x for x in folder.rglob('*.html') if x.is_file() and x.relative_to(folder).parts[0] != 'obs.html'}
+
+
+def normalize_html(html):
+    """Returns the content of the page (div.content) in a form in which only differences that change how the page looks are left:
+    one element or text per line, sorted attributes, and whitespace between elements removed. The text of <pre> is kept as it is."""
+    soup = BeautifulSoup(html, 'html.parser')
+    content = soup.find('div', class_='content')
+    if content is None:
+        return []
+
+    lines = []
+
+    def add(node, depth, in_pre):
+        indent = '  ' * depth
+        if isinstance(node, Comment):
+            return
+        if isinstance(node, NavigableString):
+            text = str(node) if in_pre else re.sub(r'\s+', ' ', str(node)).strip()
+            if text:
+                lines.append(indent + repr(text))
+            return
+
+        attrs = []
+        for key in sorted(node.attrs):
+            value = node.attrs[key]
+            if isinstance(value, list):
+                value = ' '.join(value)
+            attrs.append(f' {key}="{value}"')
+        lines.append(f'{indent}<{node.name}{"".join(attrs)}>')
+        for child in node.children:
+            add(child, depth + 1, in_pre or node.name == 'pre')
+
+    add(content, 0, False)
+    return lines
+
+
+@unittest.skipUnless(HAS_MARKDOWN_IT, 'markdown-it-py is not installed')
+class TestRendererConformance(unittest.TestCase):
+    def test_engines_create_the_same_html(self):
+        output = {engine: convert_engine(engine) for engine in engines}
+        files = {engine: get_html_files(folder) for engine, folder in output.items()}
+
+        self.assertEqual(sorted(files['python-markdown'].keys()), sorted(files['markdown-it'].keys()), msg="the engines created other html files")
+        self.assertIn('Markdown features.html', files['markdown-it'].keys())
+
+        for rel_path in sorted(files['python-markdown'].keys()):
+            if rel_path in known_differences:
+                continue
+
+            with self.subTest(rel_path=rel_path):
+                expected = normalize_html(files['python-markdown'][rel_path].read_text(encoding='utf-8'))
+                actual = normalize_html(files['markdown-it'][rel_path].read_text(encoding='utf-8'))
+                diff = '\n'.join(difflib.unified_diff(expected, actual, 'python-markdown', 'markdown-it', lineterm=''))
+                self.assertEqual(expected, actual, msg=f"{rel_path} differs between the markdown engines:\n{diff}")
+
+
+if __name__ == '__main__':
+    unittest.main()
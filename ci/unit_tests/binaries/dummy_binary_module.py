@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+''' Dummy binary module, used as a test fixture for both binary_protocol values.
+
+    cli:     dummy_binary_module.py <requires|provides|alters>
+             dummy_binary_module.py <accept|run> <module_data_folder> <instance_id>
+    jsonrpc: dummy_binary_module.py serve
+             The same methods, plus "requests", which returns how many times each of the other methods was called.
+'''
+
+import sys
+import json
+from pathlib import Path
+
+requests = {}
+
+
+def handle(method, params):
+    if method == "requests":
+        return requests
+    requests[method] = requests.get(method, 0) + 1
+
+    if method == "requires":
+        return []
+    if method == "provides":
+        return ["dummy_output.json"]
+    if method == "alters":
+        return []
+    if method == "accept":
+        return {"result": True}
+    if method == "run":
+        module_data_folder, instance_id = params
+        with open(Path(module_data_folder).joinpath("dummy_output.json"), "w") as f:
+            f.write(json.dumps({"instance_id": instance_id}))
+        return {"result": None}
+    raise ValueError(f"unknown method {method}")
+
+
+def serve():
+    for line in sys.stdin:
+        request = json.loads(line)
+        response = {"jsonrpc": "2.0", "id": request["id"]}
+        try:
+            response["result"] = handle(request["method"], request["params"])
+        except ValueError as err:
+            response["error"] = {"code": -32601, "message": str(err)}
+        print(json.dumps(response), flush=True)
+
+
+if __name__ == "__main__":
+    if sys.argv[1] == "serve":
+        serve()
+    else:
+        print(json.dumps(handle(sys.argv[1], sys.argv[2:])))
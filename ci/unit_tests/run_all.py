@@ -11,6 +11,10 @@ from unit_tests.tests_md_to_html.codeblocks_in_footnote import run_tests as test
 from unit_tests.tests_note_to_md.inline_tags import run_tests as test_inline_tags
 from unit_tests.tests_note_to_md.obs_img_to_md import run_tests as test_obs_img_to_md
 from unit_tests.tests_post_processing.obs_callout_to_markdown_callout import run_tests as test_obs_callout_to_markdown_callout
+from unit_tests.tests_modules.binary_module import run_tests as test_binary_module
+from unit_tests.tests_modules.modfile_store import run_tests as test_modfile_store
+from unit_tests.tests_modules.result_cache import run_tests as test_result_cache
+from unit_tests.tests_core.document_cache import run_tests as test_document_cache
 
 os.environ["TESTS_FAILED"] = "0"
 
@@ -18,6 +22,10 @@ test_codeblocks_in_footnote()
 test_inline_tags()
 test_obs_img_to_md()
 test_obs_callout_to_markdown_callout()
+test_binary_module()
+test_modfile_store()
+test_result_cache()
+test_document_cache()
 
 if (os.environ["TESTS_FAILED"] == '1'):
     sys.exit(1)
\ No newline at end of file
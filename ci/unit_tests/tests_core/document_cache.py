@@ -0,0 +1,64 @@
+''' Reads notes through the document cache (obsidianhtml/core/DocumentCache.py), and checks that changed files are read again,
+    and that the least recently used documents are dropped when the cache is full.
+    These tests don't need the picknickbasket, so unit_test_init is not imported.
+'''
+
+import sys
+import os
+import tempfile
+from pathlib import Path
+from termcolor import colored
+
+# add /obsidian-html to path
+sys.path.insert(1, str(Path(os.path.realpath(__file__)).parent.parent.parent.parent))
+
+from obsidianhtml.core.DocumentCache import DocumentCache
+
+
+def check(name, output, expected_output):
+    if output != expected_output:
+        print(colored(f"X  {name}", 'red'))
+        print(f"    - Expected:\n{expected_output}")
+        print(f"    - Got:\n{output}")
+        os.environ["TESTS_FAILED"] = "1"
+    else:
+        print(colored(f"✓  {name}", 'green'))
+
+
+def run_tests():
+    with tempfile.TemporaryDirectory() as folder:
+        note_a = Path(folder).joinpath("a.md")
+        note_b = Path(folder).joinpath("b.md")
+        note_a.write_text("---\ntags: [a]\n---\n# A\n")
+        note_b.write_text("# B\n")
+
+        cache = DocumentCache(max_size=1024 * 1024)
+        document = cache.get(note_a)
+        check("text is the contents of the file", document.text, "---\ntags: [a]\n---\n# A\n")
+        check("body is the text without frontmatter", document.body, "# A\n")
+
+        check("unchanged file is read from the cache", cache.get(note_a) is document, True)
+        check("hits and misses are counted", (cache.stats["hits"], cache.stats["misses"]), (1, 1))
+
+        note_a.write_text("# A, but longer\n")
+        check("changed file is read again", cache.get(note_a).body, "# A, but longer\n")
+
+        # make room for exactly one document
+        cache = DocumentCache(max_size=0)
+        cache.max_size = cache.get(note_a).size
+        check("documents larger than the cache are not kept", len(cache.documents), 0)
+
+        cache.get(note_a)
+        cache.get(note_b)
+        check("least recently used document is dropped", list(cache.documents.keys()), [note_b.as_posix()])
+        check("evictions are counted", cache.stats["evictions"], 1)
+        check("size is kept up to date", cache.size, cache.get(note_b).size)
+
+
+if __name__ == "__main__":
+    os.environ["TESTS_FAILED"] = "0"
+
+    run_tests()
+
+    if (os.environ["TESTS_FAILED"] == '1'):
+        sys.exit(1)
@@ -27,7 +27,7 @@ def run_tests():
         'input'  : get_input_as_str(paths, 'codeblocks_in_footnote'),
         'output' : ''
     }
-    res = md2html.pythonmarkdown_convert_md_to_html(pb, case['input'], rel_dst_path='')
+    res = md2html.convert_md_to_html(pb, case['input'], rel_dst_path='')
     if '<code>' in res:
         print_succes(case)
     else:
@@ -0,0 +1,86 @@
+''' Runs ci/unit_tests/binaries/dummy_binary_module.py as a binary module, with both binary_protocol values.
+    These tests don't need the picknickbasket, so unit_test_init is not imported.
+'''
+
+import sys
+import os
+import json
+import tempfile
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from termcolor import colored
+
+# add /obsidian-html to path
+sys.path.insert(1, str(Path(os.path.realpath(__file__)).parent.parent.parent.parent))
+
+from obsidianhtml.modules.builtin.binary import BinaryModule
+from obsidianhtml.modules.base_classes.binary_process import get_binary_process, stop_binary_processes
+
+binary_path = Path(os.path.realpath(__file__)).parent.parent.joinpath("binaries/dummy_binary_module.py").as_posix()
+
+
+def check(name, output, expected_output):
+    if output != expected_output:
+        print(colored(f"X  {name}", 'red'))
+        print(f"    - Expected:\n{expected_output}")
+        print(f"    - Got:\n{output}")
+        os.environ["TESTS_FAILED"] = "1"
+    else:
+        print(colored(f"✓  {name}", 'green'))
+
+
+def get_module(module_data_folder, protocol):
+    module = BinaryModule(module_data_folder=module_data_folder, module_name="dummy_binary_module")
+    module.__verbosity__overwrite__ = "error"
+    module.set_binary(binary_path, "run", protocol=protocol)
+    return module
+
+
+def run_tests():
+    for protocol in ("cli", "jsonrpc"):
+        with tempfile.TemporaryDirectory() as module_data_folder:
+            module = get_module(module_data_folder, protocol)
+
+            check(f"[{protocol}] provides is read from the binary", module.provides_files(), ("dummy_output.json",))
+            check(f"[{protocol}] accept returns the result of the binary", module.accept(module_data_folder), True)
+
+            module.run()
+            with open(Path(module_data_folder).joinpath("dummy_output.json")) as f:
+                output = json.loads(f.read())
+            check(f"[{protocol}] run is passed the instance id", output["instance_id"], module.instance_id)
+
+    # all calls above and below go to the same process, which is only asked for its declarations once
+    with tempfile.TemporaryDirectory() as module_data_folder:
+        for i in range(10):
+            module = get_module(module_data_folder, "jsonrpc")
+            module.requires_files()
+            module.provides_files()
+            module.accept(module_data_folder)
+
+        requests = get_binary_process(binary_path).call("requests", [])
+        check("[jsonrpc] declarations are cached, other calls are not", requests, {"provides": 1, "accept": 11, "run": 1, "requires": 1})
+
+    # with module_jobs > 1, modules call the process from several threads at the same time
+    with tempfile.TemporaryDirectory() as module_data_folder:
+        def accept(i):
+            return get_module(module_data_folder, "jsonrpc").accept(module_data_folder)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(accept, range(100)))
+        check("[jsonrpc] concurrent calls each get their own answer", results, [True] * 100)
+
+        requests = get_binary_process(binary_path).call("requests", [])
+        check("[jsonrpc] concurrent calls go to the same process", requests["accept"], 111)
+
+    process = get_binary_process(binary_path).process
+    stop_binary_processes()
+    check("[jsonrpc] binary exits when the build is done", process.poll(), 0)
+
+
+if __name__ == "__main__":
+    os.environ["TESTS_FAILED"] = "0"
+
+    run_tests()
+
+    if (os.environ["TESTS_FAILED"] == '1'):
+        sys.exit(1)
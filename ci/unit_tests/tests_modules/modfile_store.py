@@ -0,0 +1,103 @@
+''' Writes and reads json modfiles through the in-memory modfile store (obsidianhtml/modules/handlers/modfile_store.py),
+    and checks that this gives the same results as going through the disk did.
+    These tests don't need the picknickbasket, so unit_test_init is not imported.
+'''
+
+import sys
+import os
+import json
+import tempfile
+from pathlib import Path
+from datetime import date
+from termcolor import colored
+
+# add /obsidian-html to path
+sys.path.insert(1, str(Path(os.path.realpath(__file__)).parent.parent.parent.parent))
+
+from obsidianhtml.modules.base_classes import ObsidianHtmlModule
+from obsidianhtml.modules.handlers.modfile_store import modfile_store
+
+
+class StoreTestModule(ObsidianHtmlModule):
+    @staticmethod
+    def requires():
+        return tuple(["index/files.json"])
+
+    @staticmethod
+    def provides():
+        return tuple(["index/files.json"])
+
+    @staticmethod
+    def alters():
+        return tuple()
+
+    def accept(self, module_data_folder):
+        return True
+
+    def run(self):
+        pass
+
+
+def check(name, output, expected_output):
+    if output != expected_output:
+        print(colored(f"X  {name}", 'red'))
+        print(f"    - Expected:\n{expected_output}")
+        print(f"    - Got:\n{output}")
+        os.environ["TESTS_FAILED"] = "1"
+    else:
+        print(colored(f"✓  {name}", 'green'))
+
+
+def get_module(module_data_folder, keep_module_file_versions):
+    Path(module_data_folder).joinpath("config.yml").write_text(f"keep_module_file_versions: {keep_module_file_versions}\nverbosity: error\n")
+    Path(module_data_folder).joinpath("guid.txt").write_text("test")
+    os.environ["OBS_MODULE_DATA_FOLDER"] = module_data_folder
+
+    module = StoreTestModule(module_data_folder=module_data_folder, module_name="store_test_module")
+    module.__verbosity__overwrite__ = "error"
+    return module
+
+
+def run_tests():
+    files = [{"path": Path("/vault/note.md"), "modified": date(2024, 1, 2), "tags": ("a", "b"), "links": {1: "other.md"}}]
+
+    # write the modfile without the store, to compare with
+    with tempfile.TemporaryDirectory() as module_data_folder:
+        module = get_module(module_data_folder, True)
+        module.modfile("index/files.json", files).to_json().write()
+        modfile_store.clear()
+
+        expected_text = Path(module_data_folder).joinpath("index/files.json").read_text()
+        expected_files = module.modfile("index/files.json").read().from_json()
+
+    with tempfile.TemporaryDirectory() as module_data_folder:
+        module = get_module(module_data_folder, False)
+        module.modfile("index/files.json", files).to_json().write()
+
+        check("json modfile is kept in memory", Path(module_data_folder).joinpath("index/files.json").exists(), False)
+        check("modfile in memory exists", module.modfile("index/files.json").exists(), True)
+
+        output = module.modfile("index/files.json").read().from_json()
+        check("reading from memory returns the same as reading from disk", output, expected_files)
+
+        output[0]["path"] = "changed"
+        check("changing what was read does not change the modfile", module.modfile("index/files.json").read().from_json(), expected_files)
+
+        check("modfile text is the same as on disk", module.modfile("index/files.json").read().text(), expected_text)
+
+        modfile_store.flush()
+        check("flush writes the modfile to disk", Path(module_data_folder).joinpath("index/files.json").read_text(), expected_text)
+
+        module.modfile("index/files.json", "[]").write()
+        check("writing text replaces the modfile in memory", module.modfile("index/files.json").read().from_json(), [])
+
+    modfile_store.clear()
+
+
+if __name__ == "__main__":
+    os.environ["TESTS_FAILED"] = "0"
+
+    run_tests()
+
+    if (os.environ["TESTS_FAILED"] == '1'):
+        sys.exit(1)
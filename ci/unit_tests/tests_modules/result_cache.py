@@ -0,0 +1,126 @@
+''' Runs parse_metadata and hydrate_file_list twice on a small vault with toggles/cache_module_results enabled, and checks that the second
+    run restores the same modfiles from the module result cache (obsidianhtml/modules/result_cache.py), and when it may not.
+    These tests don't need the picknickbasket, so unit_test_init is not imported.
+'''
+
+import sys
+import os
+import json
+import yaml
+import tempfile
+from pathlib import Path
+from termcolor import colored
+
+# add /obsidian-html to path
+sys.path.insert(1, str(Path(os.path.realpath(__file__)).parent.parent.parent.parent))
+
+from obsidianhtml.lib import OpenIncludedFile
+from obsidianhtml.modules.controller import run_module
+from obsidianhtml.modules.handlers.modfile_store import modfile_store
+
+
+def check(name, output, expected_output):
+    if output != expected_output:
+        print(colored(f"X  {name}", 'red'))
+        print(f"    - Expected:\n{expected_output}")
+        print(f"    - Got:\n{output}")
+        os.environ["TESTS_FAILED"] = "1"
+    else:
+        print(colored(f"✓  {name}", 'green'))
+
+
+def create_vault(vault_folder):
+    notes = {
+        "index.md": "---\ntags: [entrypoint]\n---\n# Index\n[[note]]\n",
+        "note.md": "---\ntitle: A note\n---\nText with an #inline_tag\n",
+        "folder/other.md": "# Other\n",
+    }
+    for rel_path, text in notes.items():
+        Path(vault_folder).joinpath(rel_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(vault_folder).joinpath(rel_path).write_text(text)
+    return [Path(vault_folder).joinpath(rel_path).as_posix() for rel_path in notes]
+
+
+def get_config(**changes):
+    config = yaml.safe_load(OpenIncludedFile("defaults_config.yml"))
+    config["verbosity"] = "error"
+    config["toggles"]["cache_module_results"] = True
+    config.update(changes)
+    return config
+
+
+def run_modules(tmp_folder, files, config):
+    """Runs the modules in a new module data folder, as every build does, and returns the modfiles that they wrote and whether they were restored"""
+    modfile_store.clear()
+    module_data_folder = tempfile.mkdtemp(dir=tmp_folder)
+    os.environ["OBS_MODULE_DATA_FOLDER"] = module_data_folder
+
+    vault_folder = Path(tmp_folder).joinpath("vault").as_posix()
+    output_folder = Path(tmp_folder).joinpath("output").as_posix()
+    paths = {
+        "appdir": Path(tmp_folder).joinpath("appdir").as_posix(),
+        "input_folder": vault_folder,
+        "original_input_folder": vault_folder,
+        "entrypoint": f"{vault_folder}/index.md",
+        "rel_obsidian_entrypoint": "index.md",
+        "md_folder": f"{output_folder}/md",
+        "rel_md_entrypoint_path": "index.md",
+        "html_output_folder": f"{output_folder}/html",
+    }
+    Path(module_data_folder).joinpath("config.yml").write_text(yaml.dump(config))
+    Path(module_data_folder).joinpath("guid.txt").write_text("test")
+    Path(module_data_folder).joinpath("paths.json").write_text(json.dumps(paths))
+    Path(module_data_folder).joinpath("index").mkdir()
+    Path(module_data_folder).joinpath("index/files.json").write_text(json.dumps(files))
+    Path(module_data_folder).joinpath("index/markdown_files.json").write_text(json.dumps(files))
+
+    output = {}
+    cache_hits = {}
+    for module_name, rel_path in (("parse_metadata", "index/metadata.json"), ("hydrate_file_list", "index/files_annotated.json")):
+        result = run_module(module_name=module_name, module_data_folder=module_data_folder, meta_modules_post=[], instantiated_modules={}, verbosity="error")
+        cache_hits[module_name] = result.cache_hit
+        output[rel_path] = modfile_store.get_text(f"{module_data_folder}/{rel_path}")
+
+    modfile_store.clear()
+    return output, cache_hits
+
+
+def run_tests():
+    with tempfile.TemporaryDirectory() as tmp_folder:
+        files = create_vault(Path(tmp_folder).joinpath("vault"))
+        config = get_config()
+
+        expected_output, cache_hits = run_modules(tmp_folder, files, config)
+        check("first run is a miss", cache_hits, {"parse_metadata": False, "hydrate_file_list": False})
+
+        output, cache_hits = run_modules(tmp_folder, files, config)
+        check("second run is a hit", cache_hits, {"parse_metadata": True, "hydrate_file_list": True})
+        check("restored modfiles are the same as the ones that were written", output, expected_output)
+
+        # a change in the vault
+        stat = os.stat(files[1])
+        os.utime(files[1], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        output, cache_hits = run_modules(tmp_folder, files, config)
+        check("touching a note is a miss", cache_hits, {"parse_metadata": False, "hydrate_file_list": False})
+
+        # a change in the config
+        config["toggles"]["relative_path_md"] = not config["toggles"]["relative_path_md"]
+        output, cache_hits = run_modules(tmp_folder, files, config)
+        check("changing the config is a miss", cache_hits, {"parse_metadata": False, "hydrate_file_list": False})
+
+        # the number of jobs does not change the output
+        config["jobs"] = 4
+        config["module_jobs"] = 2
+        output, cache_hits = run_modules(tmp_folder, files, config)
+        check("changing only jobs and module_jobs is a hit", cache_hits, {"parse_metadata": True, "hydrate_file_list": True})
+
+    os.environ.pop("OBS_MODULE_DATA_FOLDER", None)
+
+
+if __name__ == "__main__":
+    os.environ["TESTS_FAILED"] = "0"
+
+    run_tests()
+
+    if (os.environ["TESTS_FAILED"] == '1'):
+        sys.exit(1)
@@ -1,4 +1,3 @@
-import frontmatter
 import gzip
 import yaml
 
@@ -7,6 +6,7 @@ import regex as re  # regex string finding/replacing
 from urllib.parse import unquote
 
 from .. import md2html
+from .. import note2md
 
 from ..lib import CreateStaticFilesFolders, simpleHash, get_html_url_prefix, slugify
 
@@ -25,6 +25,7 @@ from ..compiler.HTML import compile_navbar_links, create_folder_navigation_view,
 from ..compiler.Templating import ExportStaticFiles
 
 from ..modules import controller as module_controller
+from ..modules.scheduler import ModuleScheduler, get_module_jobs
 from ..modules.lib import verbose_enough
 
 
@@ -63,20 +64,33 @@ def ConvertVault(config_yaml_location=""):
 
     def run_module(m):
         module_controller.run_module(
-            module_name=m["name"], method=m["method"], persistent=m["persistent"], module_source=m["file"], module_binary=m["binary"], module_class_name=m["module_class"], **defaults
+            module_name=m["name"],
+            method=m["method"],
+            persistent=m["persistent"],
+            module_source=m["file"],
+            module_binary=m["binary"],
+            module_binary_protocol=m["binary_protocol"],
+            module_class_name=m["module_class"],
+            **defaults,
         )
 
-    for module_listing in module_list["preparation"]:
-        run_module(module_listing)
-    # for module_listing in module_list["indexing"]:
-    #     run_module(module_listing)
-    for module_listing in module_list["finalize"]:
-        run_module(module_listing)
+    # modules that don't depend on each other's modfiles are run concurrently when module_jobs > 1
+    scheduler = ModuleScheduler(run_module, module_data_folder, module_jobs=get_module_jobs(module_data_folder, cfg), verbosity=verbosity)
+    scheduler.run_phase("preparation", module_list["preparation"])
+    # scheduler.run_phase("indexing", module_list["indexing"])
+    scheduler.run_phase("finalize", module_list["finalize"])
 
     # Load input files into file tree
     # ---------------------------------------------------------
     Index(pb)
 
+    # Keep the notes that are read in memory, as most notes are loaded more than once
+    pb.init_document_cache()
+
+    # Load the build manifest of the previous run, so that unchanged notes/pages can be skipped
+    if pb.gc("toggles/incremental_build", cached=True):
+        pb.init_build_manifest()
+
     # Convert
     # ---------------------------------------------------------
     convert_obsidian_notes_to_markdown(pb)
@@ -85,6 +99,11 @@ def ConvertVault(config_yaml_location=""):
     export_user_files(pb)
     run_post_processing(pb)
 
+    if pb.build_manifest is not None:
+        pb.build_manifest.save()
+
+    pb.document_cache.print_stats(pb.verbosity)
+
     # Wrap up
     # ---------------------------------------------------------
     if pb.gc("toggles/compile_md") or pb.gc("toggles/compile_html"):
@@ -119,17 +138,20 @@ def convert_obsidian_notes_to_markdown(pb):
         if pb.gc("toggles/force_filename_to_lowercase", cached=True):
             rel_entry_path_str = rel_entry_path_str.lower()
 
+        # Notes are converted in worker processes when jobs > 1
+        queue = note2md.NoteConversionQueue(pb, jobs=pb.gc("jobs", cached=True))
+
         # Start conversion
         entrypoint_file_object = pb.index.files[rel_entry_path_str]
         pb.init_state(action="n2m", loop_type="note", current_fo=entrypoint_file_object, subroutine="crawl_obsidian_notes_and_convert_to_markdown")
-        crawl_obsidian_notes_and_convert_to_markdown(entrypoint_file_object, pb)
+        crawl_obsidian_notes_and_convert_to_markdown(entrypoint_file_object, pb, queue)
         pb.reset_state()
 
         # also do the tags page if it is not the index, otherwise this page will never be hit
         if pb.gc("toggles/features/create_index_from_tags/enabled") and not pb.gc("toggles/features/create_index_from_tags/use_as_homepage"):
             entrypoint_file_object = pb.index.files[pb.gc("toggles/features/create_index_from_tags/rel_output_path")]
             pb.init_state(action="n2m", loop_type="note", current_fo=entrypoint_file_object, subroutine="crawl_obsidian_notes_and_convert_to_markdown")
-            crawl_obsidian_notes_and_convert_to_markdown(entrypoint_file_object, pb)
+            crawl_obsidian_notes_and_convert_to_markdown(entrypoint_file_object, pb, queue)
             pb.reset_state()
 
         # Keep going until all other files are processed
@@ -144,11 +166,18 @@ def convert_obsidian_notes_to_markdown(pb):
                 if pb.gc("toggles/verbose_printout", cached=True) is True:
                     print(f"\t\t{i}/{l} - " + str(fo.path["note"]["file_absolute_path"]))
                 pb.init_state(action="n2m_process_all", loop_type="note", current_fo=fo, subroutine="crawl_obsidian_notes_and_convert_to_markdown")
-                crawl_obsidian_notes_and_convert_to_markdown(fo, pb, log_level=2)
+                crawl_obsidian_notes_and_convert_to_markdown(fo, pb, queue, log_level=2)
                 pb.reset_state()
             if verbose_enough("info", pb.verbosity):
                 print("\t< FEATURE: PROCESS ALL: Done")
 
+        queue.shutdown()
+
+        pb.inclusion_cache.print_stats(pb.verbosity)
+
+        if pb.build_manifest is not None:
+            pb.build_manifest.print_stats("notes")
+
 
 def convert_markdown_to_html(pb):
     if not pb.gc("toggles/compile_html", cached=True):
@@ -160,6 +189,10 @@ def convert_markdown_to_html(pb):
     # Prepare reusable blocks
     compile_navbar_links(pb)
 
+    # Pages are rendered in worker processes when jobs > 1, and kept in memory until the second pass
+    pb.html_page_store = md2html.HtmlPageStore(max_size=pb.gc("html_page_store_size_mb", cached=True) * 1024 * 1024)
+    pb.html_render_queue = md2html.HtmlRenderQueue(pb, jobs=pb.gc("jobs", cached=True))
+
     # Force search to lowercase
     rel_entry_path_str = pb.paths["rel_md_entrypoint_path"].as_posix()
     if pb.gc("toggles/force_filename_to_lowercase", cached=True):
@@ -218,6 +251,14 @@ def convert_markdown_to_html(pb):
         if verbose_enough("info", pb.verbosity):
             print("\t< FEATURE: PROCESS ALL: Done")
 
+    # Wait for all pages to be rendered
+    pb.html_render_queue.finish()
+
+    highlight_cache = md2html.get_highlight_cache(md2html.get_markdown_settings(pb))
+    if highlight_cache is not None:
+        highlight_cache.prune(pb.gc("highlight_cache_disk_size_mb", cached=True) * 1024 * 1024)
+        highlight_cache.print_stats(pb.verbosity)
+
     # [??] Second pass
     # ------------------------------------------
     # Some code can only be generated when all the notes have already been created.
@@ -228,6 +269,7 @@ def convert_markdown_to_html(pb):
 
     # Make lookup so that we can easily find the url of a node
     pb.index.network_tree.compile_node_lookup()
+    pb.index.network_tree.compile_inward_link_lookup()
 
     # Prep some data outside of the loop
     pb.index.compile_html_relpath_lookup_table()
@@ -260,8 +302,7 @@ def convert_markdown_to_html(pb):
 
         # get html content
         try:
-            with open(dst_abs_path, "r", encoding="utf-8") as f:
-                html = f.read()
+            html = pb.html_page_store.read(dst_abs_path)
         except:
             continue
 
@@ -271,155 +312,76 @@ def convert_markdown_to_html(pb):
             continue
         node_id = m.group(0)
         node = pb.index.network_tree.node_lookup[node_id]
-        html = re.sub("\{_obsidian_html_node_id_pattern_:" + re.escape(node_id) + "}", "", html)
 
         # Get tags
         tags = md2html.get_tags(node)
 
-        # Fill in side pane content
+        # Get side pane content
         left_pane = get_side_pane_html(pb, "left_pane", node)
-        html = html.replace("{left_pane}", left_pane)
-
         right_pane = get_side_pane_html(pb, "right_pane", node)
-        html = html.replace("{right_pane}", right_pane)
 
-        # Compile backlinks list
-        if pb.gc("toggles/features/backlinks/enabled", cached=True):
-            html = md2html.insert_backlinks(pb, html, node_id, page_depth)
-
-        # Insert tags footer
-        html = md2html.insert_tags_footer(pb, html, tags, fo.md.metadata)
-
-        # add breadcrumbs
-        # ------------------------------------------------------------------------
+        # Get breadcrumbs
+        breadcrumbs = None
         if pb.gc("toggles/features/breadcrumbs/enabled", cached=True):
-            html_url_prefix = pb.gc("html_url_prefix", cached=True)
+            breadcrumbs = get_breadcrumbs_snippet(pb, node, folder_og_name_lut)
+
+        # Reuse the output of the previous run when none of the cross-page inputs of the page have changed
+        manifest_inputs = None
+        if pb.build_manifest is not None:
+            manifest_inputs = pb.build_manifest.get_second_pass_inputs(html, node_id, tags, fo.md.metadata, left_pane + right_pane, breadcrumbs)
+            cached_html = pb.build_manifest.get_reusable_second_pass_output(fo, manifest_inputs)
+            if cached_html is not None:
+                pb.html_page_store.write(dst_abs_path, cached_html)
+                continue
+
+        # Collect the content of all placeholders
+        # ------------------------------------------------------------------------
+        snippets = {}
+        snippets["{_obsidian_html_node_id_pattern_:" + node_id + "}"] = ""
 
-            if node["url"] == f"{html_url_prefix}/index.html":
-                # Don't create breadcrumbs for the homepage
-                snippet = ""
+        # side pane content
+        snippets["{left_pane}"] = left_pane
+        snippets["{right_pane}"] = right_pane
 
-            else:
-                # loop through all/links/along/the_way.html
+        # backlinks list
+        if pb.gc("toggles/features/backlinks/enabled", cached=True):
+            snippets["{_obsidian_html_backlinks_pattern_}"] = md2html.get_backlinks_snippet(pb, node_id, page_depth)
 
-                # set first element to be home
-                parts = [f'<a href="{html_url_prefix}/" style="color: rgb(var(--normal-text-color));">Home</a>']
+        # tags footer and inline tags
+        tags_footer, inline_tags = md2html.get_tags_footer_snippets(pb, tags, fo.md.metadata)
+        snippets["{_obsidian_html_tags_footer_pattern_}"] = tags_footer
+        snippets.update(inline_tags)
 
-                subpaths = node["url"].replace(".html", "").split("/")[1:]
+        # breadcrumbs
+        if breadcrumbs is not None:
+            snippets["{_obsidian_html_breadcrumbs_pattern_}"] = breadcrumbs
 
-                if pb.gc("toggles/force_filename_to_lowercase", cached=True):
-                    subpaths = [x.lower() for x in subpaths]
+        def fill_placeholder(match):
+            placeholder = match.group(0)
+            if placeholder in snippets:
+                return snippets[placeholder]
 
-                if html_url_prefix:
-                    # remove the parts that are part of the prefix
-                    prefix_amount = len(html_url_prefix.split("/")) - 1
-                    subpaths = subpaths[prefix_amount:]
+            # embedded search results
+            if esearch is not None and placeholder.startswith("<p>{_obsidian_html_query:"):
+                return get_embedded_search_snippet(esearch, match.group(1))
 
-                previous_url = ""
-                for i, subpath in enumerate(subpaths):
-                    subpath = unquote(subpath)
-                    if subpath in pb.index.network_tree.node_lookup:
-                        lnode = pb.index.network_tree.node_lookup[subpath]
-                    elif subpath in pb.index.network_tree.node_lookup_slug:
-                        lnode = pb.index.network_tree.node_lookup_slug[subpath]
-                    else:
-                        # try finding folder with same name in markdown folder
-                        # to get proper capitalization, even if we use slugify
-                        name = unquote(subpaths[i])
-                        if name in folder_og_name_lut:
-                            name = folder_og_name_lut[name]
-
-                        parts.append(f'<span style="color: #666;">{name}</span>')
-                        previous_url = ""
-                        continue
-
-                    url = lnode["url"]
-                    name = lnode["name"]
-
-                    # in the case of folder notes, we have the folder and note name being the
-                    # same, we don't want to print this twice in the breadcrumbs
-                    if url != previous_url:
-                        parts.append(f'<a href="{url}" ___COLOR___>{name}</a>')
-                    previous_url = url
-
-                # set all links to be normal text color except for the last link
-                parts[-1] = parts[-1].replace("___COLOR___", "")
-                for i, link in enumerate(parts):
-                    parts[i] = link.replace("___COLOR___", 'style="color: var(--normal-text-color);"')
-
-                # combine parts into snippet
-                snippet = " / ".join(parts)
-                snippet = f"""
-                <div style="width:100%; text-align: right;display: block;margin: 0.5rem;">
-                    <div style="flex:1;display: none;"></div>
-                    <div class="breadcrumbs" style="flex:1 ;padding: 0.5rem; width: fit-content;display: inline;border-radius: 0.2rem;">
-                        {snippet}
-                    </div>
-                </div>"""
+            return placeholder
 
-            html = re.sub("\{_obsidian_html_breadcrumbs_pattern_\}", snippet, html)
-
-        # add embedded search results
-        if pb.gc("toggles/features/embedded_search/enabled", cached=True):
-            query_blocks = re.findall(r"(?<=<p>{_obsidian_html_query:)(.*?)(?=\ }</p>)", html)
-            for listing in query_blocks:
-                # split listing into qualifier and user_query
-                qual, user_query = listing.split("|-|")
-
-                # found query
-                print(qual, user_query)
-
-                # search
-                res = esearch.search(user_query)
-
-                # compile html output
-                output = ""
-                if qual == "list":
-                    output = '<div class="query"><ul>\n\t' + "\n\t".join([f'<li><a href="/{x["path"]}">{x["title"]}</a></li>' for x in res]) + "\n</ul></div>"
-
-                else:
-                    output = '<div class="query">'
-                    for doc in res:
-                        # setup doc
-                        output += f'\n\t<div class="match-document">\n\t\t<div class="match-document-title">\n\t\t\t<a href="/{doc["path"]}">{doc["title"]}</a>\n\t\t</div>\n\t\t<div class="matches">'
-
-                        # Add path matches
-                        if doc["matches"]["path"]:
-                            output += '\n\t\t\t<div class="match-row">\n\t\t\t\t' + doc["matches"]["path"] + "\n\t\t\t</div>"
-
-                        # Add content mathes
-                        for match in doc["matches"]["content"]:
-                            output += f'\n\t\t\t<div class="match-row">\n\t\t\t\t{match}\n\t\t\t</div>'
-
-                        # Add tags
-                        if len(doc["matches"]["tags"]) > 0:
-                            output += '\n\t\t\t<div class="tag-box">'
-                            for match, tag in doc["matches"]["tags"]:
-                                output += f'\n\t\t\t\t<div class="match-row tag">\n\t\t\t\t\t<a href="/obs.html/tags/{tag}/index.html">{match}</a>\n\t\t\t\t</div>'
-                            output += "\n\t\t\t</div>"
-
-                        if len(doc["matches"]["tags_keyword"]) > 0:
-                            output += '\n\t\t\t<div class="tag-box">'
-                            for match, tag in doc["matches"]["tags_keyword"]:
-                                output += f'\n\t\t\t\t<div class="match-row tag keyword">\n\t\t\t\t\t<a href="/obs.html/tags/{tag}/index.html">{match}</a>\n\t\t\t\t</div>'
-                            output += "\n\t\t\t</div>"
-
-                        # close doc divs
-                        output += "\n\t\t</div>\n\t</div>"
-                    # close query div
-                    output += "\n</div>"
-
-                # replace query block with html
-                try:
-                    safe_str = re.escape("<p>{_obsidian_html_query:" + listing + " }</p>")
-                    html = re.sub(safe_str, output, html)
-                except:
-                    print(listing)
-                    raise
+        # Fill in all placeholders in one go
+        html = second_pass_placeholder_pattern.sub(fill_placeholder, html)
 
         # write result
-        with open(dst_abs_path, "w", encoding="utf-8") as f:
-            f.write(html)
+        pb.html_page_store.write(dst_abs_path, html)
+
+        if manifest_inputs is not None:
+            pb.build_manifest.record_second_pass_output(fo, manifest_inputs, html)
+
+    # write the pages that are not notes, as they are
+    pb.html_page_store.flush()
+
+    if pb.build_manifest is not None:
+        pb.build_manifest.print_stats("pages")
+        pb.build_manifest.write_report()
 
     if verbose_enough("info", pb.verbosity):
         print("\t< SECOND PASS HTML: Done")
@@ -470,6 +432,135 @@ def convert_markdown_to_html(pb):
         print("< COMPILING HTML FROM MARKDOWN CODE: Done")
 
 
+# Matches every placeholder that the second pass fills in
+second_pass_placeholder_pattern = re.compile(
+    r"\{_obsidian_html_node_id_pattern_:[^}]*\}"
+    r"|\{left_pane\}|\{right_pane\}"
+    r"|\{_obsidian_html_(?:backlinks|tags_footer|breadcrumbs)_pattern_\}"
+    r"|<code>\{_obsidian_pattern_tag_[^}]*\}</code>"
+    r"|<p>\{_obsidian_html_query:(.*?) \}</p>"
+)
+
+
+def get_embedded_search_snippet(esearch, listing):
+    # split listing into qualifier and user_query
+    qual, user_query = listing.split("|-|")
+
+    # found query
+    print(qual, user_query)
+
+    # search
+    res = esearch.search(user_query)
+
+    # compile html output
+    output = ""
+    if qual == "list":
+        output = '<div class="query"><ul>\n\t' + "\n\t".join([f'<li><a href="/{x["path"]}">{x["title"]}</a></li>' for x in res]) + "\n</ul></div>"
+
+    else:
+        output = '<div class="query">'
+        for doc in res:
+            # setup doc
+            output += f'\n\t<div class="match-document">\n\t\t<div class="match-document-title">\n\t\t\t<a href="/{doc["path"]}">{doc["title"]}</a>\n\t\t</div>\n\t\t<div class="matches">'
+
+            # Add path matches
+            if doc["matches"]["path"]:
+                output += '\n\t\t\t<div class="match-row">\n\t\t\t\t' + doc["matches"]["path"] + "\n\t\t\t</div>"
+
+            # Add content mathes
+            for match in doc["matches"]["content"]:
+                output += f'\n\t\t\t<div class="match-row">\n\t\t\t\t{match}\n\t\t\t</div>'
+
+            # Add tags
+            if len(doc["matches"]["tags"]) > 0:
+                output += '\n\t\t\t<div class="tag-box">'
+                for match, tag in doc["matches"]["tags"]:
+                    output += f'\n\t\t\t\t<div class="match-row tag">\n\t\t\t\t\t<a href="/obs.html/tags/{tag}/index.html">{match}</a>\n\t\t\t\t</div>'
+                output += "\n\t\t\t</div>"
+
+            if len(doc["matches"]["tags_keyword"]) > 0:
+                output += '\n\t\t\t<div class="tag-box">'
+                for match, tag in doc["matches"]["tags_keyword"]:
+                    output += f'\n\t\t\t\t<div class="match-row tag keyword">\n\t\t\t\t\t<a href="/obs.html/tags/{tag}/index.html">{match}</a>\n\t\t\t\t</div>'
+                output += "\n\t\t\t</div>"
+
+            # close doc divs
+            output += "\n\t\t</div>\n\t</div>"
+        # close query div
+        output += "\n</div>"
+
+    return output
+
+
+def get_breadcrumbs_snippet(pb, node, folder_og_name_lut):
+    """Returns the html of the breadcrumbs (Home / folder / note) for the given node"""
+    html_url_prefix = pb.gc("html_url_prefix", cached=True)
+
+    if node["url"] == f"{html_url_prefix}/index.html":
+        # Don't create breadcrumbs for the homepage
+        snippet = ""
+
+    else:
+        # loop through all/links/along/the_way.html
+
+        # set first element to be home
+        parts = [f'<a href="{html_url_prefix}/" style="color: rgb(var(--normal-text-color));">Home</a>']
+
+        subpaths = node["url"].replace(".html", "").split("/")[1:]
+
+        if pb.gc("toggles/force_filename_to_lowercase", cached=True):
+            subpaths = [x.lower() for x in subpaths]
+
+        if html_url_prefix:
+            # remove the parts that are part of the prefix
+            prefix_amount = len(html_url_prefix.split("/")) - 1
+            subpaths = subpaths[prefix_amount:]
+
+        previous_url = ""
+        for i, subpath in enumerate(subpaths):
+            subpath = unquote(subpath)
+            if subpath in pb.index.network_tree.node_lookup:
+                lnode = pb.index.network_tree.node_lookup[subpath]
+            elif subpath in pb.index.network_tree.node_lookup_slug:
+                lnode = pb.index.network_tree.node_lookup_slug[subpath]
+            else:
+                # try finding folder with same name in markdown folder
+                # to get proper capitalization, even if we use slugify
+                name = unquote(subpaths[i])
+                if name in folder_og_name_lut:
+                    name = folder_og_name_lut[name]
+
+                parts.append(f'<span style="color: #666;">{name}</span>')
+                previous_url = ""
+                continue
+
+            url = lnode["url"]
+            name = lnode["name"]
+
+            # in the case of folder notes, we have the folder and note name being the
+            # same, we don't want to print this twice in the breadcrumbs
+            if url != previous_url:
+                parts.append(f'<a href="{url}" ___COLOR___>{name}</a>')
+            previous_url = url
+
+        # set all links to be normal text color except for the last link
+        parts[-1] = parts[-1].replace("___COLOR___", "")
+        for i, link in enumerate(parts):
+            parts[i] = link.replace("___COLOR___", 'style="color: var(--normal-text-color);"')
+
+        # combine parts into snippet
+        snippet = " / ".join(parts)
+        snippet = f"""
+                <div style="width:100%; text-align: right;display: block;margin: 0.5rem;">
+                    <div style="flex:1;display: none;"></div>
+                    <div class="breadcrumbs" style="flex:1 ;padding: 0.5rem; width: fit-content;display: inline;border-radius: 0.2rem;">
+                        {snippet}
+                    </div>
+                </div>"""
+
+    return snippet
+
+
 def compile_rss_feed(pb):
     if not pb.gc("toggles/features/rss/enabled"):
         return
@@ -520,71 +611,78 @@ def export_user_files(pb):
 
 
 # @extra_info()
-def crawl_obsidian_notes_and_convert_to_markdown(fo: "FileObject", pb, log_level=1, iteration=0):
-    """This functions converts an obsidian note to a markdown file and calls itself on any local note links it finds in the page."""
-
-    # Don't parse if not parsable
-    if not fo.metadata["is_parsable_note"]:
+def crawl_obsidian_notes_and_convert_to_markdown(fo: "FileObject", pb, queue, log_level=1):
+    """This functions converts an obsidian note to a markdown file, and then does the same for every note that can be reached through its links.
+    The notes are converted level by level: first the note itself, then the notes it links to, then the notes those link to, and so on.
+    All notes of a level are handed to the queue at once, so that they can be converted in parallel (see note2md.NoteConversionQueue).
+    """
+    if fo.processed_ntm is True:
         return
 
-    if pb.gc("toggles/stdout_current_file", cached=True):
-        print(fo.path["note"]["file_absolute_path"].as_posix().encode("cp1252", errors="ignore"))
-
-    # Convert note to markdown
-    # ------------------------------------------------------------------
-    # Create an object that handles a lot of the logic of parsing the page paths, content, etc
-    md = fo.load_markdown_page("note")
-
-    # The bulk of the conversion process happens here
-    md.ConvertObsidianPageToMarkdownPage()
-
-    # The frontmatter was stripped from the obsidian note prior to conversion
-    # Add yaml frontmatter back in
-    md.page = (frontmatter.dumps(frontmatter.Post("", **md.metadata))) + "\n" + md.page
-
-    # Save file
-    # ------------------------------------------------------------------
-    # Create folder if necessary
-    dst_path = fo.path["markdown"]["file_absolute_path"]
-    dst_path.parent.mkdir(parents=True, exist_ok=True)
-
-    # Write markdown to file
-    with open(dst_path, "w", encoding="utf-8") as f:
-        f.write(md.page)
-
-    # Recurse for every link in the current page
-    # ------------------------------------------------------------------
-    # Don't follow links if this would exceed max note depth
-    iteration += 1
-    if pb.gc("max_note_depth") > -1 and iteration > pb.gc("max_note_depth"):
-        return
-
-    # Don't follow links when the user tells us not to
-    if "obs.html.tags" in md.metadata.keys() and "leaf_note" in md.metadata["obs.html.tags"]:
-        return
-
-    for link_fo in md.links:
-        if link_fo is False or link_fo.processed_ntm is True:
-            if pb.gc("toggles/verbose_printout", cached=True):
-                if link_fo is False:
-                    print("\t" * log_level, f"(ntm) Skipping converting {link_fo.link}, link not internal or not valid.")
-                else:
-                    print("\t" * log_level, f"(ntm) Skipping converting {link_fo.link}, already processed.")
-            continue
-
-        # Mark the file as processed so that it will not be processed again at a later stage
-        link_fo.processed_ntm = True
-
-        # Convert the note that is linked to
-        if pb.gc("toggles/verbose_printout", cached=True):
-            print(
-                "\t" * log_level,
-                f"found link {link_fo.path['note']['file_absolute_path']} (through parent {fo.path['note']['file_absolute_path']})",
-            )
-
-        pb.init_state(action="n2m", loop_type="note", current_fo=link_fo, subroutine="crawl_obsidian_notes_and_convert_to_markdown")
-        crawl_obsidian_notes_and_convert_to_markdown(link_fo, pb, log_level=log_level, iteration=iteration)
-        pb.reset_state()
+    # Mark the file as processed so that it will not be processed again at a later stage
+    fo.processed_ntm = True
+
+    level = [fo]
+    iteration = 0
+    while len(level) > 0:
+        iteration += 1
+
+        # Don't parse if not parsable
+        level = [x for x in level if x.metadata["is_parsable_note"]]
+
+        if pb.gc("toggles/stdout_current_file", cached=True):
+            for note_fo in level:
+                print(note_fo.path["note"]["file_absolute_path"].as_posix().encode("cp1252", errors="ignore"))
+
+        # Convert notes to markdown
+        # ------------------------------------------------------------------
+        results = queue.convert(level)
+
+        next_level = []
+        for note_fo, (page, metadata, links) in zip(level, results):
+            pb.init_state(action="n2m", loop_type="note", current_fo=note_fo, subroutine="crawl_obsidian_notes_and_convert_to_markdown")
+
+            # Save file
+            # ------------------------------------------------------------------
+            # Create folder if necessary
+            dst_path = note_fo.path["markdown"]["file_absolute_path"]
+            dst_path.parent.mkdir(parents=True, exist_ok=True)
+
+            # Write markdown to file
+            with open(dst_path, "w", encoding="utf-8") as f:
+                f.write(page)
+
+            # Collect the links to follow
+            # ------------------------------------------------------------------
+            # Don't follow links if this would exceed max note depth
+            if pb.gc("max_note_depth") > -1 and iteration > pb.gc("max_note_depth"):
+                continue
+
+            # Don't follow links when the user tells us not to
+            if "obs.html.tags" in metadata.keys() and "leaf_note" in metadata["obs.html.tags"]:
+                continue
+
+            for link_fo in links:
+                if link_fo is False or link_fo.processed_ntm is True:
+                    if pb.gc("toggles/verbose_printout", cached=True):
+                        if link_fo is False:
+                            print("\t" * log_level, f"(ntm) Skipping converting {link_fo.link}, link not internal or not valid.")
+                        else:
+                            print("\t" * log_level, f"(ntm) Skipping converting {link_fo.link}, already processed.")
+                    continue
+
+                # Mark the file as processed so that it will not be processed again at a later stage
+                link_fo.processed_ntm = True
+
+                if pb.gc("toggles/verbose_printout", cached=True):
+                    print(
+                        "\t" * log_level,
+                        f"found link {link_fo.path['note']['file_absolute_path']} (through parent {note_fo.path['note']['file_absolute_path']})",
+                    )
+
+                next_level.append(link_fo)
+
+        level = next_level
 
 
 # @extra_info()
@@ -0,0 +1,398 @@
+import json
+import hashlib
+
+from .. import note2md
+from ..lib import get_build_cache_folder_path, OpenIncludedFile
+from ..modules.lib import verbose_enough
+
+
+class BuildManifest:
+    """Keeps track of what the conversion of each note/page depended on in the previous run, so that notes and pages whose
+    inputs did not change can reuse their previous output instead of being converted again.
+
+    Note -> markdown, per note we record:
+    - the hash of the note's contents
+    - the hashes of all the notes that were included (recursively)
+    - every link lookup that was done, together with the file it resolved to (so that added/removed files invalidate the note)
+    - the resulting markdown, the links to other notes, the files that were copied and the resulting metadata
+
+    Markdown -> html, per page we record:
+    - first pass: the hashes of the markdown, metadata, graph node and templates, plus the link lookups, copied files and links
+    - second pass: the hashes of the cross-page inputs (backlinks, tags, side panes, breadcrumbs, embedded search)
+    - the html output of both passes
+
+    Every page that is rendered again is listed, with the inputs that changed, in the build report (see self.write_report()).
+
+    The manifest is stored in the appdir, as the module data folder and the output folders are cleared at the start of every run.
+    A different config, or a different version of obsidianhtml, invalidates the whole manifest.
+    """
+
+    manifest_version = 2
+
+    def __init__(self, pb):
+        self.pb = pb
+
+        self.folder_path = get_build_cache_folder_path(pb.paths)
+        self.manifest_path = self.folder_path.joinpath("manifest.json")
+        self.report_path = self.folder_path.joinpath("build_report.json")
+        self.objects_folder_path = self.folder_path.joinpath("objects")
+
+        self.config_hash = self.get_config_hash()
+        self.template_hash = None  # set by self.get_template_hash(), the templates are only known at the start of the html conversion
+        self.search_hash = None  # set by self.get_second_pass_inputs(), the search data is only complete after the first pass
+
+        # entries of the previous run, and of the current run
+        self.notes = {}
+        self.new_notes = {}
+        self.pages = {}
+        self.new_pages = {}
+
+        self.recording = None  # entry that is being filled in while a note/page is converted, see self.start_recording()
+        self.stats = {"notes": {"reused": 0, "converted": 0}, "pages": {"reused": 0, "converted": 0}}
+        self.report = []
+
+        self._file_hashes = {}
+
+        self.load()
+
+    def get_config_hash(self):
+        # the number of jobs does not change the output, so changing it should not invalidate the manifest
+        config = {key: value for key, value in self.pb.config.items() if key not in ("jobs", "module_jobs")}
+        return self.hash_str(json.dumps(config, sort_keys=True, default=str) + OpenIncludedFile("version"))
+
+    def get_template_hash(self):
+        if self.template_hash is None:
+            pb = self.pb
+            graph_template = pb.graph_template if pb.gc("toggles/features/graph/enabled", cached=True) else ""
+            self.template_hash = self.hash_str("\n".join([pb.html_template, graph_template, pb.dynamic_inclusions, "\n".join(pb.navbar_links)]))
+        return self.template_hash
+
+    def load(self):
+        if not self.manifest_path.exists():
+            return
+
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.loads(f.read())
+        except (OSError, ValueError):
+            return
+
+        if manifest.get("manifest_version") != self.manifest_version or manifest.get("config_hash") != self.config_hash:
+            if verbose_enough("info", self.pb.verbosity):
+                print("\t> INCREMENTAL BUILD: config or version changed, converting everything")
+            return
+
+        self.notes = manifest["notes"]
+        self.pages = manifest["pages"]
+
+    def save(self):
+        # keep entries of notes/pages that were not visited this run, they might be visited again in a later run
+        notes = {k: v for k, v in self.notes.items() if k in self.pb.index.files}
+        notes.update(self.new_notes)
+        pages = {k: v for k, v in self.pages.items() if k in self.pb.index.files}
+        pages.update(self.new_pages)
+
+        manifest = {"manifest_version": self.manifest_version, "config_hash": self.config_hash, "notes": notes, "pages": pages}
+
+        self.folder_path.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(manifest))
+        tmp_path.replace(self.manifest_path)
+
+        # remove outputs that are no longer referenced
+        referenced = set(x["output"] for x in notes.values())
+        for entry in pages.values():
+            referenced.add(entry["output"])
+            if "second_pass" in entry:
+                referenced.add(entry["second_pass"]["output"])
+
+        if self.objects_folder_path.exists():
+            for path in self.objects_folder_path.iterdir():
+                if path.name not in referenced:
+                    path.unlink()
+
+    def print_stats(self, stage):
+        if verbose_enough("info", self.pb.verbosity):
+            stats = self.stats[stage]
+            total = stats["reused"] + stats["converted"]
+            print(f"\t> INCREMENTAL BUILD: reused {stats['reused']} of {total} {stage}, converted {stats['converted']}")
+
+    def write_report(self):
+        """Write the list of pages that were rendered again, and why, to the build cache folder"""
+        self.folder_path.mkdir(parents=True, exist_ok=True)
+        with open(self.report_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(self.report, indent=2))
+
+        if verbose_enough("info", self.pb.verbosity):
+            pages = set(x["page"] for x in self.report)
+            print(f"\t> INCREMENTAL BUILD: rendered {len(pages)} page(s), see {self.report_path.as_posix()} for the reasons")
+        if self.pb.gc("toggles/verbose_printout", cached=True):
+            for item in self.report:
+                print(f"\t\t{item['page']} ({item['pass']}): {', '.join(item['reasons'])}")
+
+    # Helpers
+    # --------------------------------------------------------------------
+    def get_file_key(self, fo):
+        return self.pb.index.get_file_key(fo)
+
+    @staticmethod
+    def hash_str(text):
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def hash_file(self, path):
+        key = path.as_posix()
+        if key not in self._file_hashes:
+            with open(path, "rb") as f:
+                self._file_hashes[key] = hashlib.sha1(f.read()).hexdigest()
+        return self._file_hashes[key]
+
+    def lookup(self, method, link):
+        if method == "FindFile":
+            return self.pb.FileFinder.FindFile(link, self.pb)[0]
+        return self.pb.FileFinder.GetObsidianFilePath(link, self.pb)["rtr_path_str"]
+
+    def lookups_changed(self, entry):
+        for method, lookups in entry["lookups"].items():
+            for link, rel_path_str in lookups.items():
+                if self.lookup(method, link) != rel_path_str:
+                    return True
+        return False
+
+    def read_object(self, object_hash):
+        with open(self.objects_folder_path.joinpath(object_hash), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def write_object(self, contents):
+        object_hash = self.hash_str(contents)
+        path = self.objects_folder_path.joinpath(object_hash)
+        if not path.exists():
+            self.objects_folder_path.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(contents)
+        return object_hash
+
+    def object_exists(self, object_hash):
+        return self.objects_folder_path.joinpath(object_hash).exists()
+
+    @staticmethod
+    def get_changed_inputs(entry, inputs):
+        if entry is None:
+            return ["new page"]
+        return [f"{key} changed" for key, value in inputs.items() if entry["inputs"].get(key) != value]
+
+    # Note -> markdown
+    # --------------------------------------------------------------------
+    def get_reusable_entry(self, fo):
+        """Returns the entry of the previous run if none of the inputs of the note changed, otherwise None"""
+        entry = self.notes.get(self.get_file_key(fo))
+        if entry is None:
+            return None
+
+        files = self.pb.index.files
+
+        if entry["hash"] != self.hash_file(fo.path["note"]["file_absolute_path"]):
+            return None
+
+        for key, hash in entry["inclusions"].items():
+            if key not in files or self.hash_file(files[key].path["note"]["file_absolute_path"]) != hash:
+                return None
+
+        if self.lookups_changed(entry):
+            return None
+
+        for key in entry["links"] + entry["copied_files"]:
+            if key not in files:
+                return None
+
+        if not self.object_exists(entry["output"]):
+            return None
+
+        return entry
+
+    def reuse_entry(self, fo, entry):
+        """Redo the side effects of the conversion of the note, and return the markdown, metadata and links of the previous run"""
+        files = self.pb.index.files
+
+        page = self.read_object(entry["output"])
+
+        for key in entry["copied_files"]:
+            files[key].copy_file("ntm")
+
+        # write the metadata back to pb.metadata, as the markdown -> html flow reads it from there
+        metadata = note2md.restore_note_metadata(self.pb, fo, entry["metadata"])
+
+        links = [files[key] for key in entry["links"]]
+
+        self.new_notes[self.get_file_key(fo)] = entry
+        self.stats["notes"]["reused"] += 1
+
+        return page, metadata, links
+
+    # Markdown -> html
+    # --------------------------------------------------------------------
+    def get_first_pass_inputs(self, md, node):
+        return {
+            "markdown": self.hash_str(md.page),
+            "metadata": self.hash_str(json.dumps(md.metadata, sort_keys=True, default=str)),
+            "graph node": self.hash_str(json.dumps([node["id"], node["nid"], node["name"], node["url"]])),
+            "templates": self.get_template_hash(),
+        }
+
+    def get_reusable_page_entry(self, fo, inputs):
+        """Returns the entry of the previous run if none of the inputs of the first pass changed, otherwise None. The reasons for
+        rendering the page are added to the report."""
+        entry = self.pages.get(self.get_file_key(fo))
+        reasons = self.get_changed_inputs(entry, inputs)
+
+        if not reasons:
+            files = self.pb.index.files
+            if self.lookups_changed(entry):
+                reasons.append("link targets changed")
+            elif any(key not in files for key in entry["links"] + entry["copied_files"]):
+                reasons.append("linked files removed")
+            elif not self.object_exists(entry["output"]):
+                reasons.append("cached output missing")
+
+        if reasons:
+            self.report.append({"page": fo.path["html"]["file_relative_path"].as_posix(), "pass": "first pass", "reasons": reasons})
+            return None
+        return entry
+
+    def reuse_page_entry(self, fo, entry):
+        """Redo the side effects of the first pass, and return the html and links of the previous run"""
+        files = self.pb.index.files
+
+        for key in entry["copied_files"]:
+            files[key].copy_file("mth")
+            self.pb.search.AddFile(self.pb.gc, files[key])
+
+        # keep the second pass entry, it is checked separately
+        self.new_pages[self.get_file_key(fo)] = entry
+        self.stats["pages"]["reused"] += 1
+
+        return self.read_object(entry["output"]), [files[key] for key in entry["links"]]
+
+    def get_second_pass_inputs(self, html, node_id, tags, metadata, side_panes, breadcrumbs):
+        pb = self.pb
+        inputs = {
+            "page": self.hash_str(html),
+            "side panes": self.hash_str(side_panes),
+            "tags": self.hash_str(json.dumps([tags, metadata.get("obs.html.tags", [])], default=str)),
+        }
+
+        if pb.gc("toggles/features/backlinks/enabled", cached=True):
+            node_lookup = pb.index.network_tree.node_lookup
+            sources = sorted(set(x["source"] for x in pb.index.network_tree.get_inward_links(node_id)))
+            inputs["backlinks"] = self.hash_str(json.dumps([(x, node_lookup[x]["url"], node_lookup[x]["rtr_url"]) for x in sources]))
+
+        if breadcrumbs is not None:
+            inputs["breadcrumbs"] = self.hash_str(breadcrumbs)
+
+        # the results of embedded search queries can change whenever any page changes
+        if pb.gc("toggles/features/embedded_search/enabled", cached=True) and "{_obsidian_html_query:" in html:
+            if self.search_hash is None:
+                self.search_hash = self.hash_str(pb.search.OutputJson())
+            inputs["embedded search"] = self.search_hash
+
+        return inputs
+
+    def get_reusable_second_pass_output(self, fo, inputs):
+        """Returns the html of the previous run if none of the inputs of the second pass changed, otherwise None"""
+        entry = self.new_pages.get(self.get_file_key(fo))
+        if entry is None:
+            return None
+
+        second_pass = self.pages.get(self.get_file_key(fo), {}).get("second_pass")
+        reasons = self.get_changed_inputs(second_pass, inputs)
+        if not reasons and not self.object_exists(second_pass["output"]):
+            reasons.append("cached output missing")
+
+        if reasons:
+            self.report.append({"page": fo.path["html"]["file_relative_path"].as_posix(), "pass": "second pass", "reasons": reasons})
+            return None
+
+        entry["second_pass"] = second_pass
+        return self.read_object(second_pass["output"])
+
+    def record_second_pass_output(self, fo, inputs, html):
+        entry = self.new_pages.get(self.get_file_key(fo))
+        if entry is None:
+            return
+        entry["second_pass"] = {"inputs": inputs, "output": self.write_object(html)}
+
+    # Recording
+    # --------------------------------------------------------------------
+    def start_recording(self):
+        self.recording = {
+            "lookups": {"FindFile": {}, "GetObsidianFilePath": {}},
+            "inclusions": {},
+            "copied_files": [],
+        }
+
+    def start_inclusion_recording(self):
+        """Records what the conversion of an included note depends on separately, so that it can be added to the recording of every note
+        that reuses the converted inclusion (see note2md.InclusionCache). Returns the recording to pass to self.stop_inclusion_recording()"""
+        outer_recording = self.recording
+        self.start_recording()
+        return outer_recording
+
+    def stop_inclusion_recording(self, outer_recording):
+        recording = self.recording
+        self.recording = outer_recording
+        self.merge_recording(recording)
+        return recording
+
+    def merge_recording(self, recording):
+        if self.recording is None:
+            return
+        for method, lookups in recording["lookups"].items():
+            self.recording["lookups"][method].update(lookups)
+        self.recording["inclusions"].update(recording["inclusions"])
+        for key in recording["copied_files"]:
+            if key not in self.recording["copied_files"]:
+                self.recording["copied_files"].append(key)
+
+    def record_lookup(self, method, link, rel_path_str):
+        if self.recording is None:
+            return
+        self.recording["lookups"][method][link] = rel_path_str
+
+    def record_inclusion(self, fo):
+        if self.recording is None:
+            return
+        self.recording["inclusions"][self.get_file_key(fo)] = self.hash_file(fo.path["note"]["file_absolute_path"])
+
+    def record_copied_file(self, fo):
+        if self.recording is None:
+            return
+        key = self.get_file_key(fo)
+        if key not in self.recording["copied_files"]:
+            self.recording["copied_files"].append(key)
+
+    def stop_recording(self, fo, page, metadata, links):
+        entry = self.recording
+        self.recording = None
+
+        entry["hash"] = self.hash_file(fo.path["note"]["file_absolute_path"])
+        entry["output"] = self.write_object(page)
+        entry["links"] = [self.get_file_key(x) for x in links]
+        entry["metadata"] = json.loads(json.dumps(metadata, default=str))
+
+        self.new_notes[self.get_file_key(fo)] = entry
+        self.stats["notes"]["converted"] += 1
+
+    def stop_recording_page(self, fo, inputs, links):
+        entry = self.recording
+        self.recording = None
+        del entry["inclusions"]
+
+        entry["inputs"] = inputs
+        entry["links"] = [self.get_file_key(x) for x in links]
+
+        self.new_pages[self.get_file_key(fo)] = entry
+        self.stats["pages"]["converted"] += 1
+
+    def record_page_output(self, fo, html):
+        # the html is rendered after the recording has stopped, possibly in a worker process (see md2html.HtmlRenderQueue)
+        self.new_pages[self.get_file_key(fo)]["output"] = self.write_object(html)
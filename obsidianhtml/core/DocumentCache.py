@@ -0,0 +1,87 @@
+import os
+import sys
+from collections import OrderedDict
+
+from ..lib import strip_frontmatter
+from ..modules.lib import verbose_enough
+
+
+class Document:
+    """The contents of a note or markdown file: the text as read from disk, and the text without its frontmatter"""
+
+    def __init__(self, text):
+        self.text = text
+        self.body = strip_frontmatter(text)
+        self.size = sys.getsizeof(self.text) + sys.getsizeof(self.body)
+
+
+class DocumentCache:
+    """Keeps the documents that were read during this build in memory, so that a note is only read and stripped of its frontmatter once,
+    even though it is loaded by CreateIndexFromTags, the note -> markdown conversion, and every note that includes it.
+
+    Documents are keyed by their path, and are read again when the mtime or size of the file changed (e.g. when a markdown file is written
+    by the note -> markdown conversion). The least recently used documents are dropped when the documents take up more than max_size bytes.
+
+    The parsed metadata of the notes is not kept here, as it is parsed once by the parse_metadata module and shared through pb.metadata.
+    Worker processes (jobs > 1) start with an empty cache of their own.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.size = 0
+        self.documents = OrderedDict()  # path -> (signature, document), least recently used first
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def __getstate__(self):
+        # don't send the documents along to worker processes
+        state = self.__dict__.copy()
+        state["size"] = 0
+        state["documents"] = OrderedDict()
+        state["stats"] = {"hits": 0, "misses": 0, "evictions": 0}
+        return state
+
+    @staticmethod
+    def get_signature(path):
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def get(self, path):
+        """Returns the Document for the file at path, reading it only when it is not cached or when the file changed"""
+        key = os.fspath(path)
+        signature = self.get_signature(key)
+
+        cached = self.documents.get(key)
+        if cached is not None and cached[0] == signature:
+            self.stats["hits"] += 1
+            self.documents.move_to_end(key)
+            return cached[1]
+
+        self.stats["misses"] += 1
+        with open(key, encoding="utf-8") as f:
+            document = Document(f.read())
+
+        self.remove(key)
+        if document.size <= self.max_size:
+            self.documents[key] = (signature, document)
+            self.size += document.size
+            self.evict()
+        return document
+
+    def remove(self, key):
+        cached = self.documents.pop(key, None)
+        if cached is not None:
+            self.size -= cached[1].size
+
+    def evict(self):
+        while self.size > self.max_size:
+            _, (_, document) = self.documents.popitem(last=False)
+            self.size -= document.size
+            self.stats["evictions"] += 1
+
+    def print_stats(self, verbosity):
+        if verbose_enough("debug", verbosity):
+            stats = self.stats
+            print(
+                f"\t> DOCUMENT CACHE: {stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions "
+                f"({len(self.documents)} documents, {self.size / 1024 / 1024:.1f} of {self.max_size / 1024 / 1024:.0f} MB)"
+            )
@@ -6,12 +6,39 @@ from ..modules.base_classes.config import Config
 from ..modules.builtin.file_mapper import FileManager
 
 
+class SuffixIndex:
+    """Maps every path suffix of every file key to the keys that end in it, so that
+    'folder/note.md' can be matched against 'vault/folder/note.md' with a single dict lookup.
+
+    e.g. the key 'a/b/c.md' is indexed under 'c.md', 'b/c.md' and 'a/b/c.md'.
+    Matches are listed in the insertion order of the files dict, same as a linear scan would find them.
+    """
+
+    def __init__(self, files):
+        self.suffixes = {}
+        for rel_path in files.keys():
+            parts = rel_path.split("/")
+            for i in range(1, len(parts) + 1):
+                suffix = "/".join(parts[-i:])
+                if suffix not in self.suffixes:
+                    self.suffixes[suffix] = []
+                self.suffixes[suffix].append(rel_path)
+
+    def get_matches(self, link):
+        # return a copy so that callers can sort/alter the list without corrupting the index
+        return list(self.suffixes.get(link, ()))
+
+
 class FileFinder:
     def __init__(self):
         self.cache_id = 1
         self.config = Config()
         self.files = {}
 
+        # see self.get_suffix_index()
+        self._suffix_index = None
+        self._suffix_index_key = None
+
         self.load_file_map()
 
     def load_file_map(self):
@@ -26,10 +53,22 @@ class FileFinder:
 
     def invalidate_cache(self):
         self.cache_id = uuid.uuid1()
+        self._suffix_index = None
+
+    def get_suffix_index(self, files):
+        """Returns the SuffixIndex for the given files dict, (re)building it when the files dict or the cache_id has changed"""
+        key = (id(files), len(files), self.cache_id)
+        if self._suffix_index is None or self._suffix_index_key != key:
+            self._suffix_index = SuffixIndex(files)
+            self._suffix_index_key = key
+        return self._suffix_index
 
     def GetObsidianFilePath(self, link, pb):
         self.files = pb.index.files
-        return self._GetObsidianFilePath(link, pb.gc("html_url_prefix"), pb.gc("toggles/force_filename_to_lowercase", cached=True), cache_id=self.cache_id)
+        result = self._GetObsidianFilePath(link, pb.gc("html_url_prefix"), pb.gc("toggles/force_filename_to_lowercase", cached=True), cache_id=self.cache_id)
+        if pb.build_manifest is not None:
+            pb.build_manifest.record_lookup("GetObsidianFilePath", link, result["rtr_path_str"])
+        return result
 
     @cache
     def _GetObsidianFilePath(self, link, html_url_prefix, force_filename_to_lowercase, cache_id):
@@ -69,7 +108,10 @@ class FileFinder:
     # will return (False, False) if not found, (str:url, fo:file_object) when found
     def FindFile(self, link, pb):
         self.files = pb.index.files
-        return self._FindFile(link, pb.gc("html_url_prefix"), pb.gc("toggles/force_filename_to_lowercase", cached=True), cache_id=self.cache_id)
+        result = self._FindFile(link, pb.gc("html_url_prefix"), pb.gc("toggles/force_filename_to_lowercase", cached=True), cache_id=self.cache_id)
+        if pb.build_manifest is not None:
+            pb.build_manifest.record_lookup("FindFile", link, result[0])
+        return result
 
     @cache
     def _FindFile(self, link, html_url_prefix, force_filename_to_lowercase, cache_id):
@@ -165,36 +207,9 @@ class FileFinder:
 
     @cache
     def _GetMatches(self, link, cache_id):
-        files = self.files
-        search = False
-        prevtrue = False
-        # if 'Test Pages/textfile.txt' in link:
-        #     search = True
-
         # find all links that match the tail part
-        url_parts = link.split("/")
-        matches = []
-        for rel_path in files.keys():
-            parts = rel_path.split("/")
-            if len(url_parts) > len(parts):
-                continue
-
-            match = True
-            for i in range(1, len(url_parts) + 1):
-                if url_parts[-i] != parts[-i]:
-                    match = False
-
-                    if prevtrue:
-                        print("false", f'"{url_parts[-i]}" "{parts[-i]}"')
-                        prevtrue = False
-                    break
-                else:
-                    if search:
-                        print("true", parts[-i])
-                        prevtrue = True
-            if match:
-                matches.append(rel_path)
-        return matches
+        # e.g. 'folder/note.md' matches 'folder/note.md' and 'vault/folder/note.md', but not 'vault/otherfolder/note.md'
+        return self.get_suffix_index(self.files).get_matches(link)
 
     def GetNodeId(self, pb, link):
         self.files = pb.index.files
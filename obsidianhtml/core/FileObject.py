@@ -313,6 +313,9 @@ class FileObject:
                 formatted_print("ERROR", f"copying  {src_file_path} to {dst_file_path}, file not found.")
             return
 
+        if self.pb.build_manifest is not None:
+            self.pb.build_manifest.record_copied_file(self)
+
         link_mode = self.pb.gc("copy_output_file_method", cached=True)
         resolve_links = self.pb.gc("resolve_output_file_links", cached=True)
         if link_mode == "default":
@@ -327,10 +330,17 @@ class FileObject:
         if link_mode == "copy":
             shutil.copyfile(src_file_path, dst_file_path)
         elif link_mode == "symlink":
+            # (another worker process can create the link in between the check and the call, see the `jobs` setting)
             if not os.path.exists(dst_file_path):
-                os.symlink(src_file_path, dst_file_path)
+                try:
+                    os.symlink(src_file_path, dst_file_path)
+                except FileExistsError:
+                    pass
         elif link_mode == "hardlink":
             if not os.path.exists(dst_file_path):
-                os.link(src_file_path, dst_file_path)
+                try:
+                    os.link(src_file_path, dst_file_path)
+                except FileExistsError:
+                    pass
         else:
             raise Exception(f'Bad copy_output_file_method "{link_mode}", expected one of: default, copy, symlink, hardlink')
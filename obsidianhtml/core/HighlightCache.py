@@ -0,0 +1,136 @@
+import os
+import sys
+from collections import OrderedDict
+from pathlib import Path
+
+from ..modules.lib import verbose_enough
+
+
+class HighlightCache:
+    """Keeps the html that Pygments created for code blocks, so that a code block is only highlighted once, even when it is used in
+    many notes (or included in them), and is not highlighted again on the next build when it did not change.
+
+    Code blocks are keyed by the hash of their language, code, and codehilite options (see CachedCodeHiliteExtension). The least
+    recently used code blocks are dropped from memory when they take up more than max_size bytes. Every code block is also written
+    to its own file in folder_path (highlight_cache in the appdir), which is where code blocks that are not in memory are looked up.
+    Reading a file updates its modification time, so that prune() can remove the files that were used least recently when the folder
+    grows too large (highlight_cache_disk_size_mb).
+    Worker processes (jobs > 1) keep a cache of their own, and send their stats to the main process (see HtmlRenderQueue).
+    """
+
+    def __init__(self, folder_path, max_size):
+        self.folder_path = Path(folder_path)
+        self.max_size = max_size
+        self.size = 0
+        self.entries = OrderedDict()  # key -> html, least recently used first
+        self.stats = self.new_stats()
+
+    @staticmethod
+    def new_stats():
+        return {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "pruned": 0}
+
+    def get_path(self, key):
+        return self.folder_path.joinpath(key[:2], f"{key}.html")
+
+    def get(self, key):
+        """Returns the html of the code block, or None when it was not highlighted before"""
+        html = self.entries.get(key)
+        if html is not None:
+            self.stats["memory_hits"] += 1
+            self.entries.move_to_end(key)
+            return html
+
+        path = self.get_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                html = f.read()
+        except OSError:
+            self.stats["misses"] += 1
+            return None
+
+        # mark the file as recently used, see prune()
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        self.stats["disk_hits"] += 1
+        self.add(key, html)
+        return html
+
+    def set(self, key, html):
+        self.add(key, html)
+
+        # write to a temporary file first, so that other processes never read a half written file
+        path = self.get_path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(html)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def add(self, key, html):
+        if key in self.entries:
+            self.size -= sys.getsizeof(self.entries.pop(key))
+
+        size = sys.getsizeof(html)
+        if size > self.max_size:
+            return
+        self.entries[key] = html
+        self.size += size
+        while self.size > self.max_size:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= sys.getsizeof(evicted)
+            self.stats["evictions"] += 1
+
+    def prune(self, max_disk_size):
+        """Removes the files of the least recently used code blocks until the folder takes up at most max_disk_size bytes.
+        Called at the end of the build, when no process writes to the folder anymore. Also removes temporary files that were left
+        behind by builds that were stopped."""
+        files = []
+        total_size = 0
+        for path in self.folder_path.glob("*/*"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if path.suffix == ".tmp":
+                path.unlink(missing_ok=True)
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
+
+        files.sort()
+        for _, size, path in files:
+            if total_size <= max_disk_size:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total_size -= size
+            self.stats["pruned"] += 1
+
+    def take_stats(self):
+        """Returns the stats since the last call, used to send the stats of a worker process to the main process"""
+        stats = self.stats
+        self.stats = self.new_stats()
+        return stats
+
+    def add_stats(self, stats):
+        for key, value in stats.items():
+            self.stats[key] += value
+
+    def print_stats(self, verbosity):
+        if verbose_enough("info", verbosity):
+            stats = self.stats
+            hits = stats["memory_hits"] + stats["disk_hits"]
+            total = hits + stats["misses"]
+            hit_rate = 0 if total == 0 else hits / total * 100
+            print(
+                f"\t> HIGHLIGHT CACHE: {stats['memory_hits']} memory hits, {stats['disk_hits']} disk hits, {stats['misses']} misses "
+                f"(hit rate {hit_rate:.0f}%), {stats['evictions']} evictions ({len(self.entries)} code blocks in memory), {stats['pruned']} files pruned"
+            )
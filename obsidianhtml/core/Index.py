@@ -1,10 +1,9 @@
-import json
-
 from pathlib import Path
 
 
 from .NetworkTree import NetworkTree
 from .FileObject import FileObject
+from ..modules.handlers.modfile_store import modfile_store
 
 
 class Index:
@@ -37,12 +36,10 @@ class Index:
 
         module_data_folder = self.pb.module_data_folder
 
-        with open(module_data_folder + "/paths.json", "r") as f:
-            paths = json.loads(f.read())
+        paths = modfile_store.read_json(module_data_folder + "/paths.json")
         Path(paths["input_folder"])
 
-        with open(module_data_folder + "/index/files_mapped.json", "r") as f:
-            files = json.loads(f.read())
+        files = modfile_store.read_json(module_data_folder + "/index/files_mapped.json")
 
         # # add index.md when converting straight from md to html
         # if not pb.gc("toggles/compile_md", cached=True):
@@ -81,3 +78,13 @@ class Index:
         if self.pb.gc("toggles/force_filename_to_lowercase", cached=True):
             rel_path = rel_path.lower()
         self.files[rel_path] = obj
+
+    def get_file_key(self, fo):
+        """Returns the key under which the file object is stored in self.files"""
+        if self.pb.gc("toggles/compile_md", cached=True):
+            rel_path = fo.path["note"]["file_relative_path"].as_posix()
+        else:
+            rel_path = fo.path["markdown"]["file_relative_path"].as_posix()
+        if self.pb.gc("toggles/force_filename_to_lowercase", cached=True):
+            rel_path = rel_path.lower()
+        return rel_path
@@ -14,9 +14,14 @@ class NetworkTree:
     nid_inc = 0
 
     def __init__(self):
+        # tree["nodes"] and tree["links"] keep the insertion order for the json output, the lookups below are used to find duplicates
         self.tree = {"nodes": [], "links": []}
+        self.nodes_by_id = {}
+        self.link_keys = set()
+
         self.node_lookup = {}
         self.node_lookup_slug = {}
+        self.inward_link_lookup = {}  # node id -> links that target the node, in the order of tree["links"]
 
         self.node_graph = None
         self.node_graph_lookup = None
@@ -70,18 +75,19 @@ class NetworkTree:
         if self.pb.verbose:
             print("Received node", node_obj)
         # Skip if already present
-        for node in self.tree["nodes"]:
-            if node["id"] == node_obj["id"]:
-                node["metadata"] = node_obj["metadata"].copy()
-                if self.pb.verbose:
-                    print("Node already present")
-                return
+        node = self.nodes_by_id.get(node_obj["id"])
+        if node is not None:
+            node["metadata"] = node_obj["metadata"].copy()
+            if self.pb.verbose:
+                print("Node already present")
+            return
 
         # Add node
         self.nid_inc += 1
         node_obj["nid"] = self.nid_inc
 
         self.tree["nodes"].append(node_obj)
+        self.nodes_by_id[node_obj["id"]] = node_obj
         if self.pb.verbose:
             print("Node added")
 
@@ -89,14 +95,15 @@ class NetworkTree:
         if self.pb.verbose:
             print("Received link", link_obj)
         # Skip if already present
-        for link in self.tree["links"]:
-            if link["source"] == link_obj["source"] and link["target"] == link_obj["target"]:
-                if self.pb.verbose:
-                    print("Link already present")
-                return
+        key = (link_obj["source"], link_obj["target"])
+        if key in self.link_keys:
+            if self.pb.verbose:
+                print("Link already present")
+            return
 
         # Add link
         self.tree["links"].append(link_obj)
+        self.link_keys.add(key)
         if self.pb.verbose:
             print("Link added")
 
@@ -112,6 +119,15 @@ class NetworkTree:
             self.node_lookup[n["id"]] = n
             self.node_lookup_slug[slugify_path(n["id"])] = n
 
+    def compile_inward_link_lookup(self):
+        """Call when all links are added. Used for backlinks, so that they don't have to be searched for in all links for every page"""
+        self.inward_link_lookup = {}
+        for link in self.tree["links"]:
+            self.inward_link_lookup.setdefault(link["target"], []).append(link)
+
+    def get_inward_links(self, node_id):
+        return self.inward_link_lookup.get(node_id, [])
+
     def AddCrosslinks(self):
         for link in self.tree["links"]:
             src = self.node_lookup[link["source"]]
@@ -140,12 +156,11 @@ class NetworkTree:
             note_lookup[node["id"]] = di
 
         for link in self.tree["links"]:
-            src = note_lookup[link["source"]]
-            dst = note_lookup[link["target"]]
-            if src["id"] not in dst["referencedBy"]:
-                dst["referencedBy"].append(src["id"])
-            if dst["id"] not in src["linkTo"]:
-                src["linkTo"].append(dst["id"])
+            note_lookup[link["source"]]["linkTo"].append(note_lookup[link["target"]]["id"])
+        for node in self.tree["nodes"]:
+            di = note_lookup[node["id"]]
+            di["linkTo"] = list(dict.fromkeys(di["linkTo"]))
+            di["referencedBy"] = list(dict.fromkeys(note_lookup[link["source"]]["id"] for link in self.get_inward_links(node["id"])))
 
         self.node_graph = note_graph
         self.node_graph_lookup = note_lookup
@@ -1,5 +1,8 @@
 from .ConfigManager import Config
 from .FileFinder import FileFinder
+from .BuildManifest import BuildManifest
+from .DocumentCache import DocumentCache
+from ..note2md import InclusionCache
 from ..features.Search import SearchHead
 from ..features.CreateIndexFromDirStructure import CreateIndexFromDirStructure
 
@@ -26,6 +29,11 @@ class PicknickBasket:
 
         self.search = None  # set by self.init_search()
         self.FileFinder = None  # set by init_filefinder
+        self.build_manifest = None  # set by init_build_manifest, only when toggles/incremental_build is enabled
+        self.document_cache = None  # set by init_document_cache
+        self.inclusion_cache = InclusionCache()  # converted inclusions, see note2md.InclusionCache
+        self.html_render_queue = None  # set by convert_markdown_to_html
+        self.html_page_store = None  # set by convert_markdown_to_html
 
         self.ConfigManager = Config(self)
         self.plugin_settings = {"embedded_note_titles": {}}  # <- does nothing at the moment, should be factored out
@@ -43,6 +51,12 @@ class PicknickBasket:
     def init_filefinder(self):
         self.FileFinder = FileFinder()
 
+    def init_build_manifest(self):
+        self.build_manifest = BuildManifest(self)
+
+    def init_document_cache(self):
+        self.document_cache = DocumentCache(max_size=self.gc("document_cache_size_mb") * 1024 * 1024)
+
     def reset_state(self):
         self.state["action"] = "Unknown"
         self.state["main_function"] = None
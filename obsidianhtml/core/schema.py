@@ -18,7 +18,7 @@ class Schema:
             value = self.__dict__[name]
 
             # if the type is a subclass of a Model, then get its json and convert to obj
-            if "__schema__" in dir(value):
+            if hasattr(value, "__schema__"):
                 d[name] = value.normalize()
                 continue
             # Path's are not serializable, cast to posix string
@@ -81,7 +81,7 @@ class CreateIndexFromDirStructure:
     def build_tree_recurse(self, tree):
         verbose = self.verbose
 
-        for path in Path(tree["path"]).resolve().glob("*"):
+        for path in self.list_folder(Path(tree["path"]).resolve()):
             # Exclude configured subfolders
             _continue = False
             for folder in self.exclude_subfolders_str:
@@ -142,6 +142,14 @@ class CreateIndexFromDirStructure:
 
         return tree
 
+    def list_folder(self, folder):
+        """Lists the folder on disk, plus the pages that are still held in pb.html_page_store"""
+        paths = list(folder.glob("*"))
+        if self.pb.html_page_store is not None:
+            on_disk = set(paths)
+            paths += [path for path in self.pb.html_page_store.list_folder(folder) if path not in on_disk]
+        return paths
+
     def sort_tree(self):
         def _recurse(tree):
             tree["folders"] = sorted(tree["folders"], key=lambda d: d["name"])
@@ -183,6 +191,8 @@ class CreateIndexFromDirStructure:
             name = f"{settings['naming']}.html"
 
         abs_path = note_folder_abs_path.joinpath(name)
+        if self.pb.html_page_store is not None:
+            return (self.pb.html_page_store.exists(abs_path), abs_path)
         return (abs_path.exists(), abs_path)
 
     def check_is_folder_note(self, note_abs_path):
@@ -60,9 +60,7 @@ def get_html_page_content(pb, pane_id):
 
     # get file and convert to soup
     fo = pb.index.fo_by_html_relpath[file_rtr]
-    dst_abs_path = fo.path["html"]["file_absolute_path"]
-    with open(dst_abs_path, "r", encoding="utf-8") as f:
-        html = f.read()
+    html = pb.html_page_store.read(fo.path["html"]["file_absolute_path"])
 
     soup = BeautifulSoup(html, features="html5lib")
 
@@ -1,5 +1,6 @@
 import os
 import sys
+import hashlib
 import re  # regex string finding/replacing
 import yaml
 import unicodedata
@@ -44,6 +45,14 @@ def get_default_appdir_config_yaml_path():
     return appdir_config_folder_path.joinpath("config.yml")
 
 
+def get_build_cache_folder_path(paths):
+    """Returns the folder in the appdir where data is kept between runs, such as the build manifest.
+    Every combination of vault and output folders gets its own folder, so that different builds don't overwrite each other's data."""
+    key = "\n".join([Path(paths[x]).as_posix() for x in ("original_input_folder", "md_folder", "html_output_folder")])
+    build_id = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return Path(paths["appdir"]).joinpath("build_cache", build_id)
+
+
 def WriteFileLog(files, log_file_name, include_processed=False):
     if include_processed:
         s = "| key | processed note? | processed md? | note | markdown | html | html link relative | html link absolute |\n|:---|:---|:---|:---|:---|:---|:---|:---|\n"
@@ -77,10 +86,11 @@ def WriteFileLog(files, log_file_name, include_processed=False):
 
 
 def simpleHash(text: str):
-    hash = 0
-    for ch in text:
-        hash = (hash * 281 ^ ord(ch) * 997) & 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF
-    return str(hash)
+    """Returns a 128 bit hash of the text as a string of digits. Used for the id of the graph of a page, and for the version of the
+    search data (gzip_hash), which the browser compares with the search_hash that it keeps in localStorage.
+    blake2b runs in C, so this is fast for large texts, such as the search data of a big vault."""
+    digest = hashlib.blake2b(text.encode("utf-8", errors="surrogatepass"), digest_size=16).digest()
+    return str(int.from_bytes(digest, "big"))
 
 
 def ConvertTitleToMarkdownId(title):
@@ -6,6 +6,8 @@ import regex as re
 RegexBegin = re.compile(r"^ *\`\`\` *ad-cite")
 RegexEnd = re.compile(r"^ *\`\`\`")
 
+title_icon = '<div class="admonition-title-icon"><svg aria-hidden="true" focusable="false" data-prefix="fas" data-icon="quote-right" role="img" xmlns="http://www.w3.org/2000/svg" viewBox="0 0 512 512"><path fill="currentColor" d="M464 32H336c-26.5 0-48 21.5-48 48v128c0 26.5 21.5 48 48 48h80v64c0 35.3-28.7 64-64 64h-8c-13.3 0-24 10.7-24 24v48c0 13.3 10.7 24 24 24h8c88.4 0 160-71.6 160-160V80c0-26.5-21.5-48-48-48zm-288 0H48C21.5 32 0 53.5 0 80v128c0 26.5 21.5 48 48 48h80v64c0 35.3-28.7 64-64 64h-8c-13.3 0-24 10.7-24 24v48c0 13.3 10.7 24 24 24h8c88.4 0 160-71.6 160-160V80c0-26.5-21.5-48-48-48z"></path></svg></div>'
+
 
 class AdmonitionExtension(Extension):
     # def __init__(self, **kwargs):
@@ -54,7 +56,7 @@ class AdmonitionPreprocessor(Preprocessor):
 
                 if line.startswith("title:"):
                     title = line.replace("title:", "").strip()
-                    title_code = f'<div class="ad-cite-title"><div class="admonition-title-icon"><svg aria-hidden="true" focusable="false" data-prefix="fas" data-icon="quote-right" role="img" xmlns="http://www.w3.org/2000/svg" viewBox="0 0 512 512"><path fill="currentColor" d="M464 32H336c-26.5 0-48 21.5-48 48v128c0 26.5 21.5 48 48 48h80v64c0 35.3-28.7 64-64 64h-8c-13.3 0-24 10.7-24 24v48c0 13.3 10.7 24 24 24h8c88.4 0 160-71.6 160-160V80c0-26.5-21.5-48-48-48zm-288 0H48C21.5 32 0 53.5 0 80v128c0 26.5 21.5 48 48 48h80v64c0 35.3-28.7 64-64 64h-8c-13.3 0-24 10.7-24 24v48c0 13.3 10.7 24 24 24h8c88.4 0 160-71.6 160-160V80c0-26.5-21.5-48-48-48z"></path></svg></div><div class="ad-cite-title-content">{title}</div></div>'
+                    title_code = f'<div class="ad-cite-title">{title_icon}<div class="ad-cite-title-content">{title}</div></div>'
                     new_lines.append(title_code)
                 elif m_end:
                     in_code = False
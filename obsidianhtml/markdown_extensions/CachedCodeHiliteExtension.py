@@ -0,0 +1,96 @@
+"""
+Cached CodeHilite Extension for Python-Markdown
+===============================================
+
+The codehilite extension, with a cache for the html that Pygments creates for code blocks (see core/HighlightCache.py).
+
+Both fenced code blocks (fenced_code) and indented code blocks (codehilite) are highlighted by creating a CodeHilite instance with
+the codehilite config, and calling hilite() on it. This extension passes the cache along in its config, and CachedCodeHilite takes
+it out of the options again. As neither extension offers a way to use another class, this extension registers subclasses of their
+processors, whose run() is the run() of the original processor with CachedCodeHilite in the place of CodeHilite (see
+use_cached_code_hilite). The markdown modules themselves are not changed, so other Markdown instances are not affected.
+Without a cache in its options, CachedCodeHilite works the same as CodeHilite.
+
+The fenced_code extension has to be loaded before this one, so that its preprocessor can be replaced.
+"""
+
+import hashlib
+import types
+
+import markdown
+import pygments
+
+from markdown.extensions.codehilite import CodeHilite, CodeHiliteExtension, HiliteTreeprocessor
+from markdown.extensions.fenced_code import FencedBlockPreprocessor
+
+
+class CachedCodeHilite(CodeHilite):
+    def __init__(self, src, **options):
+        self.highlight_cache = options.pop("highlight_cache", None)
+        super().__init__(src, **options)
+
+    def get_cache_key(self, shebang):
+        # everything that the output of hilite() depends on
+        key = [
+            markdown.__version__,
+            pygments.__version__,
+            self.src.strip("\n"),
+            self.lang,
+            shebang,
+            self.guess_lang,
+            self.use_pygments,
+            self.lang_prefix,
+            self.pygments_formatter,
+            sorted(self.options.items()),
+        ]
+        return hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+
+    def hilite(self, shebang=True):
+        # a custom formatter class can't be part of the key
+        if self.highlight_cache is None or not isinstance(self.pygments_formatter, str):
+            return super().hilite(shebang=shebang)
+
+        key = self.get_cache_key(shebang)
+        html = self.highlight_cache.get(key)
+        if html is None:
+            html = super().hilite(shebang=shebang)
+            self.highlight_cache.set(key, html)
+        return html
+
+
+def use_cached_code_hilite(function):
+    """Returns a copy of the function, in which the global CodeHilite is CachedCodeHilite"""
+    function_globals = {**function.__globals__, "CodeHilite": CachedCodeHilite}
+    return types.FunctionType(function.__code__, function_globals, function.__name__, function.__defaults__, function.__closure__)
+
+
+class CachedHiliteTreeprocessor(HiliteTreeprocessor):
+    run = use_cached_code_hilite(HiliteTreeprocessor.run)
+
+
+class CachedFencedBlockPreprocessor(FencedBlockPreprocessor):
+    run = use_cached_code_hilite(FencedBlockPreprocessor.run)
+
+
+class CachedCodeHiliteExtension(CodeHiliteExtension):
+    """Add source code highlighting to markdown code blocks, reusing the html of code blocks that were highlighted before.
+    Takes the same config as codehilite, plus highlight_cache (a HighlightCache, or None to not cache)."""
+
+    def __init__(self, highlight_cache=None, **kwargs):
+        super().__init__(**kwargs)
+        self.config["highlight_cache"] = [highlight_cache, "HighlightCache to reuse the html of code blocks from - Default: None"]
+
+    def extendMarkdown(self, md):
+        hiliter = CachedHiliteTreeprocessor(md)
+        hiliter.config = self.getConfigs()
+        md.treeprocessors.register(hiliter, "hilite", 30)
+
+        if "fenced_code_block" in md.preprocessors:
+            fenced_config = md.preprocessors["fenced_code_block"].config
+            md.preprocessors.register(CachedFencedBlockPreprocessor(md, fenced_config), "fenced_code_block", 25)
+
+        md.registerExtension(self)
+
+
+def makeExtension(**kwargs):
+    return CachedCodeHiliteExtension(**kwargs)
@@ -159,45 +159,50 @@ class CallOutBlockProcessor(BlockProcessor):
         return True
 
     def parseHeader(self, line):
-        # output
-        folded = False
-        foldable = False
-
-        # first parse line into bracket_content and tail
-        start_bracket = False
-        end_bracket = False
-        bracket_content = ""
-        tail = ""
-        for ch in line:
-            if start_bracket is False and ch == "[":
-                start_bracket = True
+        return parse_callout_header(line)
+
+
+def parse_callout_header(line):
+    """Returns the class, title, and fold state of a callout from its first line, e.g. > [!note]- Title"""
+    # output
+    folded = False
+    foldable = False
+
+    # first parse line into bracket_content and tail
+    start_bracket = False
+    end_bracket = False
+    bracket_content = ""
+    tail = ""
+    for ch in line:
+        if start_bracket is False and ch == "[":
+            start_bracket = True
+            continue
+        if start_bracket is True:
+            if ch == "]":
+                end_bracket = True
                 continue
-            if start_bracket is True:
-                if ch == "]":
-                    end_bracket = True
-                    continue
-                if ch == "!" and end_bracket is False:
-                    continue
-                if end_bracket is False:
-                    bracket_content += ch
-                    continue
-            if end_bracket is True:
-                tail += ch
-
-        # read tail to get configuration
-        if tail.startswith("-"):
-            folded = True
-            foldable = True
-            tail = tail[1:]
-        elif tail.startswith("+"):
-            folded = False
-            foldable = True
-            tail = tail[1:]
-
-        tail = tail.lstrip()
-        if tail != "":
-            title = tail
-        else:
-            title = bracket_content.capitalize()
-
-        return {"call-out-class": bracket_content.lower(), "title": title, "foldable": foldable, "folded": folded}
+            if ch == "!" and end_bracket is False:
+                continue
+            if end_bracket is False:
+                bracket_content += ch
+                continue
+        if end_bracket is True:
+            tail += ch
+
+    # read tail to get configuration
+    if tail.startswith("-"):
+        folded = True
+        foldable = True
+        tail = tail[1:]
+    elif tail.startswith("+"):
+        folded = False
+        foldable = True
+        tail = tail[1:]
+
+    tail = tail.lstrip()
+    if tail != "":
+        title = tail
+    else:
+        title = bracket_content.capitalize()
+
+    return {"call-out-class": bracket_content.lower(), "title": title, "foldable": foldable, "folded": folded}
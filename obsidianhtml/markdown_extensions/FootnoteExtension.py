@@ -89,6 +89,8 @@ class FootnoteExtension(Extension):
         self.used_refs = set()
         self.codeblocks = {}
         self.codelines = {}
+        self.inc = 0
+        self.replacement_inc = 0
 
     def unique_ref(self, reference, found=False):
         """Get a unique reference if there are duplicates."""
@@ -23,6 +23,18 @@ def strip_notprintable(myStr, strip_special_chars):
     return "".join(filter(lambda x: x in string.printable, myStr)).strip()
 
 
+mermaid_init_script = """<script>
+                    function initializeMermaid() {
+                        mermaid.initialize({startOnLoad:true})
+                    }
+            
+                    if (document.readyState === "complete" || document.readyState === "interactive") {
+                        setTimeout(initializeMermaid, 1);
+                    } else {
+                        document.addEventListener("DOMContentLoaded", initializeMermaid);
+                    }
+            </script>"""
+
 MermaidRegex = re.compile(r"^(?P<mermaid_sign>[\~\`]){3}[\ \t]*[Mm]ermaid[\ \t]*$")
 
 
@@ -96,18 +108,6 @@ class MermaidPreprocessor(Preprocessor):
             new_lines.append("")
             # This will initialize mermaid renderer. It's done only when the HTML document is ready,
             # to ensure the loading of mermaid.js file is finished.
-            new_lines.append(
-                """<script>
-                    function initializeMermaid() {
-                        mermaid.initialize({startOnLoad:true})
-                    }
-            
-                    if (document.readyState === "complete" || document.readyState === "interactive") {
-                        setTimeout(initializeMermaid, 1);
-                    } else {
-                        document.addEventListener("DOMContentLoaded", initializeMermaid);
-                    }
-            </script>"""
-            )
+            new_lines.append(mermaid_init_script)
 
         return new_lines
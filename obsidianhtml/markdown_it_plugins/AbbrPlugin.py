@@ -0,0 +1,75 @@
+"""
+Abbreviation plugin for markdown-it-py, the equivalent of the python-markdown abbr extension:
+
+    The HTML spec.
+    *[HTML]: Hyper Text Markup Language
+
+The definitions are removed, and every occurrence of HTML in the text becomes <abbr title="Hyper Text Markup Language">HTML</abbr>.
+"""
+
+import re
+
+from markdown_it.common.utils import escapeHtml
+from markdown_it.token import Token
+
+definition_pattern = re.compile(r"^[*]\[(?P<abbr>[^\\]*?)\][ ]?:[ ]*(?P<title>.*)$")
+
+
+def abbr_plugin(md):
+    md.block.ruler.before("reference", "abbr_definition", abbr_definition_rule, {"alt": ["paragraph"]})
+    md.core.ruler.after("inline", "abbr_replace", abbr_replace_rule)
+
+
+def abbr_definition_rule(state, start_line, end_line, silent):
+    if state.sCount[start_line] - state.blkIndent >= 4:
+        return False
+    m = definition_pattern.match(state.src[state.bMarks[start_line] + state.tShift[start_line] : state.eMarks[start_line]])
+    if m is None:
+        return False
+    abbr = m.group("abbr").strip()
+    title = m.group("title").strip()
+    if not abbr or not title:
+        return False
+    if silent:
+        return True
+
+    abbreviations = state.env.setdefault("abbreviations", {})
+    if title == "''" or title == '""':
+        abbreviations.pop(abbr, None)
+    else:
+        abbreviations[abbr] = title
+    state.line = start_line + 1
+    return True
+
+
+def abbr_replace_rule(state):
+    abbreviations = state.env.get("abbreviations")
+    if not abbreviations:
+        return
+
+    keys = sorted(abbreviations.keys(), key=len, reverse=True)
+    pattern = re.compile(r"\b(?:" + "|".join(re.escape(x) for x in keys) + r")\b")
+
+    for block_token in state.tokens:
+        if block_token.type != "inline" or block_token.children is None:
+            continue
+        children = []
+        for token in block_token.children:
+            if token.type != "text" or pattern.search(token.content) is None:
+                children.append(token)
+                continue
+            position = 0
+            for m in pattern.finditer(token.content):
+                children.append(text_token(token.content[position : m.start()]))
+                abbr = Token("html_inline", "", 0)
+                abbr.content = f'<abbr title="{escapeHtml(abbreviations[m.group(0)])}">{escapeHtml(m.group(0))}</abbr>'
+                children.append(abbr)
+                position = m.end()
+            children.append(text_token(token.content[position:]))
+        block_token.children = children
+
+
+def text_token(content):
+    token = Token("text", "", 0)
+    token.content = content
+    return token
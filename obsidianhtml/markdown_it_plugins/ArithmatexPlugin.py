@@ -0,0 +1,27 @@
+r"""
+Math plugin for markdown-it-py, which renders $inline$ and $$block$$ math the same as pymdownx.arithmatex (generic mode), so that
+MathJax finds it in the same way:
+
+    $x^2$      -> <span class="arithmatex">\(x^2\)</span>
+    $$e=mc^2$$ -> <div class="arithmatex">\[
+                  e=mc^2
+                  \]</div>
+"""
+
+from markdown_it.common.utils import escapeHtml
+from mdit_py_plugins.dollarmath import dollarmath_plugin
+
+
+def arithmatex_plugin(md):
+    dollarmath_plugin(md, allow_labels=False, allow_space=False, allow_blank_lines=False)
+    md.add_render_rule("math_inline", render_math_inline)
+    md.add_render_rule("math_inline_double", render_math_block)
+    md.add_render_rule("math_block", render_math_block)
+
+
+def render_math_inline(self, tokens, idx, options, env):
+    return f'<span class="arithmatex">\\({escapeHtml(tokens[idx].content.strip())}\\)</span>'
+
+
+def render_math_block(self, tokens, idx, options, env):
+    return f'<div class="arithmatex">\\[\n{escapeHtml(tokens[idx].content.strip())}\n\\]</div>\n'
@@ -0,0 +1,49 @@
+"""
+Block link plugin for markdown-it-py, the equivalent of markdown_extensions/BlockLinkExtension.py:
+
+    A paragraph with a block id
+    ^block-1
+
+is wrapped in <div id="__block-1">, so that links to the block work. Code blocks are left alone.
+"""
+
+import re
+
+RE_FENCE = re.compile(r"^ *(```|~~~)")
+
+
+def block_link_plugin(md):
+    md.core.ruler.after("normalize", "block_link", block_link_rule)
+
+
+def block_link_rule(state):
+    state.src = wrap_block_links(state.src)
+
+
+def wrap_block(block):
+    if not block or not block[-1].startswith("^"):
+        return block
+    marker = block[-1].strip().replace("^", "__")
+    return [f'<div id="{marker}">', ""] + block[:-1] + ["", "</div>"]
+
+
+def wrap_block_links(text):
+    lines = []
+    block = []
+    fence = None
+    for line in text.split("\n"):
+        m = RE_FENCE.match(line)
+        if fence is not None:
+            block.append(line)
+            if m and m.group(1) == fence:
+                fence = None
+        elif m:
+            fence = m.group(1)
+            block.append(line)
+        elif line.strip() == "":
+            lines += wrap_block(block) + [line]
+            block = []
+        else:
+            block.append(line)
+    lines += wrap_block(block)
+    return "\n".join(lines)
@@ -0,0 +1,94 @@
+"""
+Callout plugin for markdown-it-py, the equivalent of markdown_extensions/CallOutExtension.py:
+
+    > [!note]- Title
+    > contents
+
+becomes the same callout divs as CallOutExtension creates. Every line of the contents is followed by a line break, and the contents
+are parsed as markdown.
+"""
+
+import html
+import re
+
+from ..SharedResources import shared_obsidian_svgs
+from ..markdown_extensions.CallOutExtension import CallOutBlockProcessor, parse_callout_header
+
+
+def callout_plugin(md):
+    md.block.ruler.before("blockquote", "callout", callout_rule, {"alt": ["paragraph", "reference", "blockquote", "list"]})
+
+
+def get_line(state, line):
+    return state.src[state.bMarks[line] : state.eMarks[line]]
+
+
+def callout_rule(state, start_line, end_line, silent):
+    if state.sCount[start_line] - state.blkIndent >= 4:
+        return False
+    first_line = get_line(state, start_line)
+    if not re.match(CallOutBlockProcessor.RE_FENCE_START, first_line):
+        return False
+    if silent:
+        return True
+
+    # the callout ends at the first line that does not start with >
+    next_line = start_line + 1
+    while next_line < end_line and re.match(CallOutBlockProcessor.RE_FENCE_LINE, get_line(state, next_line)):
+        next_line += 1
+
+    # the title is parsed as inline markdown, as python-markdown does
+    data = parse_callout_header(first_line)
+    title_start, title_end = get_callout_header_html(data)
+    token = state.push("html_block", "", 0)
+    token.map = [start_line, next_line]
+    token.content = title_start
+    token = state.push("inline", "", 0)
+    token.content = data["title"] + "\n"
+    token.children = []
+    token = state.push("html_block", "", 0)
+    token.content = title_end
+
+    # remove leading > to avoid blockquote blocks.
+    chunk = [re.sub(r"^ *> *", "", get_line(state, x), count=1).strip() for x in range(start_line + 1, next_line)]
+    if len(chunk) > 0:
+        state.md.block.parse("   \n".join(chunk), state.md, state.env, state.tokens)
+
+    token = state.push("html_block", "", 0)
+    token.content = "</div>\n</div>\n"
+
+    state.line = next_line
+    return True
+
+
+def get_callout_header_html(data):
+    """Returns the opening divs of the callout, up to the div with the contents (see CallOutBlockProcessor.run()), split where the title goes"""
+    classlist = f'callout callout-{data["call-out-class"]} active'  # class active will be removed on page load if js is enabled
+    rasa = "1"  # tells js whether this is a new callout or one that is already loaded
+    if data["foldable"]:
+        classlist += " callout-folded"
+    if data["foldable"] and not data["folded"]:
+        rasa = "0"  # do not remove active class when js is active
+    if data["foldable"] and data["folded"]:
+        classlist += " inactive"
+
+    onclick = ""
+    if data["foldable"]:
+        onclick = ' onclick="toggle_callout(this.parentElement)"'
+
+    svg_name = data["call-out-class"]
+    if svg_name not in shared_obsidian_svgs.keys():
+        svg_name = "default"
+
+    parts = [
+        f'<div class="{html.escape(classlist)}" rasa="{rasa}">',
+        f'<div class="callout-title "{onclick}>',
+        f'<div class="callout-title-icon">{shared_obsidian_svgs[svg_name]}\n</div>',
+        '<div class="callout-title-name">',
+    ]
+    end_parts = ["</div>"]
+    if data["foldable"]:
+        end_parts.append(f'<div class="callout-title-fold">{shared_obsidian_svgs["fold"]}</div>')
+    end_parts.append("</div>")
+    end_parts.append('<div class="callout-content">')
+    return "\n".join(parts), "\n".join(end_parts) + "\n"
@@ -0,0 +1,84 @@
+"""
+Code block plugin for markdown-it-py, the equivalent of the fenced_code and codehilite extensions, together with
+markdown_extensions/CodeWrapperExtension.py, AdmonitionExtension.py and MermaidExtension.py:
+
+- ```ad-cite blocks become the same citation div as AdmonitionExtension creates (the contents are not parsed)
+- ```mermaid blocks become <div class="mermaid"> (when mermaid_diagrams is enabled), and the mermaid script is added to the page
+- all other code blocks are highlighted with Pygments, with the same options as codehilite, so that the HighlightCache is shared
+  with python-markdown
+- blocks fenced with ``` are wrapped in <div class="lang-...">
+"""
+
+import html
+
+from markdown_it.token import Token
+
+from ..markdown_extensions.CachedCodeHiliteExtension import CachedCodeHilite, CachedCodeHiliteExtension
+from ..markdown_extensions.AdmonitionExtension import title_icon
+from ..markdown_extensions.MermaidExtension import mermaid_init_script, strip_notprintable
+
+
+def fence_plugin(md, highlight_cache=None, mermaid_diagrams=False, mermaid_strip_special_chars=True):
+    renderer = FenceRenderer(highlight_cache, mermaid_diagrams, mermaid_strip_special_chars)
+    md.add_render_rule("fence", lambda self, tokens, idx, options, env: renderer.render_fence(tokens[idx]))
+    md.add_render_rule("code_block", lambda self, tokens, idx, options, env: renderer.render_code_block(tokens[idx]))
+
+    if mermaid_diagrams:
+        # the script goes before the footnotes, as with python-markdown
+        if "footnote_tail" in md.core.ruler.get_all_rules():
+            md.core.ruler.before("footnote_tail", "mermaid_script", renderer.add_mermaid_script)
+        else:
+            md.core.ruler.push("mermaid_script", renderer.add_mermaid_script)
+
+
+class FenceRenderer:
+    def __init__(self, highlight_cache, mermaid_diagrams, mermaid_strip_special_chars):
+        self.mermaid_diagrams = mermaid_diagrams
+        self.mermaid_strip_special_chars = mermaid_strip_special_chars
+        self.codehilite_config = CachedCodeHiliteExtension(linenums=False, highlight_cache=highlight_cache).getConfigs()
+
+    def is_mermaid(self, token):
+        return self.mermaid_diagrams and token.markup in ("```", "~~~") and token.info.strip() in ("mermaid", "Mermaid")
+
+    def highlight(self, code, lang, shebang, **options):
+        config = self.codehilite_config.copy()
+        config.update(options)
+        return CachedCodeHilite(code, lang=lang, style=config.pop("pygments_style", "default"), **config).hilite(shebang=shebang)
+
+    def render_fence(self, token):
+        info = token.info.strip()
+        backticks = token.markup.startswith("```")
+
+        if backticks and info.startswith("ad-cite"):
+            return self.render_admonition(token)
+
+        if self.is_mermaid(token):
+            lines = [strip_notprintable(x, self.mermaid_strip_special_chars) for x in token.content.rstrip("\n").split("\n")]
+            output = '<div class="mermaid">\n' + "\n".join(lines) + "\n</div>\n"
+        else:
+            lang = info.split(" ")[0].lstrip(".") or None
+            output = self.highlight(token.content, lang, shebang=False)
+
+        if backticks:
+            output = f'<div class="lang-{html.escape(info or "general")}">\n{output}</div>\n'
+        return output
+
+    def render_code_block(self, token):
+        return self.highlight(token.content.rstrip() + "\n", None, shebang=True, tab_length=4)
+
+    def render_admonition(self, token):
+        lines = ['<div class="ad-cite">']
+        for line in token.content.rstrip("\n").split("\n"):
+            if line.startswith("title:"):
+                title = line.replace("title:", "").strip()
+                lines.append(f'<div class="ad-cite-title">{title_icon}<div class="ad-cite-title-content">{title}</div></div>')
+            else:
+                lines.append(line)
+        lines.append("</div>")
+        return "\n".join(lines) + "\n"
+
+    def add_mermaid_script(self, state):
+        if any(x.type == "fence" and self.is_mermaid(x) for x in state.tokens):
+            token = Token("html_block", "", 0)
+            token.content = mermaid_init_script + "\n"
+            state.tokens.append(token)
@@ -0,0 +1,62 @@
+"""
+Footnote plugin for markdown-it-py, the equivalent of markdown_extensions/FootnoteExtension.py: footnotes ([^name]) and inline
+footnotes (^[text]) are parsed by the footnote plugin of mdit-py-plugins, and rendered with the same html (and ids) as the
+FootnoteExtension creates. Footnotes are numbered in the order in which they are first referenced.
+"""
+
+from mdit_py_plugins.footnote import footnote_plugin as mdit_footnote_plugin
+
+BACKLINK_TITLE = "Jump back to footnote {} in the text"
+
+
+def footnote_plugin(md):
+    mdit_footnote_plugin(md)
+    md.add_render_rule("footnote_ref", render_footnote_ref)
+    md.add_render_rule("footnote_block_open", render_footnote_block_open)
+    md.add_render_rule("footnote_block_close", render_footnote_block_close)
+    md.add_render_rule("footnote_open", render_footnote_open)
+    md.add_render_rule("footnote_close", render_footnote_close)
+    md.add_render_rule("footnote_anchor", render_footnote_anchor)
+
+
+def make_ref_id(id, sub_id):
+    """Returns the id of a reference to footnote id (counted from 0), e.g. fnref:1 for the first reference, fnref2:1 for the second"""
+    if sub_id == 0:
+        return f"fnref:{id + 1}"
+    return f"fnref{sub_id + 1}:{id + 1}"
+
+
+def render_footnote_ref(self, tokens, idx, options, env):
+    meta = tokens[idx].meta
+    number = meta["id"] + 1
+    return f'<sup id="{make_ref_id(meta["id"], meta.get("subId", 0))}"><a class="footnote-ref" href="#fn:{number}">{number}</a></sup>'
+
+
+def render_footnote_block_open(self, tokens, idx, options, env):
+    return '<div class="footnote">\n<hr />\n<ol>\n'
+
+
+def render_footnote_block_close(self, tokens, idx, options, env):
+    return "</ol>\n</div>\n"
+
+
+def render_footnote_open(self, tokens, idx, options, env):
+    return f'<li id="fn:{tokens[idx].meta["id"] + 1}">\n'
+
+
+def render_footnote_close(self, tokens, idx, options, env):
+    return "</li>\n"
+
+
+def render_footnote_anchor(self, tokens, idx, options, env):
+    meta = tokens[idx].meta
+    anchor = f'<a class="footnote-backref" href="#{make_ref_id(meta["id"], meta["subId"])}" title="{BACKLINK_TITLE.format(meta["id"])}">&#8617;</a>'
+
+    # the anchors are added to the last paragraph of the footnote, or to a paragraph of their own
+    first = idx - meta["subId"]
+    in_paragraph = tokens[first - 1].type == "inline"
+    if meta["subId"] == 0:
+        anchor = ("&#160;" if in_paragraph else "<p>") + anchor
+    if not in_paragraph and (idx + 1 == len(tokens) or tokens[idx + 1].type != "footnote_anchor"):
+        anchor += "</p>\n"
+    return anchor
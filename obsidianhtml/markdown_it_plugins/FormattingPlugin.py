@@ -0,0 +1,47 @@
+"""
+Formatting plugin for markdown-it-py, the equivalent of markdown_extensions/FormattingExtension.py:
+
+    ~~strikethrough~~ -> <span class="formatting_strikethrough">strikethrough</span>
+    ==highlight==     -> <mark class="formatting_highlight">highlight</mark>
+
+The text in between is parsed as inline markdown, as python-markdown does.
+"""
+
+formats = {
+    "~": ("formatting_strikethrough", '<span class="formatting_strikethrough">', "</span>"),
+    "=": ("formatting_highlight", '<mark class="formatting_highlight">', "</mark>"),
+}
+
+
+def formatting_plugin(md):
+    # before emphasis and links, like the python-markdown patterns
+    md.inline.ruler.before("emphasis", "formatting", formatting_rule)
+
+
+def formatting_rule(state, silent):
+    char = state.src[state.pos]
+    if char not in formats or state.src[state.pos : state.pos + 2] != char * 2:
+        return False
+
+    # (.*?): the first closing pair on the same line
+    start = state.pos + 2
+    end = state.src.find(char * 2, start, state.posMax)
+    if end == -1 or "\n" in state.src[start:end]:
+        return False
+
+    if not silent:
+        name, open_tag, close_tag = formats[char]
+        token = state.push("html_inline", "", 0)
+        token.content = open_tag
+
+        max_pos = state.posMax
+        state.pos = start
+        state.posMax = end
+        state.md.inline.tokenize(state)
+        state.posMax = max_pos
+
+        token = state.push("html_inline", "", 0)
+        token.content = close_tag
+
+    state.pos = end + 2
+    return True
@@ -0,0 +1,73 @@
+"""
+Table of contents plugin for markdown-it-py, the equivalent of markdown_extensions/CustomTocExtension.py:
+headers get the same ids as with python-markdown (so that links to headers keep working), and a paragraph that only contains
+[TOC] is replaced by the table of contents.
+"""
+
+import html
+import re
+import string
+
+from markdown_it.token import Token
+
+from ..lib import slugify
+from ..markdown_extensions.CustomTocExtension import nest_toc_tokens, unique
+
+TOC_MARKER = "[TOC]"
+
+
+def toc_plugin(md):
+    md.core.ruler.after("inline", "toc", toc_rule)
+
+
+def get_name(inline_token):
+    """Returns the text of a header, without the html tags"""
+    text = []
+    for child in inline_token.children or []:
+        if child.type in ("text", "code_inline"):
+            text.append(child.content)
+        elif child.type == "html_inline":
+            text.append(re.sub(r"(<[^>]+>)", "", child.content))
+    return "".join(text).strip()
+
+
+def build_toc_html(toc_list):
+    def build_ul(toc_list):
+        items = []
+        for item in toc_list:
+            children = build_ul(item["children"]) if item["children"] else ""
+            items.append(f'<li><a href="#{html.escape(item["id"])}">{html.escape(item["name"], quote=False)}</a>{children}</li>\n')
+        return "<ul>\n" + "".join(items) + "</ul>\n"
+
+    return '<div class="toc">\n' + build_ul(toc_list) + "</div>\n"
+
+
+def toc_rule(state):
+    tokens = state.tokens
+    used_ids = set()
+    toc_tokens = []
+    markers = []
+
+    for i, token in enumerate(tokens):
+        if token.type == "heading_open":
+            name = get_name(tokens[i + 1])
+            if token.attrGet("id") is None:
+                id = unique(slugify(name, "-"), used_ids)
+                if id[0] not in string.ascii_letters:
+                    id = "h_" + id
+                token.attrSet("id", id)
+            toc_tokens.append({"level": int(token.tag[1]), "id": token.attrGet("id"), "name": name})
+
+        elif token.type == "paragraph_open" and tokens[i + 1].content.strip() == TOC_MARKER:
+            markers.append(i)
+
+    if not markers:
+        return
+
+    toc_html = build_toc_html(nest_toc_tokens(toc_tokens))
+    # replace the paragraph_open, inline and paragraph_close tokens of the markers, last first to keep the indexes valid
+    for i in reversed(markers):
+        token = Token("html_block", "", 0)
+        token.content = toc_html
+        token.block = True
+        tokens[i : i + 3] = [token]
@@ -0,0 +1,61 @@
+from markdown_it import MarkdownIt
+from mdit_py_plugins.deflist import deflist_plugin
+
+from . import MarkdownRenderer, get_highlight_cache
+from ..markdown_extensions.DataviewExtension import DataviewExtension, DataviewPreprocessor
+from ..markdown_extensions.EmbeddedSearchExtension import EmbeddedSearchPreprocessor
+from ..markdown_extensions.EraserExtension import EraserPreprocessor
+from ..markdown_it_plugins.AbbrPlugin import abbr_plugin
+from ..markdown_it_plugins.ArithmatexPlugin import arithmatex_plugin
+from ..markdown_it_plugins.BlockLinkPlugin import block_link_plugin
+from ..markdown_it_plugins.CallOutPlugin import callout_plugin
+from ..markdown_it_plugins.FencePlugin import fence_plugin
+from ..markdown_it_plugins.FootnotePlugin import footnote_plugin
+from ..markdown_it_plugins.FormattingPlugin import formatting_plugin
+from ..markdown_it_plugins.TocPlugin import toc_plugin
+
+
+class MarkdownItRenderer(MarkdownRenderer):
+    """Converts markdown to html with markdown-it-py (markdown_engine: markdown-it), which follows the CommonMark spec, and is faster
+    than python-markdown. The extensions of python-markdown that ObsidianHtml uses are replaced by the plugins in markdown_it_plugins,
+    which create the same html. The preprocessors that work on the lines of the page are shared with python-markdown.
+    See ci/tests/renderer_conformance_test.py for the known differences between both engines.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+
+        md = MarkdownIt("commonmark", {"html": True, "xhtmlOut": True}).enable("table")
+        # links are already url encoded by the md2html step
+        md.normalizeLink = lambda url: url
+
+        md.use(deflist_plugin)
+        md.use(formatting_plugin)
+        md.use(arithmatex_plugin)
+        md.use(abbr_plugin)
+        md.use(callout_plugin)
+        md.use(toc_plugin)
+        md.use(block_link_plugin)
+        if settings["footnotes"]:
+            md.use(footnote_plugin)
+        md.use(
+            fence_plugin,
+            highlight_cache=get_highlight_cache(settings),
+            mermaid_diagrams=settings["mermaid_diagrams"],
+            mermaid_strip_special_chars=settings["mermaid_strip_special_chars"],
+        )
+        self.md = md
+
+    def preprocess(self, page, rel_dst_path):
+        lines = page.split("\n")
+        if self.settings["dataview_export_folder"] is not None:
+            extension = DataviewExtension(note_path=rel_dst_path, dataview_export_folder=self.settings["dataview_export_folder"])
+            lines = DataviewPreprocessor(extension).run(lines)
+        if self.settings["eraser"]:
+            lines = EraserPreprocessor(None).run(lines)
+        if self.settings["embedded_search"]:
+            lines = EmbeddedSearchPreprocessor(None).run(lines)
+        return "\n".join(lines)
+
+    def convert(self, page, rel_dst_path):
+        return self.md.render(self.preprocess(page, rel_dst_path), {})
@@ -1,19 +1,34 @@
+import sys
 import regex as re
 import urllib.parse  # convert link characters like %
 import warnings
 
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
 from .. import md2html
 
 from ..features.SidePane import get_side_pane_id_by_content_selector
 from ..features.add_toc_when_missing import gc_add_toc_when_missing, add_toc_when_missing
 
 from ..parser.MarkdownLink import MarkdownLink
+from ..parser.PageRewriter import PageRewriter, insert_bare_links
 
 from ..core.FileObject import FileObject
+from ..core.HighlightCache import HighlightCache
 from ..lib import simpleHash, get_rel_html_url_prefix
 
 from ..compiler.Templating import PopulateTemplate
 
+# Patterns of the links that are rewritten in every page, see convert_markdown_page_to_html_and_export() and render_html_page()
+proper_link_pattern = re.compile(r"(?<=\]\()[^\s\]]+?(?=\))")
+source_tag_pattern = re.compile(r'(?<=<source src=")([^"]*)')
+img_tag_pattern = re.compile(r'<img src=".*?>')
+embed_tag_pattern = re.compile(r'(?<=<embed src=")([^"]*)')
+bare_link_pattern = re.compile(r'(?<![\[\("])(https*:\/\/.[^\s]*)')
+html_link_pattern = re.compile(r'<a href="([^"]*)"')
+
 
 def convert_markdown_page_to_html_and_export(fo: "FileObject", pb, backlink_node=None, log_level=1, capture_in_jar=False):
     """
@@ -77,6 +92,26 @@ def convert_markdown_page_to_html_and_export(fo: "FileObject", pb, backlink_node
     if pb.gc("toggles/features/search/enabled", cached=True):
         pb.search.AddPage(filename=page_path.stem, content=md.page, metadata=md.metadata, url=node["url"], rtr_url=node["rtr_url"], title=node["name"])
 
+    # Reuse the output of the previous run when nothing that the page depends on has changed
+    # ------------------------------------------------------------------
+    # (pages that are captured in a jar are always converted, as the jar needs the html body)
+    manifest = None
+    if pb.build_manifest is not None and not capture_in_jar:
+        manifest = pb.build_manifest
+        manifest_inputs = manifest.get_first_pass_inputs(md, node)
+        manifest_entry = manifest.get_reusable_page_entry(fo, manifest_inputs)
+
+        if manifest_entry is not None:
+            html, links = manifest.reuse_page_entry(fo, manifest_entry)
+
+            md.AddToTagtree(pb.tagtree, fo.path["html"]["file_relative_path"].as_posix())
+            pb.html_page_store.add(fo.path["html"]["file_absolute_path"], html)
+
+            return (backlink_node, md.links + links)
+
+        manifest.start_recording()
+        manifest_links_offset = len(md.links)
+
     # [1] Replace code blocks with placeholders so they aren't altered
     # They will be restored at the end
     # ------------------------------------------------------------------
@@ -85,9 +120,11 @@ def convert_markdown_page_to_html_and_export(fo: "FileObject", pb, backlink_node
     # Get all local markdown links.
     # ------------------------------------------------------------------
     # This is any string in between '](' and  ')' with no spaces in between the ( and )
-    proper_links = re.findall(r"(?<=\]\()[^\s\]]+?(?=\))", md.page)
-    for l in proper_links:
-        ol = l
+    # All the links of a kind are replaced in one pass (see PageRewriter), in the order in which they are found
+    rewriter = PageRewriter(md.page)
+    for match in proper_link_pattern.finditer(md.page):
+        ol = match.group(0)
+        l = ol
 
         l = urllib.parse.unquote(l)
 
@@ -112,8 +149,10 @@ def convert_markdown_page_to_html_and_export(fo: "FileObject", pb, backlink_node
 
                 new_link = f'<a class="download-button" target="_blank" download="" href="{link_url}"><span class="file-embed-icon"><svg xmlns="http://www.w3.org/2000/svg" width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" class="svg-icon lucide-file"><path d="M14.5 2H6a2 2 0 0 0-2 2v16a2 2 0 0 0 2 2h12a2 2 0 0 0 2-2V7.5L14.5 2z"></path><polyline points="14 2 14 8 20 8"></polyline></svg></span>{link_name}</a>'
 
-            safe_link = "\[[^\]]+?\]\(" + re.escape(ol) + "\)"
-            md.page = re.sub(safe_link, new_link, md.page)
+            # replace [link_name](ol)
+            start = find_link_text_start(md.page, match.start() - 2, rewriter.position)
+            if start is not None:
+                rewriter.replace(start, match.end() + 1, new_link)
             continue
 
         # Don't process in the following cases (link empty or // in the link)
@@ -151,12 +190,14 @@ def convert_markdown_page_to_html_and_export(fo: "FileObject", pb, backlink_node
             new_link = f']({urllib.parse.quote(link.fo.get_link("html", origin=fo, encode_special=False))}{query_part})'
 
         # Update link
-        safe_link = re.escape("](" + ol + ")")
-        md.page = re.sub(safe_link, new_link, md.page)
+        rewriter.replace(match.start() - 2, match.end() + 1, new_link)
+    md.page = rewriter.result()
 
     # [?] Handle local source tag-links (copy them over to output)
     # ------------------------------------------------------------------
-    for link in re.findall(r'(?<=<source src=")([^"]*)', md.page):
+    rewriter = PageRewriter(md.page)
+    for match in source_tag_pattern.finditer(md.page):
+        link = match.group(0)
         l = urllib.parse.unquote(link)
         if "://" in l:
             continue
@@ -173,12 +214,16 @@ def convert_markdown_page_to_html_and_export(fo: "FileObject", pb, backlink_node
 
         # [11.2] Adjust video link in page to new dst folder (when the link is to a file in our root folder)
         new_link = '<source src="' + urllib.parse.quote(lo.get_link("html", origin=fo, encode_special=False)) + '"'
-        safe_link = r'<source src="' + re.escape(link) + r'"'
-        md.page = re.sub(safe_link, new_link, md.page)
+        if md.page[match.end() : match.end() + 1] == '"':
+            rewriter.replace(match.start() - len('<source src="'), match.end() + 1, new_link)
+    md.page = rewriter.result()
 
     # [?] Handle local img tag-links (copy them over to output)
     # ------------------------------------------------------------------
-    for tag in re.findall(r'<img src=".*?>', md.page):
+    rewriter = PageRewriter(md.page)
+    for match in img_tag_pattern.finditer(md.page):
+        tag = match.group(0)
+
         # get template and link from tag
         # e.g. <img src="200w.gif"  width="200"> --> <img src="{link}"  width="200"> & 200w.gif
         parts = tag.split('src="')
@@ -206,12 +251,14 @@ def convert_markdown_page_to_html_and_export(fo: "FileObject", pb, backlink_node
 
         # [11.2] Adjust video link in page to new dst folder (when the link is to a file in our root folder)
         new_link = template.replace("{link}", urllib.parse.quote(lo.get_link("html", origin=fo, encode_special=False)))
-        safe_link = re.escape(tag)
-        md.page = re.sub(safe_link, new_link, md.page)
+        rewriter.replace(match.start(), match.end(), new_link)
+    md.page = rewriter.result()
 
     # [?] Handle local embeddable tag-links (copy them over to output)
     # ------------------------------------------------------------------
-    for link in re.findall(r'(?<=<embed src=")([^"]*)', md.page):
+    rewriter = PageRewriter(md.page)
+    for match in embed_tag_pattern.finditer(md.page):
+        link = match.group(0)
         l = urllib.parse.unquote(link)
         if "://" in l:
             continue
@@ -228,8 +275,9 @@ def convert_markdown_page_to_html_and_export(fo: "FileObject", pb, backlink_node
 
         # [11.2] Adjust video link in page to new dst folder (when the link is to a file in our root folder)
         new_link = '<embed src="' + urllib.parse.quote(lo.get_link("html", origin=fo, encode_special=False)) + '"'
-        safe_link = r'<embed src="' + re.escape(link) + r'"'
-        md.page = re.sub(safe_link, new_link, md.page)
+        if md.page[match.end() : match.end() + 1] == '"':
+            rewriter.replace(match.start() - len('<embed src="'), match.end() + 1, new_link)
+    md.page = rewriter.result()
 
     # [?] Documentation styling: Table of Contents
     # ------------------------------------------------------------------
@@ -244,10 +292,10 @@ def convert_markdown_page_to_html_and_export(fo: "FileObject", pb, backlink_node
     # Cannot start with [, (, nor "
     # match 'http://* ' or 'https://* ' (end match by whitespace)
     # Note that note->md step also does this, this should be void if doing note-->html, but useful when doing md->html
-    for l in re.findall('(?<![\[\("])(https*:\/\/.[^\s]*)', md.page):
-        new_md_link = f"[{l}]({l})"
-        safe_link = re.escape(l)
-        md.page = re.sub(f"(?<![\[\(])({safe_link})", new_md_link, md.page)
+    # When more than one link matches at the same position, the link that was found first is used
+    bare_links = bare_link_pattern.findall(md.page)
+    if len(bare_links) > 0:
+        md.page = insert_bare_links(md.page, bare_links)
 
     # strip svg, as python-markdown corrupts these
     # ------------------------------------------------------------------
@@ -259,16 +307,69 @@ def convert_markdown_page_to_html_and_export(fo: "FileObject", pb, backlink_node
 
     # [11] Convert markdown to html
     # ------------------------------------------------------------------
-    html_body = md2html.pythonmarkdown_convert_md_to_html(pb, md.page, rel_dst_path)
+    # Everything above changes shared state (network tree, search index, copied files), so it is always done here, in crawl order.
+    # The conversion itself only needs the job below, so pb.html_render_queue is free to run it in a worker process (see --jobs).
+    md.AddToTagtree(pb.tagtree, fo.path["html"]["file_relative_path"].as_posix())
+
+    if manifest is not None:
+        manifest.stop_recording_page(fo, manifest_inputs, md.links[manifest_links_offset:])
+
+    job = {
+        "page": md.page,
+        "svgs": svgs,
+        "rel_dst_path": rel_dst_path,
+        "dst_abs_path": fo.path["html"]["file_absolute_path"],
+        "node": {"id": node["id"], "nid": node["nid"], "name": node["name"]},
+        "html_url_prefix": html_url_prefix,
+        "page_depth": page_depth,
+        "capture_in_jar": capture_in_jar,
+        "record_output": manifest is not None,
+    }
+    pb.html_render_queue.submit(fo, job)
+
+    # Return links to crawl through linked notes
+    # ------------------------------------------------------------------
+    return (backlink_node, md.links)
+
+
+def find_link_text_start(page, text_end, position):
+    """Returns where the text of the markdown link [text](link) starts, with text_end the position of its "]", or None when there is no text.
+    position is the end of the last replaced link, the text can't start before that."""
+    start = max(page.rfind("]", 0, text_end) + 1, position)
+    if start >= text_end - 1:
+        return None
+    start = page.find("[", start, text_end - 1)
+    if start == -1:
+        return None
+    return start
+
+
+def render_html_page(pb, job):
+    """
+    Converts the prepared markdown of a page (see convert_markdown_page_to_html_and_export) to html, and wraps it in the html template.
+    Does not change any shared state, so that it can be run in a worker process.
+    Returns the converted body (what capture_in_jar stores) and the full html of the page.
+    """
+    rel_dst_path = job["rel_dst_path"]
+    node = job["node"]
+    html_url_prefix = job["html_url_prefix"]
+    page_depth = job["page_depth"]
+
+    # PopulateTemplate reads the prefix from the config
+    if pb.gc("toggles/relative_path_html", cached=True):
+        pb.sc(path="html_url_prefix", value=html_url_prefix)
+
+    # [11] Convert markdown to html
+    # ------------------------------------------------------------------
+    html_body = md2html.convert_md_to_html(pb, job["page"], rel_dst_path)
     html_body = f'<div class="content">{html_body}</div>'
 
     # restore svg, as python-markdown corrupts these
     # ------------------------------------------------------------------
-    for i, v in enumerate(svgs):
+    for i, v in enumerate(job["svgs"]):
         html_body = html_body.replace("---obsidian_html_svg_block_" + str(i), v)
 
-    if capture_in_jar:
-        pb.jars[capture_in_jar] = html_body
+    jar_body = html_body
 
     # HTML Tweaks
     # [??] Embedded note titles integration
@@ -310,28 +411,28 @@ def convert_markdown_page_to_html_and_export(fo: "FileObject", pb, backlink_node
 
     # ------------------------------------------------------------------
     # [14] Tag external/anchor links with a class so they can be decorated differently
-    for l in re.findall(r'(?<=\<a href=")([^"]*)', html_body):
+    external_blank_html = ""
+    if pb.gc("toggles/external_blank", cached=True):
+        # add in target="_blank" (or not)
+        external_blank_html = 'target="_blank" '
+
+    def tag_link(match):
+        l = match.group(1)
         if l == "":
-            continue
+            return match.group(0)
 
         # anchor links
         if l[0] == "#":
-            new_str = f'<a href="{l}" class="anchor-link"'
+            return f'<a href="{l}" class="anchor-link"'
 
         # not internal or internal and not .html file
-        elif (l[0] not in ("/", ".")) or ("." in l.split("/")[-1] and ".html" not in l.split("/")[-1]):
-            # add in target="_blank" (or not)
-            external_blank_html = ""
-            if pb.gc("toggles/external_blank", cached=True):
-                external_blank_html = 'target="_blank" '
+        if (l[0] not in ("/", ".")) or ("." in l.split("/")[-1] and ".html" not in l.split("/")[-1]):
+            return f'<a href="{l}" {external_blank_html}class="external-link"'
 
-            new_str = f'<a href="{l}" {external_blank_html}class="external-link"'
-        else:
-            continue
+        return match.group(0)
 
-        # convert link
-        safe_str = f'<a href="{l}"'
-        html_body = html_body.replace(safe_str, new_str)
+    # convert links, in one pass
+    html_body = html_link_pattern.sub(tag_link, html_body)
 
     # [15] Tag not created links with a class so they can be decorated differently
     html_body = html_body.replace(f'<a href="{html_url_prefix}/not_created.html">', f'<a href="{html_url_prefix}/not_created.html" class="nonexistent-link">')
@@ -378,23 +479,210 @@ def convert_markdown_page_to_html_and_export(fo: "FileObject", pb, backlink_node
     # ------------------------------------------------------------------
     html = html.replace("{{navbar_links}}", "\n".join(pb.navbar_links))
 
-    # Save file
-    # ------------------------------------------------------------------
-    fo.path["html"]["file_absolute_path"].parent.mkdir(parents=True, exist_ok=True)
-    html_dst_path_posix = fo.path["html"]["file_absolute_path"].as_posix()
+    return (jar_body, html)
 
-    md.AddToTagtree(pb.tagtree, fo.path["html"]["file_relative_path"].as_posix())
 
-    # Write html
-    with open(html_dst_path_posix, "w", encoding="utf-8") as f:
-        f.write(html)
+# Attributes of pb that render_html_page() needs, these are copied to the worker processes
+render_worker_pb_attributes = (
+    "config",
+    "paths",
+    "html_template",
+    "graph_template",
+    "dynamic_inclusions",
+    "dynamic_footer_inclusions",
+    "navbar_links",
+    "capabilities_needed",
+    "configured_html_prefix",
+)
+render_worker_pb = None  # set by init_render_worker, only in worker processes
 
-    # Return links to crawl through linked notes
-    # ------------------------------------------------------------------
-    return (backlink_node, md.links)
 
+def init_render_worker(pb_attributes):
+    from ..core.PicknickBasket import PicknickBasket
+
+    global render_worker_pb
+    render_worker_pb = PicknickBasket()
+    for key, value in pb_attributes.items():
+        setattr(render_worker_pb, key, value)
+
+
+def render_html_page_in_worker(job):
+    jar_body, html = render_html_page(render_worker_pb, job)
+
+    # only send back what the main process will use
+    if not job["capture_in_jar"]:
+        jar_body = None
 
-def pythonmarkdown_convert_md_to_html(pb, page, rel_dst_path):
+    # the main process prints the stats of all processes
+    highlight_stats = None
+    highlight_cache = get_highlight_cache(get_markdown_settings(render_worker_pb))
+    if highlight_cache is not None:
+        highlight_stats = highlight_cache.take_stats()
+
+    return (jar_body, html, highlight_stats)
+
+
+class HtmlRenderQueue:
+    """
+    Runs render_html_page() for every page that is submitted to it, and puts the result in pb.html_page_store.
+    With jobs == 1 pages are rendered right away. With jobs > 1 they are rendered by a pool of worker processes, and the results are
+    applied in the order in which the pages were submitted, so that the output does not depend on which worker finishes first.
+    """
+
+    def __init__(self, pb, jobs=1):
+        self.pb = pb
+        self.executor = None
+        self.pending = deque()
+
+        if jobs > 1:
+            pb_attributes = {key: getattr(pb, key) for key in render_worker_pb_attributes}
+            self.executor = ProcessPoolExecutor(max_workers=jobs, initializer=init_render_worker, initargs=(pb_attributes,))
+
+    def submit(self, fo, job):
+        if self.executor is None:
+            self.apply_result(fo, job, render_html_page(self.pb, job))
+            return
+
+        self.pending.append((fo, job, self.executor.submit(render_html_page_in_worker, job)))
+
+        # apply results that are already in, so that they don't pile up
+        while len(self.pending) > 0 and self.pending[0][2].done():
+            self.apply_pending()
+
+    def apply_pending(self):
+        fo, job, future = self.pending.popleft()
+        try:
+            jar_body, html, highlight_stats = future.result()
+        except Exception:
+            self.pb.init_state(action="m2h", loop_type="md_note", current_fo=fo, subroutine="render_html_page")
+            raise
+
+        if highlight_stats is not None:
+            get_highlight_cache(get_markdown_settings(self.pb)).add_stats(highlight_stats)
+        self.apply_result(fo, job, (jar_body, html))
+
+    def apply_result(self, fo, job, result):
+        jar_body, html = result
+        if job["capture_in_jar"]:
+            self.pb.jars[job["capture_in_jar"]] = jar_body
+        if job["record_output"]:
+            self.pb.build_manifest.record_page_output(fo, html)
+        self.pb.html_page_store.add(job["dst_abs_path"], html)
+
+    def finish(self):
+        """Waits for all submitted pages to be rendered. Must be called before the second pass."""
+        while len(self.pending) > 0:
+            self.apply_pending()
+
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+
+class HtmlPageStore:
+    """
+    Holds the html of the pages from the first pass, so that the second pass does not have to read them back from disk,
+    and every page is written exactly once. When the pages take up more than max_size bytes (html_page_store_size_mb), the
+    remaining pages are written to their output path right away, and read back in when they are needed.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.pages = {}
+        self.size = 0
+        self.folders = {}  # folder path -> names of the pages that were added to it
+
+    def add(self, path, html):
+        key = path.as_posix()
+        if key in self.pages:
+            self.size -= sys.getsizeof(self.pages.pop(key))
+
+        # create the folder right away, so that the dir tree can list it before the pages are written
+        folder = path.parent.as_posix()
+        if folder not in self.folders:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.folders[folder] = set()
+        self.folders[folder].add(path.name)
+
+        size = sys.getsizeof(html)
+        if self.size + size > self.max_size:
+            self.write(path, html)
+            return
+
+        self.pages[key] = html
+        self.size += size
+
+    def read(self, path):
+        """Returns the html of the page, raises FileNotFoundError when the page was not created"""
+        key = path.as_posix()
+        if key in self.pages:
+            return self.pages[key]
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def exists(self, path):
+        return path.as_posix() in self.pages or path.exists()
+
+    def list_folder(self, folder):
+        """Returns the paths of the pages in the folder that were added to the store, whether they are written yet or not"""
+        return [folder.joinpath(name) for name in self.folders.get(folder.as_posix(), [])]
+
+    def write(self, path, html):
+        """Writes the final html of the page to its output path"""
+        key = path.as_posix()
+        if key in self.pages:
+            self.size -= sys.getsizeof(self.pages.pop(key))
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html)
+
+    def flush(self):
+        """Writes the pages that the second pass did not write, as they are"""
+        for key, html in list(self.pages.items()):
+            self.write(Path(key), html)
+
+
+# Markdown renderers of this process, by their settings (see get_markdown_renderer)
+markdown_renderers = {}
+
+# Highlighted code blocks of this process, see get_highlight_cache
+highlight_cache = None
+
+
+def get_markdown_settings(pb):
+    """Returns the settings that decide which markdown engine is used, and which extensions it is configured with"""
+    settings = {
+        "engine": pb.gc("markdown_engine", cached=True),
+        "footnotes": pb.gc("toggles/features/footnote_md_extension/enabled", cached=True),
+        "mermaid_diagrams": pb.gc("toggles/features/mermaid_diagrams/enabled", cached=True),
+        "mermaid_strip_special_chars": None,
+        "dataview_export_folder": None,
+        "eraser": pb.gc("toggles/features/eraser/enabled", cached=True),
+        "embedded_search": pb.gc("toggles/features/embedded_search/enabled", cached=True),
+        "highlight_cache_folder": None,
+        "highlight_cache_size": pb.gc("highlight_cache_size_mb", cached=True) * 1024 * 1024,
+    }
+    if settings["mermaid_diagrams"]:
+        settings["mermaid_strip_special_chars"] = pb.gc("toggles/features/mermaid_diagrams/strip_special_chars", cached=True)
+    if pb.gc("toggles/features/dataview/enabled", cached=True):
+        settings["dataview_export_folder"] = pb.paths["dataview_export_folder"]
+    if settings["highlight_cache_size"] > 0:
+        settings["highlight_cache_folder"] = Path(pb.paths["appdir"]).joinpath("highlight_cache").as_posix()
+    return settings
+
+
+def get_highlight_cache(settings):
+    """Returns the HighlightCache of this process, or None when highlight_cache_size_mb is 0"""
+    global highlight_cache
+    if settings["highlight_cache_folder"] is None:
+        return None
+    if highlight_cache is None:
+        highlight_cache = HighlightCache(settings["highlight_cache_folder"], settings["highlight_cache_size"])
+    return highlight_cache
+
+
+def create_markdown_converter(settings):
     import markdown
     from ..markdown_extensions.CallOutExtension import CallOutExtension
 
@@ -408,6 +696,7 @@ def pythonmarkdown_convert_md_to_html(pb, page, rel_dst_path):
     from ..markdown_extensions.CodeWrapperExtension import CodeWrapperExtension
     from ..markdown_extensions.AdmonitionExtension import AdmonitionExtension
     from ..markdown_extensions.BlockLinkExtension import BlockLinkExtension
+    from ..markdown_extensions.CachedCodeHiliteExtension import CachedCodeHiliteExtension
 
     extensions = [
         "abbr",
@@ -417,59 +706,108 @@ def pythonmarkdown_convert_md_to_html(pb, page, rel_dst_path):
         "tables",
         "md_in_html",
         FormattingExtension(),
-        "codehilite",
+        CachedCodeHiliteExtension(linenums=False, highlight_cache=get_highlight_cache(settings)),
         CustomTocExtension(),
         CallOutExtension(),
         "pymdownx.arithmatex",
     ]
 
-    extension_configs = {"codehilite": {"linenums": False}, "pymdownx.arithmatex": {"generic": True}}
+    extension_configs = {"pymdownx.arithmatex": {"generic": True}}
 
-    if pb.gc("toggles/features/footnote_md_extension/enabled"):
+    if settings["footnotes"]:
         extensions.append(FootnoteExtension())
 
-    if pb.gc("toggles/features/mermaid_diagrams/enabled"):
-        strip_special_chars = pb.gc("toggles/features/mermaid_diagrams/strip_special_chars")
-        extensions.append(MermaidExtension(strip_special_chars=strip_special_chars))
+    if settings["mermaid_diagrams"]:
+        extensions.append(MermaidExtension(strip_special_chars=settings["mermaid_strip_special_chars"]))
 
-    if pb.gc("toggles/features/dataview/enabled"):
+    if settings["dataview_export_folder"] is not None:
+        # the note_path is set for every page, see PythonMarkdownRenderer
         extensions.append("dataview")
-        extension_configs["dataview"] = {"note_path": rel_dst_path, "dataview_export_folder": pb.paths["dataview_export_folder"]}
+        extension_configs["dataview"] = {"note_path": "not set", "dataview_export_folder": settings["dataview_export_folder"]}
 
-    if pb.gc("toggles/features/eraser/enabled"):
+    if settings["eraser"]:
         extensions.append(EraserExtension())
 
-    if pb.gc("toggles/features/embedded_search/enabled"):
+    if settings["embedded_search"]:
         extensions.append(EmbeddedSearchExtension())
 
     extensions.append(CodeWrapperExtension())
     extensions.append(AdmonitionExtension())
     extensions.append(BlockLinkExtension())
 
-    html_body = markdown.markdown(page, extensions=extensions, extension_configs=extension_configs)
-    return html_body
-
-
-def insert_backlinks(pb, html, node_id, page_depth):
-    backlinks = [x for x in pb.index.network_tree.tree["links"] if x["target"] == node_id]
-    snippet = ""
-    if len(backlinks) > 0:
-        snippet = "<h2>Backlinks</h2>\n<ul>\n"
-        for l in backlinks:
-            if l["target"] == node_id:
-                url = pb.index.network_tree.node_lookup[l["source"]]["url"]
-                if pb.gc("toggles/relative_path_html", cached=True):
-                    url = ("../" * page_depth) + pb.index.network_tree.node_lookup[l["source"]]["rtr_url"]
-                if url[0] not in [".", "/"]:
-                    url = "/" + url
-                snippet += f'\t<li><a class="backlink" href="{url}">{l["source"]}</a></li>\n'
-        snippet += "</ul>"
-        snippet = f'<div class="backlinks">\n{snippet}\n</div>\n'
+    return markdown.Markdown(extensions=extensions, extension_configs=extension_configs)
+
+
+class MarkdownRenderer:
+    """Converts the markdown of a page to html. See get_markdown_renderer for the engines that can be configured (markdown_engine)."""
+
+    def convert(self, page, rel_dst_path):
+        raise NotImplementedError
+
+
+class PythonMarkdownRenderer(MarkdownRenderer):
+    """Converts markdown to html with python-markdown (markdown_engine: python-markdown).
+    Registering all the extensions takes longer than converting a small note, so the converter is created once, and reset before every page.
+    """
+
+    def __init__(self, settings):
+        self.converter = create_markdown_converter(settings)
+        self.note_path_extensions = [x for x in self.converter.registeredExtensions if "note_path" in getattr(x, "config", {})]
+
+    def convert(self, page, rel_dst_path):
+        self.converter.reset()
+        for extension in self.note_path_extensions:
+            extension.setConfig("note_path", rel_dst_path)
+        return self.converter.convert(page)
+
+
+def get_markdown_renderer(settings):
+    """Returns the markdown renderer for the settings. Every process creates a renderer only once per set of settings."""
+    key = tuple(settings.items())
+    if key in markdown_renderers:
+        return markdown_renderers[key]
+
+    engine = settings["engine"]
+    if engine == "python-markdown":
+        renderer = PythonMarkdownRenderer(settings)
+    elif engine == "markdown-it":
+        try:
+            from .MarkdownItRenderer import MarkdownItRenderer
+        except ModuleNotFoundError as e:
+            if e.name not in ("markdown_it", "mdit_py_plugins"):
+                raise
+            raise Exception("Error: markdown_engine is set to markdown-it, but markdown-it-py is not installed. Install it with: pip install obsidianhtml[markdown-it]")
+        renderer = MarkdownItRenderer(settings)
     else:
-        snippet = '<div class="backlinks" style="display:none"></div>\n'
+        raise Exception(f"Error: the value of markdown_engine should be one of: python-markdown, markdown-it. Got: {engine}")
+
+    markdown_renderers[key] = renderer
+    return renderer
+
+
+def convert_md_to_html(pb, page, rel_dst_path):
+    return get_markdown_renderer(get_markdown_settings(pb)).convert(page, rel_dst_path)
+
+
+def get_backlinks_snippet(pb, node_id, page_depth):
+    backlinks = pb.index.network_tree.get_inward_links(node_id)
+    if len(backlinks) == 0:
+        return '<div class="backlinks" style="display:none"></div>\n'
+
+    node_lookup = pb.index.network_tree.node_lookup
+    relative_path_html = pb.gc("toggles/relative_path_html", cached=True)
+
+    items = []
+    for l in backlinks:
+        url = node_lookup[l["source"]]["url"]
+        if relative_path_html:
+            url = ("../" * page_depth) + node_lookup[l["source"]]["rtr_url"]
+        if url[0] not in [".", "/"]:
+            url = "/" + url
+        items.append(f'\t<li><a class="backlink" href="{url}">{l["source"]}</a></li>\n')
 
-    # replace placeholder with list & write output
-    return re.sub("\{_obsidian_html_backlinks_pattern_\}", snippet, html)
+    snippet = "<h2>Backlinks</h2>\n<ul>\n" + "".join(items) + "</ul>"
+    return f'<div class="backlinks">\n{snippet}\n</div>\n'
 
 
 def get_tags(node):
@@ -478,21 +816,20 @@ def get_tags(node):
     return []
 
 
-def insert_tags_footer(pb, html, tags, md_metadata):
+def get_tags_footer_snippets(pb, tags, md_metadata):
+    """Returns the tags footer, and the links that replace the inline tag placeholders (by placeholder)"""
     # remove placeholder
     if bool(tags) is False or ("obs.html.tags" in md_metadata.keys() and "no_tag_footer" in md_metadata["obs.html.tags"]):
-        return re.sub(r"\{_obsidian_html_tags_footer_pattern_\}", "", html)
+        return "", {}
 
+    inline_tags = {}
     snippet = "<h2>Tags</h2>\n<ul>\n"
     for tag in tags:
         url = f'{pb.gc("html_url_prefix")}/obs.html/tags/{tag}/index.html'
         snippet += f'\t<li><a class="backlink" href="{url}">{tag}</a></li>\n'
 
         if pb.gc("toggles/preserve_inline_tags", cached=True):
-            placeholder = re.escape("<code>{_obsidian_pattern_tag_" + tag + "}</code>")
-            inline_tag = f'<a class="inline-tag" href="{url}">{tag}</a>'
-            html = re.sub(placeholder, inline_tag, html)
+            inline_tags["<code>{_obsidian_pattern_tag_" + tag + "}</code>"] = f'<a class="inline-tag" href="{url}">{tag}</a>'
     snippet += "</ul>"
 
-    # replace placeholder with list & write output
-    return re.sub(r"\{_obsidian_html_tags_footer_pattern_\}", snippet, html)
+    return snippet, inline_tags
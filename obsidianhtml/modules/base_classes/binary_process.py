@@ -0,0 +1,84 @@
+"""
+Binary modules are run once per action by default (binary_protocol: cli): `<binary> requires`, `<binary> accept <module_data_folder> <instance_id>`, etc.
+The binary prints its answer as json to stdout.
+
+With binary_protocol: jsonrpc the binary is started once per build as `<binary> serve`, and is then sent one JSON-RPC 2.0 request per line on stdin:
+    {"jsonrpc": "2.0", "id": 1, "method": "accept", "params": ["<module_data_folder>", "<instance_id>"]}
+It answers every request with one line on stdout, where result is what the binary would have printed in the cli protocol:
+    {"jsonrpc": "2.0", "id": 1, "result": {"result": true}}
+When the build is done, stdin is closed, after which the binary should exit.
+With module_jobs > 1, modules that use the same binary run in different threads, but share its process. Only one request is sent
+to the process at a time, so the binary handles requests one by one and answers them in order.
+"""
+
+import json
+import atexit
+import threading
+
+from subprocess import Popen, PIPE, TimeoutExpired
+
+binary_processes = {}  # binary_path -> BinaryProcess, see get_binary_process()
+binary_processes_lock = threading.Lock()
+
+
+class BinaryProcess:
+    def __init__(self, binary_path):
+        self.binary_path = binary_path
+        self.request_id = 0
+        self.lock = threading.Lock()  # held for every request, until its response is read
+        self.process = Popen([binary_path, "serve"], stdin=PIPE, stdout=PIPE, encoding="utf-8", bufsize=1)
+
+    def call(self, method, params):
+        with self.lock:
+            self.request_id += 1
+            request_id = self.request_id
+            request = {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+
+            try:
+                self.process.stdin.write(json.dumps(request) + "\n")
+                self.process.stdin.flush()
+                line = self.process.stdout.readline()
+            except BrokenPipeError:
+                line = ""
+
+        if line == "":
+            raise Exception(f"Binary module {self.binary_path} exited (returncode: {self.process.poll()}) before answering request {request}")
+
+        try:
+            response = json.loads(line)
+        except json.decoder.JSONDecodeError as err:
+            raise Exception(f"Failed to parse binary response as JSON-RPC:{err}\nOutput:\n{line}")
+
+        if response.get("id") != request_id:
+            raise Exception(f"Binary module {self.binary_path} answered request {request_id} with a response for request {response.get('id')}")
+        if "error" in response:
+            raise Exception(f"binary module action `{method}` failed with error: \n\n{response['error']}")
+
+        return response["result"]
+
+    def stop(self):
+        if self.process.poll() is not None:
+            return
+        with self.lock:
+            self.process.stdin.close()
+        try:
+            self.process.wait(timeout=5)
+        except TimeoutExpired:
+            self.process.kill()
+
+
+def get_binary_process(binary_path):
+    """Returns the running process of the binary, starts it if it is not running yet"""
+    with binary_processes_lock:
+        if binary_path not in binary_processes:
+            if len(binary_processes) == 0:
+                atexit.register(stop_binary_processes)
+            binary_processes[binary_path] = BinaryProcess(binary_path)
+        return binary_processes[binary_path]
+
+
+def stop_binary_processes():
+    with binary_processes_lock:
+        for binary_process in binary_processes.values():
+            binary_process.stop()
+        binary_processes.clear()
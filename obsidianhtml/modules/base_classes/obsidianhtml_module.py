@@ -1,8 +1,8 @@
 import json
-import inspect
 
 from abc import ABC, abstractmethod
 from functools import cache
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
 from subprocess import Popen, PIPE
@@ -12,6 +12,7 @@ from ...lib import formatted_print
 from .. import handlers
 from .config import Config
 from .paths import Paths
+from .binary_process import get_binary_process
 
 
 class ResourceAccessLog:
@@ -31,6 +32,10 @@ class ResourceAccessLog:
 
 
 class ObsidianHtmlModule(ABC):
+    # Set to True when the output of the module only depends on the config, the requires() modfiles and self.cache_key_inputs().
+    # The output of such modules is reused when none of these changed since a previous run, see modules/result_cache.py
+    cacheable = False
+
     def __init__(self, module_data_folder, module_name, persistent=None):
         # overwrites
         self.__verbosity__overwrite__ = None
@@ -53,6 +58,7 @@ class ObsidianHtmlModule(ABC):
 
         # init
         self._stash = {}  # see self.stash()
+        self.integrating = None  # "load" or "save" while the integrate methods run, see self.integration()
 
         # records
         self.written_files = ResourceAccessLog()
@@ -138,19 +144,23 @@ class ObsidianHtmlModule(ABC):
     # wrappers to make static method available within module
     def requires_files(self):
         if self.is_binary:
-            return self.__class__.requires(binary_path=self.binary_path)
+            return self.__class__.requires(binary_path=self.binary_path, binary_protocol=self.binary_protocol)
         return self.__class__.requires()
 
     def provides_files(self):
         if self.is_binary:
-            return self.__class__.provides(binary_path=self.binary_path)
+            return self.__class__.provides(binary_path=self.binary_path, binary_protocol=self.binary_protocol)
         return self.__class__.provides()
 
     def alters_files(self):
         if self.is_binary:
-            return self.__class__.alters(binary_path=self.binary_path)
+            return self.__class__.alters(binary_path=self.binary_path, binary_protocol=self.binary_protocol)
         return self.__class__.alters()
 
+    def cache_key_inputs(self):
+        """Returns a string that changes when an input of the module changes that is not a modfile (e.g. files in the vault). Only used when cacheable = True"""
+        return ""
+
     @abstractmethod
     def accept(self, module_data_folder):
         """This function is run before run(), if it returns False, then the module run is skipped entirely. Any other value will be accepted"""
@@ -173,6 +183,16 @@ class ObsidianHtmlModule(ABC):
         """Used to integrate a module with the current flow, to become deprecated when all elements use modular structure"""
         raise Exception(f"integrate_save not implemented for module class {self.module_class_name}")
 
+    @contextmanager
+    def integration(self, step):
+        """Used by run_module() around integrate_load ("load") and integrate_save ("save").
+        Modfile access in the integrate methods is excempted from the provides/requires checks"""
+        self.integrating = step
+        try:
+            yield
+        finally:
+            self.integrating = None
+
     @cache
     def paths(self, cast=False, reload=False):
         if reload or not hasattr(self, "_paths"):
@@ -254,7 +274,7 @@ class ObsidianHtmlModule(ABC):
     def retrieve(self, key):
         """Retrievs stored value from the internal stash"""
         # log
-        if self.persistent and inspect.stack()[1][3] not in ("integrate_save",):
+        if self.persistent and self.integrating != "save":
             resource_name = self.module_name + "(" + self.module_class_name + ")/" + key
             self.retrieved_keys.add(resource_name)
 
@@ -330,10 +350,13 @@ class ObsidianHtmlModule(ABC):
 
     # BINARY MODULE METHODS
     # =========================================================================================
-    def set_binary(self, binary_path, method):
+    def set_binary(self, binary_path, method, protocol="cli"):
+        if protocol not in ("cli", "jsonrpc"):
+            raise Exception(f"Unknown binary_protocol {protocol} for binary module {self.module_name}, use cli or jsonrpc.")
         self.is_binary = True
         self.binary_path = binary_path
         self.binary_run_method = method
+        self.binary_protocol = protocol
 
     def run_binary(self, args):
         # compile base command
@@ -349,6 +372,10 @@ class ObsidianHtmlModule(ABC):
         with open(file_path, "w") as f:
             f.write(json.dumps(data, indent=2))
 
+        if self.binary_protocol == "jsonrpc":
+            self.print("debug", f'calling: {" ".join(command)}')
+            return get_binary_process(self.binary_path).call(args[0], [*args[1:], self.instance_id])
+
         self.print("debug", f'running: {" ".join(command)}')
         return run_binary(command)
 
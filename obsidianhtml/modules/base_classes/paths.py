@@ -1,7 +1,9 @@
-import os, json
+import os
 from pathlib import Path
 from dataclasses import dataclass
 
+from ..handlers.modfile_store import modfile_store
+
 
 @dataclass
 class Paths:
@@ -13,8 +15,7 @@ class Paths:
         if mdf_path is None:
             raise Exception("ENV var OBS_MODULE_DATA_FOLDER was not set, this is expected to be the case when this module is run")
 
-        with open(Path(mdf_path).joinpath("paths.json"), "r") as f:
-            self.paths = json.loads(f.read())
+        self.paths = modfile_store.read_json(Path(mdf_path).joinpath("paths.json"))
 
     def get_dict(self):
         return self.paths
@@ -1,4 +1,7 @@
+from functools import cache
+
 from ..base_classes import ObsidianHtmlModule, run_binary
+from ..base_classes.binary_process import get_binary_process
 
 
 class BinaryModule(ObsidianHtmlModule):
@@ -14,8 +17,7 @@ class BinaryModule(ObsidianHtmlModule):
             raise Exception("cannot run static method requires on BinaryModule without binary_path kwarg")
         binary_path = kwargs["binary_path"]
 
-        res = run_binary([binary_path, "requires"])
-        return tuple(res)
+        return get_binary_declaration(binary_path, "requires", kwargs.get("binary_protocol", "cli"))
 
     @staticmethod
     def provides(**kwargs):
@@ -23,8 +25,7 @@ class BinaryModule(ObsidianHtmlModule):
             raise Exception("cannot run static method provides on BinaryModule without binary_path kwarg")
         binary_path = kwargs["binary_path"]
 
-        res = run_binary([binary_path, "provides"])
-        return tuple(res)
+        return get_binary_declaration(binary_path, "provides", kwargs.get("binary_protocol", "cli"))
 
     @staticmethod
     def alters(**kwargs):
@@ -32,8 +33,7 @@ class BinaryModule(ObsidianHtmlModule):
             raise Exception("cannot run static method alters on BinaryModule without binary_path kwarg")
         binary_path = kwargs["binary_path"]
 
-        res = run_binary([binary_path, "alters"])
-        return tuple(res)
+        return get_binary_declaration(binary_path, "alters", kwargs.get("binary_protocol", "cli"))
 
     def accept(self, module_data_folder):
         """Returns True if module should be run, otherwise false"""
@@ -52,3 +52,13 @@ class BinaryModule(ObsidianHtmlModule):
     def integrate_save(self, pb):
         """Used to integrate a module with the current flow, to become deprecated when all elements use modular structure"""
         pass
+
+
+@cache
+def get_binary_declaration(binary_path, declaration, binary_protocol):
+    """The requires/provides/alters lists don't change during a build, so the binary is only asked once for each of them"""
+    if binary_protocol == "jsonrpc":
+        res = get_binary_process(binary_path).call(declaration, [])
+    else:
+        res = run_binary([binary_path, declaration])
+    return tuple(res)
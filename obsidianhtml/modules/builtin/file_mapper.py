@@ -7,7 +7,6 @@
       - html_path: the file path for the generated html file, will use updated rel_path
 """
 
-import json
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -16,6 +15,7 @@ from ...core.schema import Schema
 from ..base_classes import ObsidianHtmlModule
 from ..base_classes.config import Config
 from ..base_classes.paths import Paths
+from ..handlers.modfile_store import modfile_store
 
 from .hydrate_file_list import AnnotatedFile, AnnotatedFileManager
 
@@ -38,8 +38,7 @@ class FileManager:
     @classmethod
     def get_mapped_files(cls):
         paths = Paths().get_dict()
-        with open(Path(paths("module_data_folder")).joinpath("index/files_mapped"), "r") as f:
-            mfs = json.loads(f.read())
+        mfs = modfile_store.read_json(Path(paths("module_data_folder")).joinpath("index/files_mapped"))
 
         MFs = []
         for mf in mfs:
@@ -235,6 +234,8 @@ class MappedFile(Schema):
 
 
 class FileMapperModule(ObsidianHtmlModule):
+    cacheable = True
+
     @staticmethod
     def friendly_name():
         return "file_mapper"
@@ -10,6 +10,8 @@ class FilterOnMetadataModule(ObsidianHtmlModule):
     The files index/files.json and index/markdown_files.json are then updated so that the items in excluded_files are removed from them.
     """
 
+    cacheable = True
+
     @staticmethod
     def friendly_name():
         return "filter_on_metadata"
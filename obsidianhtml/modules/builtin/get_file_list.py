@@ -1,12 +1,123 @@
+import os
+import re
+import fnmatch
+
 from pathlib import Path
 from ..base_classes import ObsidianHtmlModule
 
 
+class GlobPattern:
+    """Matches paths one name at a time, in the same way that folder.rglob(glob_line) (or folder.glob() for "/file.md" lines) would find them.
+    The state of a match is the set of positions in self.parts that the names matched so far can have brought us to."""
+
+    def __init__(self, glob_line):
+        # rglob does not support specific file matching. we fix this by allowing the "/file.md" syntax.
+        # in this case we only match from the root of the folder, as glob would
+        if glob_line[0] == "/":
+            parts = glob_line[1:].split("/")
+        else:
+            parts = ["**"] + glob_line.split("/")
+        self.parts = [part for part in parts if part not in ("", ".")]
+
+        # like rglob, only match folders when the glob line ends with a slash
+        self.folders_only = glob_line[-1] == "/"
+
+        flags = re.IGNORECASE if os.name == "nt" else 0
+        self.matchers = [None if part == "**" else re.compile(fnmatch.translate(part), flags).fullmatch for part in self.parts]
+
+        # a folder matches in any of these positions, as ** can match zero folders, a file only when all parts are matched
+        self.folder_end_positions = {len(self.parts)}
+        for pos in reversed(range(len(self.parts))):
+            if self.parts[pos] != "**":
+                break
+            self.folder_end_positions.add(pos)
+
+        # in these positions everything below the folder matches, which is the case for e.g. .git/**/*
+        self.match_all_positions = set()
+        if len(self.parts) > 1 and self.parts[-1] == "*" and not self.folders_only:
+            for pos in reversed(range(len(self.parts) - 1)):
+                if self.parts[pos] != "**":
+                    break
+                self.match_all_positions.add(pos)
+
+    def start(self):
+        return self.close({0})
+
+    def close(self, state):
+        """Adds the positions after ** parts, as ** can match zero folders"""
+        closed = set(state)
+        for pos in state:
+            while pos < len(self.parts) and self.parts[pos] == "**":
+                pos += 1
+                closed.add(pos)
+        return closed
+
+    def step(self, state, name, is_dir):
+        """Returns the state for the contents of name, and whether name itself matches"""
+        new_state = set()
+        for pos in state:
+            if pos == len(self.parts):
+                continue
+            if self.matchers[pos] is None:
+                # ** only matches folders
+                if is_dir:
+                    new_state.add(pos)
+            elif self.matchers[pos](name):
+                new_state.add(pos + 1)
+
+        if is_dir:
+            matches = not new_state.isdisjoint(self.folder_end_positions)
+        else:
+            matches = len(self.parts) in new_state and not self.folders_only
+        return self.close(new_state), matches
+
+    def matches_all(self, state):
+        return not state.isdisjoint(self.match_all_positions)
+
+
+class GlobMatcher:
+    """Matches the include and exclude glob lists at the same time, so that the input folder is only walked once"""
+
+    def __init__(self, include_glob_list, exclude_glob_list):
+        self.include = [GlobPattern(x) for x in include_glob_list]
+        self.exclude = [GlobPattern(x) for x in exclude_glob_list]
+
+    def start(self):
+        return [p.start() for p in self.include], [p.start() for p in self.exclude]
+
+    def step(self, state, name, is_dir):
+        """Returns the state for the contents of name, whether name is included, and whether it is excluded"""
+        include_states, exclude_states = [], []
+        included, excluded = False, False
+        for pattern, pattern_state in zip(self.include, state[0]):
+            pattern_state, matches = pattern.step(pattern_state, name, is_dir)
+            include_states.append(pattern_state)
+            included = included or matches
+        for pattern, pattern_state in zip(self.exclude, state[1]):
+            pattern_state, matches = pattern.step(pattern_state, name, is_dir)
+            exclude_states.append(pattern_state)
+            excluded = excluded or matches
+        return (include_states, exclude_states), included, excluded
+
+    def can_include_below(self, state):
+        """False if none of the contents of the folder can be included, or if all of them are excluded"""
+        if all([len(x) == 0 for x in state[0]]):
+            return False
+        return not self.excludes_all_below(state)
+
+    def excludes_all_below(self, state):
+        return any([p.matches_all(x) for p, x in zip(self.exclude, state[1])])
+
+
 class GetFileListModule(ObsidianHtmlModule):
     """
     This module will create the index/files.json file, which lists all the files in the source folder (vault or md folder).
     If included_folders is defined, it will limit itself to those sub(!)folders.
     Once that list exists, the exluded file (by excluded_glob) will be filtered out.
+
+    The source folder is walked only once, and folders of which all contents are excluded (such as by .git/**/*) are skipped.
+    These folders are listed in index/excluded_files.json instead of their contents.
+    The modified and created times of the files in index/files.json are written to index/file_stats.json, so they don't have to be looked up again.
     """
 
     @staticmethod
@@ -19,7 +130,7 @@ class GetFileListModule(ObsidianHtmlModule):
 
     @staticmethod
     def provides():
-        return tuple(["index/files.json", "index/excluded_files.json", "index/markdown_files.json"])
+        return tuple(["index/files.json", "index/excluded_files.json", "index/markdown_files.json", "index/file_stats.json"])
 
     @staticmethod
     def alters():
@@ -51,43 +162,72 @@ class GetFileListModule(ObsidianHtmlModule):
         """This function is run before run(), if it returns False, then the module run is skipped entirely. Any other value will be accepted"""
         return
 
-    def glob_find(self, folder, glob_list):
-        # ensure folder is a Path object
-        folder = Path(folder)
-
-        # find files
-        found_files = []
-        for glob_line in glob_list:
-            # rglob does not support specific file matching. we fix this by allowing the "/file.md" syntax.
-            # in this case we use glob instead of rglob
-            if glob_line[0] == "/":
-                glob_line = glob_line[1:]
-                found_files = found_files + [x.as_posix() for x in folder.glob(glob_line)]
-            else:
-                found_files = found_files + [x.as_posix() for x in folder.rglob(glob_line)]
+    @staticmethod
+    def get_glob_list(value):
+        if isinstance(value, str):
+            return [value]
+        return value
 
-        # make unique & sort
-        found_files = list(set(found_files))
-        found_files.sort()
+    def walk(self, folder, matcher):
+        """Returns the selected files, the excluded files and folders, and the stat results of the selected files"""
+        folder = Path(folder)
+        prefix = "" if folder.as_posix() == "." else folder.as_posix().rstrip("/") + "/"
+
+        selected_files = []
+        excluded_files = []
+        file_stats = {}
+
+        folders = [(folder, "", matcher.start())]
+        while len(folders) > 0:
+            folder_path, rel_folder, state = folders.pop()
+            try:
+                with os.scandir(folder_path) as it:
+                    entries = list(it)
+            except PermissionError:
+                continue
+
+            for entry in entries:
+                rel_path = rel_folder + entry.name
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+
+                entry_state, included, excluded = matcher.step(state, entry.name, is_dir)
+                if excluded:
+                    excluded_files.append(prefix + rel_path)
+
+                # like rglob, don't descend into symlinked folders
+                if is_dir:
+                    if not entry.is_symlink():
+                        if matcher.can_include_below(entry_state):
+                            folders.append((entry.path, rel_path + "/", entry_state))
+                        elif matcher.excludes_all_below(entry_state):
+                            excluded_files.append(prefix + rel_path + "/")
+                    continue
+
+                if not included or excluded:
+                    continue
+
+                path = prefix + rel_path
+                selected_files.append(path)
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                file_stats[path] = {"modified_time": stat.st_mtime, "creation_time": stat.st_ctime}
 
-        return found_files
+        selected_files.sort()
+        excluded_files.sort()
+        return selected_files, excluded_files, file_stats
 
     def run(self):
         # get paths
         paths = self.paths(cast=True)
 
-        # get all included files from input_folder
-        included_files = self.glob_find(paths["input_folder"], self.value_of("include_glob"))
-
-        # get all excluded files
-        excluded_files = self.glob_find(paths["input_folder"], self.value_of("exclude_glob"))
-
-        # get all included files minus excluded files
-        selected_files = [x for x in included_files if x not in excluded_files]
-        selected_files.sort()
-
-        # remove dirs
-        selected_files = [x for x in selected_files if Path(x).is_dir() is False]
+        # get all included files from input_folder, minus the excluded files
+        matcher = GlobMatcher(self.get_glob_list(self.value_of("include_glob")), self.get_glob_list(self.value_of("exclude_glob")))
+        selected_files, excluded_files, file_stats = self.walk(paths["input_folder"], matcher)
 
         # check that the entrypoint file is not being filtered out
         if paths["entrypoint"].as_posix() not in selected_files:
@@ -96,6 +236,7 @@ class GetFileListModule(ObsidianHtmlModule):
 
         self.modfile("index/excluded_files.json", excluded_files).to_json().write()
         self.modfile("index/files.json", selected_files).to_json().write()
+        self.modfile("index/file_stats.json", file_stats).to_json().write()
 
         # get markdown files
         markdown_files = [x for x in selected_files if x[-3:] == ".md"]
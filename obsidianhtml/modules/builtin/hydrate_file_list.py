@@ -10,6 +10,7 @@ import os
 import platform
 import datetime
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 
 from pathlib import Path
 
@@ -18,6 +19,7 @@ from ...core.schema import Schema
 from ..base_classes import ObsidianHtmlModule
 from ..base_classes.config import Config
 from ..base_classes.paths import Paths
+from ..result_cache import get_file_signature
 
 
 class AnnotatedFileManager:
@@ -64,19 +66,25 @@ class AnnotatedFile(Schema):
             self.is_entrypoint = not self.is_entrypoint
 
     @staticmethod
-    def set_times(af):
+    def set_times(af, file_stat=None):
+        """file_stat is the entry of the file in index/file_stats.json, if None, the times are looked up"""
         # file does not exist yet, just give current time
         if af.is_generated:
             af.modified_time = datetime.datetime.now().isoformat()
             af.creation_time = datetime.datetime.now().isoformat()
             return af
 
+        if file_stat is None:
+            file_stat = {"modified_time": os.path.getmtime(af.path), "creation_time": None}
+
         # look up modified time
-        af.modified_time = datetime.datetime.fromtimestamp(os.path.getmtime(af.path)).isoformat()
+        af.modified_time = datetime.datetime.fromtimestamp(file_stat["modified_time"]).isoformat()
 
         # created time not available (consistently) on linux
         if platform.system() == "Windows" or platform.system() == "Darwin":
-            af.creation_time = datetime.datetime.fromtimestamp(os.path.getctime(af.path)).isoformat()
+            if file_stat["creation_time"] is None:
+                file_stat["creation_time"] = os.path.getctime(af.path)
+            af.creation_time = datetime.datetime.fromtimestamp(file_stat["creation_time"]).isoformat()
         return af
 
     @staticmethod
@@ -103,7 +111,26 @@ class AnnotatedFile(Schema):
         return cls(**d)
 
     @classmethod
-    def from_file_str(cls, gc, paths, file_str, is_generated=False):
+    def from_file_strs(cls, gc, paths, file_strs, file_stats):
+        """Returns an AnnotatedFile for each file, file_stats holds the stat results of index/file_stats.json"""
+        classifier = FileClassifier(gc, paths)
+
+        # stat the files that were not found by get_file_list (e.g. because the vault was copied to a temp folder) in a thread pool
+        missing_files = [x for x in file_strs if x not in file_stats]
+        if len(missing_files) > 0:
+            chunks = [missing_files[i : i + 1000] for i in range(0, len(missing_files), 1000)]
+            with ThreadPoolExecutor() as executor:
+                for chunk, chunk_stats in zip(chunks, executor.map(get_file_stats, chunks)):
+                    file_stats.update(zip(chunk, chunk_stats))
+
+        return [cls.from_file_str(gc, paths, file_str, classifier=classifier, file_stat=file_stats[file_str]) for file_str in file_strs]
+
+    @classmethod
+    def from_file_str(cls, gc, paths, file_str, is_generated=False, classifier=None, file_stat=None):
+        """Pass in a classifier when calling this for many files, so that the config values are only looked up once"""
+        if classifier is None:
+            classifier = FileClassifier(gc, paths)
+
         af = cls(
             path=file_str,
             is_entrypoint=False,
@@ -119,32 +146,78 @@ class AnnotatedFile(Schema):
         file_path = Path(file_str)
         suffix = file_path.suffix[1:].lower()
 
-        af.is_entrypoint = cls.check_is_entrypoint(gc, paths, file_path)
+        af.is_entrypoint = classifier.is_entrypoint(file_path)
 
-        if suffix == "md":
-            af.is_note = True
-        if suffix in gc("included_file_suffixes"):
-            af.is_includable_file = True
-        if suffix in gc("video_format_suffixes"):
-            af.is_video = True
-        if suffix in gc("audio_format_suffixes"):
-            af.is_audio = True
-        if suffix in gc("embeddable_file_suffixes"):
-            af.is_embeddable = True
+        af.is_note, af.is_includable_file, af.is_video, af.is_audio, af.is_embeddable = classifier.get_suffix_annotations(suffix)
 
-        if file_path.exists() and af.is_note:
+        # a file that has stat results exists
+        if af.is_note and (file_stat is not None or file_path.exists()):
             af.is_parsable_note = True
 
-        af = cls.set_times(af)
+        af = cls.set_times(af, file_stat)
 
         return af
 
 
+class FileClassifier:
+    """Looks up the config values that determine the type of a file once, instead of for every file"""
+
+    def __init__(self, gc, paths):
+        self.gc = gc
+        self.paths = paths
+
+        # only files with the same name as the entrypoint have to be checked further
+        if gc("toggles/compile_md"):
+            self.entrypoint_name = Path(paths["rel_obsidian_entrypoint"]).name
+        else:
+            self.entrypoint_name = Path(paths["rel_md_entrypoint_path"]).name
+
+        self.included_file_suffixes = frozenset(gc("included_file_suffixes"))
+        self.video_format_suffixes = frozenset(gc("video_format_suffixes"))
+        self.audio_format_suffixes = frozenset(gc("audio_format_suffixes"))
+        self.embeddable_file_suffixes = frozenset(gc("embeddable_file_suffixes"))
+
+        self.suffix_annotations = {}  # suffix -> (is_note, is_includable_file, is_video, is_audio, is_embeddable)
+
+    def get_suffix_annotations(self, suffix):
+        annotations = self.suffix_annotations.get(suffix)
+        if annotations is None:
+            annotations = (
+                suffix == "md",
+                suffix in self.included_file_suffixes,
+                suffix in self.video_format_suffixes,
+                suffix in self.audio_format_suffixes,
+                suffix in self.embeddable_file_suffixes,
+            )
+            self.suffix_annotations[suffix] = annotations
+        return annotations
+
+    def is_entrypoint(self, file_path):
+        if file_path.name != self.entrypoint_name:
+            return False
+        return AnnotatedFile.check_is_entrypoint(self.gc, self.paths, file_path)
+
+
+def get_file_stats(file_strs):
+    """Returns the stat results of the files in the format of index/file_stats.json, or None for files that don't exist"""
+    file_stats = []
+    for file_str in file_strs:
+        try:
+            stat = os.stat(file_str)
+        except FileNotFoundError:
+            file_stats.append(None)
+            continue
+        file_stats.append({"modified_time": stat.st_mtime, "creation_time": stat.st_ctime})
+    return file_stats
+
+
 class HydrateFileListModule(ObsidianHtmlModule):
     """
     This module will take the index/files.json file, determine properties per file, and write these to index/files_annotated.json
     """
 
+    cacheable = True
+
     @staticmethod
     def friendly_name():
         return "hydrate_file_list"
@@ -161,6 +234,11 @@ class HydrateFileListModule(ObsidianHtmlModule):
     def alters():
         return tuple()
 
+    def cache_key_inputs(self):
+        """The annotated files contain the modified times of the files"""
+        files = self.modfile("index/files.json").read(sneak=True).from_json()
+        return "\n".join([get_file_signature(file) for file in files])
+
     def accept(self, module_data_folder):
         """This function is run before run(), if it returns False, then the module run is skipped entirely. Any other value will be accepted"""
         return
@@ -170,10 +248,12 @@ class HydrateFileListModule(ObsidianHtmlModule):
         paths = self.paths()
         files = self.modfile("index/files.json").read().from_json()
 
+        # index/file_stats.json is only a hint, written by get_file_list: the times of files that are not in it are looked up
+        file_stats = self.modfile("index/file_stats.json", allow_absent=True).read(sneak=True).from_json()
+        file_stats = {} if file_stats is None else file_stats.unwrap()
+
         # annotate
-        annotated_files = []
-        for file in files:
-            annotated_files.append(AnnotatedFile.from_file_str(self.config.gc, paths, file).normalize())
+        annotated_files = [af.normalize() for af in AnnotatedFile.from_file_strs(self.config.gc, paths, files, file_stats)]
 
         # add in generated files
         input_folder = Path(paths["input_folder"])
@@ -1,8 +1,132 @@
+import os
+import json
 import frontmatter
 import regex as re
 
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
 from ..base_classes import ObsidianHtmlModule
+from ..result_cache import get_file_signature
+from ..handlers.file import to_json_encoder
+from ...lib import OpenIncludedFile, get_build_cache_folder_path
+
+# older versions of python-frontmatter parse yaml with the pure python loader, always use libyaml when it is available
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+
+class YAMLHandler(frontmatter.YAMLHandler):
+    def load(self, fm, **kwargs):
+        kwargs.setdefault("Loader", SafeLoader)
+        return super().load(fm, **kwargs)
+
+
+yaml_handler = YAMLHandler()
+inline_tag_pattern = re.compile(r"(?<!\S)#[\p{L}\p{N}/\-\p{Emoji_Presentation}]*[\p{L}\-_/\p{Emoji_Presentation}][\p{L}\p{N}/\-\p{Emoji_Presentation}]*")
+
+
+def sanatize_frontmatter(metadata):
+    # imitate obsidian shenannigans
+    if "tags" in metadata.keys():
+        tags = metadata["tags"]
+        if isinstance(tags, str):
+            if " " in tags.strip() or "," in tags:
+                metadata["tags"] = [x.rstrip(",") for x in tags.replace(",", " ").split(" ") if x != ""]
+            elif tags.strip() == "":
+                metadata["tags"] = []
+            else:
+                metadata["tags"] = [
+                    tags,
+                ]
+        elif tags is None:
+            metadata["tags"] = []
+    else:
+        metadata["tags"] = []
+    return metadata
+
+
+def get_frontmatter(file_path):
+    with open(file_path, encoding="utf-8") as f:
+        text = f.read()
+
+    # same as letting frontmatter.parse() detect the format, which tries yaml first
+    handler = None
+    if yaml_handler.detect(text.strip()):
+        handler = yaml_handler
+
+    metadata, page = frontmatter.parse(text, handler=handler)
+    return sanatize_frontmatter(metadata), page
+
+
+def get_inline_tags(page):
+    return [x[1:].replace(".", "") for x in inline_tag_pattern.findall(page)]
+
+
+def parse_file(file_path):
+    """Returns the metadata of the file combined with its inline tags, or None and the error message. Run in worker processes when jobs > 1."""
+    try:
+        metadata, page = get_frontmatter(file_path)
+        inline_tags = get_inline_tags(page)
+        metadata["tags"] = list(set(metadata["tags"] + inline_tags))
+    except Exception as e:
+        return None, str(e)
+    return metadata, None
+
+
+class MetadataCache:
+    """Keeps the metadata of every parsed file, with the size and modified time (in ns) that the file had.
+    Files that still have the same size and modified time on the next run are not parsed again.
+    Every build has its own cache (see get_build_cache_folder_path), as save() only keeps the files of the current run."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.version = OpenIncludedFile("version")
+        self.entries = {}
+        self.new_entries = {}
+
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    cache = json.loads(f.read())
+                if cache["version"] == self.version:
+                    self.entries = cache["entries"]
+            except (json.decoder.JSONDecodeError, KeyError):
+                pass
+
+    @staticmethod
+    def get_signature(file_path):
+        stat = os.stat(file_path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def get(self, file_path):
+        """Returns the metadata of the file if it did not change, otherwise None"""
+        entry = self.entries.get(file_path)
+        if entry is None:
+            return None
+        try:
+            if entry["signature"] != self.get_signature(file_path):
+                return None
+        except OSError:
+            return None
+        self.new_entries[file_path] = entry
+        return entry["metadata"]
+
+    def set(self, file_path, metadata):
+        try:
+            self.new_entries[file_path] = {"signature": self.get_signature(file_path), "metadata": metadata}
+        except OSError:
+            pass
+
+    def save(self):
+        """Only keeps the files of this run, so that deleted files don't stay in the cache forever"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"version": self.version, "entries": self.new_entries}, cls=to_json_encoder))
+        os.replace(tmp_path, self.path)
 
 
 class ParseMetadataModule(ObsidianHtmlModule):
@@ -11,6 +135,8 @@ class ParseMetadataModule(ObsidianHtmlModule):
     and the result is written to index/metadata.json
     """
 
+    cacheable = True
+
     @staticmethod
     def friendly_name():
         return "parse_metadata"
@@ -27,60 +153,66 @@ class ParseMetadataModule(ObsidianHtmlModule):
     def alters():
         return tuple()
 
+    def cache_key_inputs(self):
+        """The metadata changes when the markdown files change"""
+        files = self.modfile("index/markdown_files.json").read(sneak=True).from_json()
+        return "\n".join([get_file_signature(file) for file in files])
+
+    def define_mod_config_defaults(self):
+        self.mod_config["use_cache"] = {
+            "value": True,
+            "description": "Reuse the metadata of markdown files whose size and modified time did not change since the previous run. The cache is stored in the build cache folder in the appdir.",
+        }
+
     def accept(self, module_data_folder):
         """This function is run before run(), if it returns False, then the module run is skipped entirely. Any other value will be accepted"""
         return
 
-    def sanatize_frontmatter(self, metadata):
-        # imitate obsidian shenannigans
-        if "tags" in metadata.keys():
-            tags = metadata["tags"]
-            if isinstance(tags, str):
-                if " " in tags.strip() or "," in tags:
-                    metadata["tags"] = [x.rstrip(",") for x in tags.replace(",", " ").split(" ") if x != ""]
-                elif tags.strip() == "":
-                    metadata["tags"] = []
-                else:
-                    metadata["tags"] = [
-                        tags,
-                    ]
-            elif tags is None:
-                metadata["tags"] = []
-        else:
-            metadata["tags"] = []
-        return metadata
-
-    def get_frontmatter(self, file_path):
-        with open(file_path, encoding="utf-8") as f:
-            metadata, page = frontmatter.parse(f.read())
-        return self.sanatize_frontmatter(metadata), page
-
-    def get_inline_tags(self, page):
-        return [x[1:].replace(".", "") for x in re.findall(r"(?<!\S)#[\p{L}\p{N}/\-\p{Emoji_Presentation}]*[\p{L}\-_/\p{Emoji_Presentation}][\p{L}\p{N}/\-\p{Emoji_Presentation}]*", page)]
-
     def run(self):
         # get input
         files = self.modfile("index/markdown_files.json").read().from_json()
         paths = self.paths()
 
+        # get metadata of files that did not change from the cache
+        # files in the temp folder of copy_vault_to_tempdir are written anew on every run, so they never match the cache
+        cache = None
+        if self.value_of("use_cache") and Path(paths["input_folder"]) == Path(paths["original_input_folder"]):
+            cache = MetadataCache(get_build_cache_folder_path(paths).joinpath("metadata_cache.json"))
+
+        file_metadata = {}
+        if cache is not None:
+            file_metadata = {file: cache.get(file) for file in files}
+
+        # parse the other files, on a process pool when jobs > 1
+        to_parse = [file for file in files if file_metadata.get(file) is None]
+        jobs = self.gc("jobs")
+        if jobs > 1 and len(to_parse) > jobs:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(parse_file, to_parse, chunksize=max(1, len(to_parse) // (jobs * 4))))
+        else:
+            results = [parse_file(file) for file in to_parse]
+
         # handle files
-        output = {}
-        for file in files:
-            rel_path = Path(file).relative_to(paths["input_folder"]).as_posix()
-            metadata = {}
-            metadata["tags"] = []
-            try:
-                metadata, page = self.get_frontmatter(file)
-                inline_tags = self.get_inline_tags(page)
-                metadata["tags"] = list(set(metadata["tags"] + inline_tags))
-            except Exception as e:
+        for file, (metadata, error) in zip(to_parse, results):
+            if metadata is None:
+                rel_path = Path(file).relative_to(paths["input_folder"]).as_posix()
                 og_path = Path(paths["original_input_folder"]).joinpath(rel_path).as_posix()
                 self.print(
                     "ERROR",
-                    f"failed to parse metadata in file: {og_path}.\nError: {e}. \n(Ignoring this error is not supported as metadata will be read elsewhere. Review yaml frontmatter and edit it to resolve the issue).",
+                    f"failed to parse metadata in file: {og_path}.\nError: {error}. \n(Ignoring this error is not supported as metadata will be read elsewhere. Review yaml frontmatter and edit it to resolve the issue).",
                 )
                 exit(1)
-            output[rel_path] = metadata
+            file_metadata[file] = metadata
+            if cache is not None:
+                cache.set(file, metadata)
+
+        if cache is not None:
+            cache.save()
+
+        output = {}
+        for file in files:
+            rel_path = Path(file).relative_to(paths["input_folder"]).as_posix()
+            output[rel_path] = file_metadata[file]
 
         # add virtual files
         if "not_created.md" not in output.keys():
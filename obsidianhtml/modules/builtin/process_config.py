@@ -55,6 +55,14 @@ class ProcessConfigModule(ObsidianHtmlModule):
         if "verbose" in arguments:
             config["toggles"]["verbose_printout"] = arguments["verbose"]
 
+        # (If --jobs <n> is passed in, overwrite the number of worker processes used for the html conversion)
+        if "jobs" in arguments:
+            config["jobs"] = arguments["jobs"]
+        if not str(config["jobs"]).isdigit() or int(config["jobs"]) < 1:
+            self.print("ERROR", f"jobs should be a whole number of 1 or higher, got {config['jobs']}")
+            exit(1)
+        config["jobs"] = int(config["jobs"])
+
         # Set toggles/no_tabs
         layout = config["toggles"]["features"]["styling"]["layout"]
         if layout == "tabs":
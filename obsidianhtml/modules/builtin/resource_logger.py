@@ -81,6 +81,10 @@ class ResourceLoggerMetaModule(ObsidianHtmlModule):
                 self.resources[resource_rel_path] = self.new_resource_listing(state=resource_state)
                 action = "create"
 
+            # the module did not run, its output of a previous run was restored
+            if run_module_result.cache_hit:
+                action = "restore"
+
             hist = self.new_resource_history_listing(module_name=module.module_name, action=action, result=module_result)
             hist["datetime"] = record["datetime"]
 
@@ -150,6 +154,7 @@ class ResourceLoggerMetaModule(ObsidianHtmlModule):
         verb = {
             "alter": "altered",
             "create": "created",
+            "restore": "restored (cache hit)",
             "read": "read",
             "store": "stored",
             "overwrite": "overwritten",
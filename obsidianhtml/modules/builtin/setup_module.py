@@ -19,6 +19,7 @@ import shutil
 from pathlib import Path
 
 from ..base_classes import ObsidianHtmlModule
+from ..handlers.modfile_store import modfile_store
 from ...lib import OpenIncludedFile, MergeDictRecurse, get_arguments_dict
 from ...controller.Config import get_config_by_alias
 
@@ -146,6 +147,7 @@ class SetupModule(ObsidianHtmlModule):
         module_data_folder = Path(self.module_data_folder)
         if module_data_folder.exists():
             shutil.rmtree(module_data_folder)
+        modfile_store.clear()
         module_data_folder.mkdir(parents=True, exist_ok=True)
 
         # write guid.txt, this contains the guid for this run, which can be used to target
@@ -174,16 +176,16 @@ class SetupModule(ObsidianHtmlModule):
             if val not in d[key][kind]:
                 d[key][kind].append(val)
 
-        def parse_module_for_modfiles(module_overview_section, modfile_overview, module_class, key, binary_path=None):
+        def parse_module_for_modfiles(module_overview_section, modfile_overview, module_class, key, binary_path=None, binary_protocol="cli"):
             provides = None
             if binary_path is not None:
-                provides = module_class.provides(binary_path=binary_path)
+                provides = module_class.provides(binary_path=binary_path, binary_protocol=binary_protocol)
             else:
                 provides = module_class.provides()
 
             requires = None
             if binary_path is not None:
-                requires = module_class.requires(binary_path=binary_path)
+                requires = module_class.requires(binary_path=binary_path, binary_protocol=binary_protocol)
             else:
                 requires = module_class.requires()
 
@@ -220,7 +222,7 @@ class SetupModule(ObsidianHtmlModule):
                 binary_path = ml["binary"]
                 module_overview_section = module_overview[phase]
 
-                parse_module_for_modfiles(module_overview_section, modfile_overview, module_class=module_class, key=key, binary_path=binary_path)
+                parse_module_for_modfiles(module_overview_section, modfile_overview, module_class=module_class, key=key, binary_path=binary_path, binary_protocol=ml["binary_protocol"])
 
                 configured_module_classes.append(module_class)
 
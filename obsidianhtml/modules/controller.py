@@ -2,17 +2,21 @@
 import sys
 import yaml
 import importlib
+import threading
 
 from pathlib import Path
 
 from . import builtin_module_aliases
 from .lib import verbose_enough
+from .result_cache import get_module_result_cache
+from .handlers.modfile_store import modfile_store
 
 
 class run_module_result:
-    def __init__(self, module, output):
+    def __init__(self, module, output, cache_hit=False):
         self.output = output
         self._module = module
+        self.cache_hit = cache_hit  # True when the output of a previous run was restored instead of running the module
 
         self.module_is_persistent = module.persistent
 
@@ -41,6 +45,7 @@ def run_module(
     persistent=None,
     module_source=None,
     module_binary=None,
+    module_binary_protocol="cli",
     pb=None,
     verbosity="error",
 ):
@@ -52,6 +57,7 @@ def run_module(
         module_class_name=module_class_name,
         module_source=module_source,
         module_binary=module_binary,
+        module_binary_protocol=module_binary_protocol,
         module_run_method=method,
         persistent=persistent,
         instantiated_modules=instantiated_modules,
@@ -63,11 +69,16 @@ def run_module(
     # ==================================================
     # integrate with "old" pb control flow: read out pb and create files in module data folder
     if pb is not None:
-        module.integrate_load(pb)
+        with module.integration("load"):
+            module.integrate_load(pb)
 
     # check that required modfiles are present
     getattr(module, "check_required_modfiles_exist")()
 
+    # binary modules can only read modfiles from disk
+    if module.is_binary:
+        modfile_store.flush()
+
     # check if method should be run, otherwise, cancel further execution
     # - note that module.integrate_load is always run, as this might provide information required
     #   by module.accept() to determine if the module should run or not.
@@ -75,28 +86,47 @@ def run_module(
     if accept(module_data_folder) is False:
         return None
 
+    # reuse the output of a previous run if the module is cacheable and its inputs did not change
+    cache = None
+    cache_hit = False
+    if method == "run":
+        cache = get_module_result_cache(module)
+    if cache is not None:
+        cache_key = cache.get_key(module)
+        cache_hit = cache.restore(module, cache_key)
+
     # run method
     if verbose_enough("info", verbosity):
         print(
             f'[ {"INFO":^5} ] module.controller.run_module() ::',
-            f"{module.module_name}.{method}()",
+            f"{module.module_name}.{method}()" + (" (cache hit)" if cache_hit else ""),
         )
     module_dot_method = getattr(module, method)
 
     # import time
     # start_time = time.perf_counter ()
 
-    result = module_dot_method()
+    result = None
+    if not cache_hit:
+        result = module_dot_method()
+        if cache is not None and result is None:
+            cache.save(module, cache_key)
+
+    # binary modules write modfiles to disk, which makes the objects in the store outdated
+    if module.is_binary:
+        for rel_path in module.provides_files():
+            modfile_store.discard(module.path(rel_path))
 
     # end_time = time.perf_counter ()
     # print(end_time - start_time, "seconds")
 
     # convert basic result to run_module_result() type to manage different module outputs in an organized fashion
-    result = run_module_result(module=module, output=result)
+    result = run_module_result(module=module, output=result, cache_hit=cache_hit)
 
     # integrate with "old" pb control flow: read out created files in module data folder and write to pb
     if pb is not None:
-        module.integrate_save(pb)
+        with module.integration("save"):
+            module.integrate_save(pb)
 
     # RUN POST-MODULES
     # ==================================================
@@ -112,6 +142,10 @@ def run_module(
     return result
 
 
+# meta modules are persistent and keep state over all module runs, so modules that run concurrently (see scheduler.py) take turns running them
+post_modules_lock = threading.Lock()
+
+
 def run_post_modules(
     meta_modules_post,
     module_obj,
@@ -123,12 +157,18 @@ def run_post_modules(
     if meta_modules_post is None:
         return None
 
+    with post_modules_lock:
+        _run_post_modules(meta_modules_post, module_obj, module_run_result, instantiated_modules, module_data_folder, verbosity)
+
+
+def _run_post_modules(meta_modules_post, module_obj, module_run_result, instantiated_modules, module_data_folder, verbosity):
     for listing in meta_modules_post:
         # instantiate module
         meta_module_obj = instantiate_module(
             module_class=listing["module"],
             module_name=listing["name"],
             module_binary=listing["binary"],
+            module_binary_protocol=listing["binary_protocol"],
             module_run_method=listing["method"],
             persistent=listing["persistent"],
             instantiated_modules=instantiated_modules,
@@ -163,6 +203,7 @@ def get_module(
     module_data_folder=None,
     module_source=None,
     module_binary=None,
+    module_binary_protocol="cli",
     module_run_method="run",
     persistent=None,
     instantiated_modules=None,
@@ -184,6 +225,7 @@ def get_module(
         module_class=module_class,
         module_name=module_name,
         module_binary=module_binary,
+        module_binary_protocol=module_binary_protocol,
         module_run_method=module_run_method,
         instantiated_modules=instantiated_modules,
         persistent=persistent,
@@ -223,6 +265,7 @@ def instantiate_module(
     module_run_method,
     instantiated_modules,
     module_data_folder,
+    module_binary_protocol="cli",
     persistent=None,
     verbosity="deprecation",
     level=0,
@@ -253,7 +296,7 @@ def instantiate_module(
     module_obj = module_class(module_data_folder=module_data_folder, module_name=module_name, persistent=persistent)
 
     if module_binary is not None:
-        module_obj.set_binary(module_binary, module_run_method)
+        module_obj.set_binary(module_binary, module_run_method, protocol=module_binary_protocol)
         module_obj.test_module_validity()
     else:
         module_obj.test_module_validity()
@@ -284,6 +327,9 @@ def load_module_itenary(module_data_folder):
         else:
             mod["binary"] = None
 
+        if "binary_protocol" not in mod.keys():
+            mod["binary_protocol"] = "cli"
+
         if "file" in mod.keys():
             mod["type"] = "external"
         else:
@@ -1,2 +1,3 @@
 from . import config
 from . import file
+from . import modfile_store
@@ -1,12 +1,13 @@
 import os
+import sys
 import json
 import yaml
-import inspect
 
 from pathlib import Path
-from datetime import datetime, date
+from datetime import datetime
 
 from ..lib import hash_wrap
+from .modfile_store import modfile_store, json_default
 
 """
 Read:
@@ -33,25 +34,39 @@ class File:
 
         self.suffix = Path(path).suffix
 
+        # json modfiles are kept in memory as objects, see modfile_store.py
+        self.json_object = None  # set by read() when the modfile is in the store
+        self.write_json_object = False  # set by to_json(), write() then stores self.json_object instead of writing self.contents
+
     def read(self, sneak=False):
         # check whether module reports reading this input (or has already written it)
-        if self.is_module_file and sneak is False and self.resource_rel_path not in self.module.requires_files() and self.resource_rel_path not in self.module.written_files.listing():
-            # excempted methods from requirement to report reading/writing
-            stack = inspect.stack()
-            if stack[1][3] not in ("integrate_save", "integrate_load"):
-                if len(stack) > 3 and stack[3][3] in ["write", "print"]:
-                    pass
-                else:
-                    if len(stack) > 3:
-                        print(stack[3][3])
-
-                    raise Exception(f"ModuleMisConfiguration: Module {self.module.module_name} reads from {self.resource_rel_path} but this is not reported in self.requires.")
+        # reads done by integrate_load/integrate_save are excempted from the requirement to report reading/writing (see ObsidianHtmlModule.integration())
+        if (
+            self.is_module_file
+            and sneak is False
+            and self.module.integrating is None
+            and self.resource_rel_path not in self.module.requires_files()
+            and self.resource_rel_path not in self.module.written_files.listing()
+        ):
+            caller = get_caller_name(depth=3)
+            if caller not in ["write", "print"]:
+                if caller is not None:
+                    print(caller)
+
+                raise Exception(f"ModuleMisConfiguration: Module {self.module.module_name} reads from {self.resource_rel_path} but this is not reported in self.requires.")
 
         # record reading the file
         # temporary: while integrate methods exist: don't report reads for the integrate save method
-        if sneak is False and inspect.stack()[1][3] not in ("integrate_save",):
+        if sneak is False and self.module.integrating != "save":
             self.module.read_files.add(self.resource_rel_path)
 
+        # get object from the store
+        self.json_object = None
+        if self.is_module_file and modfile_store.has(self.path):
+            self.json_object = modfile_store.get(self.path)
+            self.contents = ""
+            return self
+
         # Handle file not existing
         if not os.path.isfile(self.path):
             if not self.allow_absent:
@@ -70,12 +85,20 @@ class File:
         # check whether module reports writing this output
         if self.is_module_file and self.resource_rel_path not in self.module.provides_files():
             # temporary: while integrate methods exist: don't do checks for the integrate methods
-            if inspect.stack()[1][3] not in ("integrate_save", "integrate_load"):
+            if self.module.integrating is None:
                 raise Exception(f"ModuleMisConfiguration: Module {self.module.module_name} writes to {self.resource_rel_path} but this is not reported in self.provides.")
 
         # record writing to the file
         self.module.written_files.add(self.resource_rel_path)
 
+        # keep json output in memory, unless every version has to be written to disk
+        if self.write_json_object:
+            if self.is_module_file and not self.module.gc("keep_module_file_versions"):
+                modfile_store.put(self.path, self.json_object)
+                return
+            self.contents = json.dumps(self.json_object, indent=2, cls=to_json_encoder)
+        modfile_store.discard(self.path)
+
         # ensure folder exists
         Path(self.path).parent.mkdir(parents=True, exist_ok=True)
 
@@ -149,7 +172,7 @@ class File:
         return self
 
     def exists(self):
-        return os.path.isfile(self.path)
+        return modfile_store.has(self.path) or os.path.isfile(self.path)
 
     def summary(self, dependency_type):
         modfile_dependencies = self.module.modfile("modfile_dependencies.json").read(sneak=True).from_json().unwrap()
@@ -174,9 +197,16 @@ class File:
 
     # --- read contents
     def text(self):
+        if self.json_object is not None:
+            return json.dumps(self.json_object, indent=2, cls=to_json_encoder)
         return self.contents
 
     def from_json(self):
+        if self.json_object is not None:
+            obj = self.json_object
+            if isinstance(obj, dict):
+                return hash_wrap(obj)
+            return obj
         if self.contents == "" or self.contents is None:
             return None
         obj = json.loads(self.contents)
@@ -185,6 +215,8 @@ class File:
         return obj
 
     def from_yaml(self):
+        if self.json_object is not None:
+            return self.from_json()
         if self.contents == "" or self.contents is None:
             return None
         obj = yaml.safe_load(self.contents)
@@ -194,7 +226,9 @@ class File:
 
     # --- export contents
     def to_json(self):
-        self.contents = json.dumps(self._get_contents_for_export(), indent=2, cls=to_json_encoder)
+        # serialized by write() if needed
+        self.json_object = self._get_contents_for_export()
+        self.write_json_object = True
         return self
 
     def to_yaml(self):
@@ -207,10 +241,15 @@ class File:
         return self.contents
 
 
+def get_caller_name(depth):
+    """Returns the name of the function that is depth frames up from the caller of this function, or None if the stack is not that deep.
+    Only the code object of the frame is looked at, which is much cheaper than inspect.stack()."""
+    try:
+        return sys._getframe(depth + 1).f_code.co_name
+    except ValueError:
+        return None
+
+
 class to_json_encoder(json.JSONEncoder):
     def default(self, obj):
-        if isinstance(obj, Path):
-            return obj.as_posix()
-        if isinstance(obj, (date, datetime)):
-            return obj.isoformat()
-        return obj.__name__
+        return json_default(obj)
@@ -0,0 +1,138 @@
+"""
+Keeps json modfiles that are written by built-in modules in memory, so that the next module does not have to parse them again.
+
+Modfiles that are written with modfile(...).to_json().write() are stored here as python objects instead of being written to disk.
+Reading such a modfile returns a copy of the stored object, so a module can change what it read without affecting the next module.
+The stored objects are written to disk (as they would have been without this store) when:
+- a binary module is about to run, as it can only read the module data folder (see controller.run_module())
+- keep_module_file_versions is enabled, in which case nothing is kept in memory at all
+
+Code that reads modfiles without going through modfile(...).read() should use read_json() or get_text() in this file.
+"""
+
+import os
+import json
+import threading
+
+from pathlib import Path
+from datetime import date, datetime
+
+scalar_types = frozenset([str, int, float, bool, type(None)])
+
+
+class ModfileStore:
+    def __init__(self):
+        self.objects = {}  # abs path -> json compatible object
+        self.dirty = set()  # abs paths of objects that are not on disk yet
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_key(path):
+        return os.path.realpath(path)
+
+    def put(self, path, obj):
+        """Stores a copy of obj, converted the way json.dumps would, and removes the now outdated file from disk"""
+        key = self.get_key(path)
+        obj = to_json_compatible(obj)
+        if os.path.isfile(key):
+            os.remove(key)
+        with self.lock:
+            self.objects[key] = obj
+            self.dirty.add(key)
+
+    def has(self, path):
+        return self.get_key(path) in self.objects
+
+    def get(self, path):
+        """Returns a copy of the stored object"""
+        return copy_json_object(self.objects[self.get_key(path)])
+
+    def discard(self, path):
+        """Called when a modfile is written to disk, after which the stored object is outdated"""
+        key = self.get_key(path)
+        with self.lock:
+            self.objects.pop(key, None)
+            self.dirty.discard(key)
+
+    def get_text(self, path):
+        """Returns the contents of the modfile as they are (or would be) on disk, or None if the modfile does not exist"""
+        key = self.get_key(path)
+        if key in self.objects:
+            return serialize(self.objects[key])
+        if not os.path.isfile(key):
+            return None
+        with open(key, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def read_json(self, path):
+        """Returns the parsed contents of a json modfile, whether it is stored here or on disk"""
+        if self.has(path):
+            return self.get(path)
+        with open(path, "r", encoding="utf-8") as f:
+            return json.loads(f.read())
+
+    def flush(self):
+        """Writes all objects that are not on disk yet. The objects are kept, as they are still up-to-date."""
+        with self.lock:
+            keys = sorted(self.dirty)
+            self.dirty.clear()
+        for key in keys:
+            Path(key).parent.mkdir(parents=True, exist_ok=True)
+            with open(key, "w", encoding="utf-8") as f:
+                f.write(serialize(self.objects[key]))
+
+    def clear(self):
+        """Called when the module data folder is (re)created"""
+        with self.lock:
+            self.objects.clear()
+            self.dirty.clear()
+
+
+def serialize(obj):
+    return json.dumps(obj, indent=2)
+
+
+def to_json_compatible(obj):
+    """Returns a copy of obj with every value converted like json.dumps(obj, cls=to_json_encoder) would, so that reading from the store returns
+    the same as reading from disk would"""
+    obj_type = type(obj)
+    if obj_type in scalar_types:
+        return obj
+    if obj_type is dict:
+        return {(key if type(key) is str else json_key(key)): (value if type(value) in scalar_types else to_json_compatible(value)) for key, value in obj.items()}
+    if obj_type is list or obj_type is tuple:
+        return [(value if type(value) in scalar_types else to_json_compatible(value)) for value in obj]
+
+    # subclasses, and types that json does not know
+    if isinstance(obj, (str, bool, int, float)):
+        return obj
+    if isinstance(obj, dict):
+        return to_json_compatible(dict(obj))
+    if isinstance(obj, (list, tuple)):
+        return to_json_compatible(list(obj))
+    return to_json_compatible(json_default(obj))
+
+
+def json_key(key):
+    return next(iter(json.loads(json.dumps({key: None})).keys()))
+
+
+def json_default(obj):
+    """Used by handlers.file.to_json_encoder for values that json does not know"""
+    if isinstance(obj, Path):
+        return obj.as_posix()
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    return obj.__name__
+
+
+def copy_json_object(obj):
+    """Faster than copy.deepcopy() and json.loads(json.dumps()) for objects that only contain json types"""
+    if type(obj) is dict:
+        return {key: (value if type(value) in scalar_types else copy_json_object(value)) for key, value in obj.items()}
+    if type(obj) is list:
+        return [(value if type(value) in scalar_types else copy_json_object(value)) for value in obj]
+    return obj
+
+
+modfile_store = ModfileStore()
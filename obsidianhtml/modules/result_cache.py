@@ -0,0 +1,125 @@
+"""
+Caches the output of modules between runs, so that a module whose inputs did not change does not have to run again.
+
+Only modules that set cacheable = True are cached, and only when toggles/cache_module_results is enabled.
+The key of a module run is the hash of:
+- the module class and the obsidianhtml version
+- config.yml (without jobs and module_jobs) and the module config
+- the contents of every requires() modfile
+- module.cache_key_inputs(), for inputs that are not modfiles, such as the files that the module reads from the vault
+
+On a hit, the provides() modfiles of the previous run are restored and the run is skipped; integrate_save and the post-modules
+still run as normal. The contents of the modfiles are stored by their hash under module_cache/objects in the appdir, and every
+key gets a small json file under module_cache/entries that lists the object of each modfile.
+"""
+
+import os
+import json
+import yaml
+import hashlib
+
+from pathlib import Path
+
+from ..lib import OpenIncludedFile
+from .handlers.modfile_store import modfile_store
+
+
+def hash_bytes(contents):
+    return hashlib.sha1(contents).hexdigest()
+
+
+def get_file_signature(path):
+    """Used in cache_key_inputs() for files that a module reads: changes when the file is edited, added or removed"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return f"{path}: missing"
+    return f"{path}: {stat.st_mtime_ns} {stat.st_size}"
+
+
+def get_module_result_cache(module):
+    """Returns the cache to use for the module, or None if the module should just run"""
+    if not module.cacheable or len(module.alters_files()) > 0:
+        return None
+    if not module.gc("toggles/cache_module_results"):
+        return None
+    return ModuleResultCache(Path(module.paths()["appdir"]).joinpath("module_cache"))
+
+
+class ModuleResultCache:
+    def __init__(self, folder_path):
+        self.folder_path = Path(folder_path)
+        self.objects_folder_path = self.folder_path.joinpath("objects")
+        self.entries_folder_path = self.folder_path.joinpath("entries")
+
+    def get_key(self, module):
+        key = {
+            "module": f"{module.__class__.__module__}.{module.__class__.__qualname__}",
+            "version": OpenIncludedFile("version"),
+            "config": self.hash_modfile(module, "config.yml"),
+            "module_config": json.dumps(module.mod_config_as_dict(), sort_keys=True, default=str),
+            "requires": {rel_path: self.hash_modfile(module, rel_path) for rel_path in module.requires_files()},
+            "extra": module.cache_key_inputs(),
+        }
+        return hash_bytes(json.dumps(key, sort_keys=True).encode("utf-8"))
+
+    def hash_modfile(self, module, rel_path):
+        contents = modfile_store.get_text(module.path(rel_path))
+        if contents is None:
+            return None
+        if rel_path == "config.yml":
+            contents = self.get_config_text(contents)
+        return hash_bytes(contents.encode("utf-8"))
+
+    @staticmethod
+    def get_config_text(contents):
+        # the number of jobs does not change the output, so changing it should not invalidate the cache (see BuildManifest.get_config_hash)
+        config = yaml.safe_load(contents)
+        if not isinstance(config, dict):
+            return contents
+        config = {key: value for key, value in config.items() if key not in ("jobs", "module_jobs")}
+        return json.dumps(config, sort_keys=True, default=str)
+
+    def restore(self, module, key):
+        """Writes the provides() modfiles of the cached run, returns False if there is no (complete) cached run"""
+        entry_path = self.entries_folder_path.joinpath(f"{key}.json")
+        if not entry_path.exists():
+            return False
+
+        with open(entry_path, "r", encoding="utf-8") as f:
+            entry = json.loads(f.read())
+
+        objects = {}
+        for rel_path, object_hash in entry.items():
+            if object_hash is None:
+                continue
+            object_path = self.objects_folder_path.joinpath(object_hash)
+            if not object_path.exists():
+                return False
+            with open(object_path, "r", encoding="utf-8") as f:
+                objects[rel_path] = f.read()
+
+        for rel_path, contents in objects.items():
+            module.modfile(rel_path, contents).write()
+        return True
+
+    def save(self, module, key):
+        entry = {}
+        for rel_path in module.provides_files():
+            text = modfile_store.get_text(module.path(rel_path))
+            if text is None:
+                entry[rel_path] = None
+                continue
+
+            contents = text.encode("utf-8")
+            object_hash = hash_bytes(contents)
+            object_path = self.objects_folder_path.joinpath(object_hash)
+            if not object_path.exists():
+                self.objects_folder_path.mkdir(parents=True, exist_ok=True)
+                with open(object_path, "wb") as f:
+                    f.write(contents)
+            entry[rel_path] = object_hash
+
+        self.entries_folder_path.mkdir(parents=True, exist_ok=True)
+        with open(self.entries_folder_path.joinpath(f"{key}.json"), "w", encoding="utf-8") as f:
+            f.write(json.dumps(entry, indent=2))
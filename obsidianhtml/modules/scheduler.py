@@ -0,0 +1,196 @@
+"""
+Runs the modules of a phase (see module_list in the config) in an order that respects their modfile dependencies.
+
+A module has to wait for an earlier module in the list when:
+- it reads or writes a modfile that the earlier module writes, or
+- it writes a modfile that the earlier module reads.
+Modfiles in provides() and targets in alters() count as written, modfiles in requires() as read.
+Modules that declare nothing at all (such as the stop module) wait for all earlier modules, and all later modules wait for them.
+
+With module_jobs > 1, modules that don't have to wait for each other are run at the same time in a thread pool.
+The output that a module prints is held back until all modules before it in the list are done, so the log reads the same as
+when the modules run one by one. When the modules of a phase are done, log.schedule in the module data folder lists when
+each module ran, and in which wave.
+"""
+
+import sys
+import yaml
+import threading
+
+from datetime import datetime
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from ..lib import formatted_print
+from .lib import verbose_enough
+
+
+def get_module_jobs(module_data_folder, config):
+    """Returns the module_jobs config value, overwritten by --module-jobs <n> if passed in"""
+    with open(Path(module_data_folder).joinpath("arguments.yml"), "r") as f:
+        arguments = yaml.safe_load(f.read())
+
+    module_jobs = config.get("module_jobs", 1)
+    if "module-jobs" in arguments:
+        module_jobs = arguments["module-jobs"]
+
+    if not str(module_jobs).isdigit() or int(module_jobs) < 1:
+        formatted_print("ERROR", f"module_jobs should be a whole number of 1 or higher, got {module_jobs}")
+        exit(1)
+    return int(module_jobs)
+
+
+def get_module_declarations(module_listing):
+    """Returns the modfiles (and alters targets) that the module reads, and the ones that it writes"""
+    module_class = module_listing["module"]
+    kwargs = {}
+    if module_listing["binary"] is not None:
+        kwargs = {"binary_path": module_listing["binary"], "binary_protocol": module_listing["binary_protocol"]}
+
+    reads = set(module_class.requires(**kwargs))
+    writes = set(module_class.provides(**kwargs)) | set(module_class.alters(**kwargs))
+    return reads, writes
+
+
+def get_module_dependencies(module_listings):
+    """Returns for every module the indices of the earlier modules in the list that it has to wait for"""
+    declarations = [get_module_declarations(ml) for ml in module_listings]
+
+    dependencies = []
+    for j, (reads_j, writes_j) in enumerate(declarations):
+        deps = set()
+        for i in range(j):
+            reads_i, writes_i = declarations[i]
+            declares_nothing = len(reads_i | writes_i) == 0 or len(reads_j | writes_j) == 0
+            if declares_nothing or writes_i & (reads_j | writes_j) or reads_i & writes_j:
+                deps.add(i)
+        dependencies.append(deps)
+    return dependencies
+
+
+def get_waves(dependencies):
+    """Modules in the same wave don't depend on each other. Used for logging, the scheduler starts a module as soon as its dependencies are done."""
+    waves = []
+    for deps in dependencies:
+        waves.append(1 + max([waves[i] for i in deps], default=0))
+    return waves
+
+
+class ThreadBufferedStdout:
+    """Stands in for sys.stdout while modules run in threads. What a module thread prints is kept in its buffer, other threads print as normal."""
+
+    def __init__(self, stdout):
+        self.stdout = stdout
+        self.local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self.local, "buffer", None)
+        if buffer is None:
+            return self.stdout.write(text)
+        buffer.append(text)
+        return len(text)
+
+    def flush(self):
+        if getattr(self.local, "buffer", None) is None:
+            self.stdout.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stdout, name)
+
+
+class ModuleScheduler:
+    def __init__(self, run_module, module_data_folder, module_jobs=1, verbosity="info"):
+        self.run_module = run_module
+        self.module_data_folder = module_data_folder
+        self.module_jobs = module_jobs
+        self.verbosity = verbosity
+        self.trace = []
+
+    def run_phase(self, phase, module_listings):
+        if len(module_listings) == 0:
+            return
+
+        dependencies = get_module_dependencies(module_listings)
+        waves = get_waves(dependencies)
+
+        if self.module_jobs > 1 and verbose_enough("debug", self.verbosity):
+            for wave in sorted(set(waves)):
+                names = [ml["name"] for ml, w in zip(module_listings, waves) if w == wave]
+                formatted_print("DEBUG", f"module.scheduler :: {phase} wave {wave}: {', '.join(names)}")
+
+        try:
+            if self.module_jobs == 1:
+                for i, ml in enumerate(module_listings):
+                    self.run_traced(phase, ml, waves[i])
+            else:
+                self.run_concurrently(phase, module_listings, dependencies, waves)
+        finally:
+            self.write_trace()
+
+    def run_traced(self, phase, module_listing, wave):
+        self.trace.append((datetime.now().isoformat(), module_listing["name"], "started", f"{phase}, wave {wave}, {threading.current_thread().name}"))
+        self.run_module(module_listing)
+        self.trace.append((datetime.now().isoformat(), module_listing["name"], "finished", f"{phase}, wave {wave}, {threading.current_thread().name}"))
+
+    def run_concurrently(self, phase, module_listings, dependencies, waves):
+        stdout = ThreadBufferedStdout(sys.stdout)
+        outputs = {}
+
+        def run(i):
+            stdout.local.buffer = []
+            try:
+                self.run_traced(phase, module_listings[i], waves[i])
+            finally:
+                outputs[i] = "".join(stdout.local.buffer)
+                stdout.local.buffer = None
+
+        done = set()
+        printed = 0
+        running = {}
+        failed = None
+
+        sys.stdout = stdout
+        try:
+            with ThreadPoolExecutor(max_workers=self.module_jobs, thread_name_prefix="module") as executor:
+                while len(done) < len(module_listings) and failed is None:
+                    # start every module of which all dependencies are done, in list order
+                    for i in range(len(module_listings)):
+                        if i not in done and i not in running.values() and dependencies[i] <= done:
+                            running[executor.submit(run, i)] = i
+
+                    finished, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+                    for future in sorted(finished, key=lambda f: running[f]):
+                        i = running.pop(future)
+                        done.add(i)
+                        if future.exception() is not None and failed is None:
+                            failed = future.exception()
+
+                    # print output in list order
+                    while printed in done:
+                        stdout.stdout.write(outputs[printed])
+                        printed += 1
+
+                # let running modules finish before giving up
+                for future in running:
+                    done.add(running[future])
+                    future.exception()
+        finally:
+            sys.stdout = stdout.stdout
+
+        for i in sorted(done):
+            if i >= printed:
+                sys.stdout.write(outputs.get(i, ""))
+        sys.stdout.flush()
+
+        if failed is not None:
+            raise failed
+
+    def write_trace(self):
+        """Writes log.schedule, in the same format as log.resources"""
+        output = ["Module schedule:\n----------------", f"(module_jobs: {self.module_jobs})\n"]
+        for dt, module_name, action, details in sorted(self.trace):
+            output.append(f"[{dt}] {module_name:20} {action:10} {details}")
+        output.append("\n(log.schedule created by module scheduler)")
+
+        with open(Path(self.module_data_folder).joinpath("log.schedule"), "w", encoding="utf-8") as f:
+            f.write("\n".join(output))
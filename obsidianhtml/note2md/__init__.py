@@ -1,13 +1,20 @@
+import frontmatter
 import regex as re  # regex string finding/replacing
 import urllib.parse  # convert link characters like %
 
-from ..parser.HeaderTree import convert_markdown_to_header_tree
+from concurrent.futures import ProcessPoolExecutor
+
+from ..parser.HeaderTree import SectionIndex
+from ..modules.lib import verbose_enough
 
 
 # -- [3] Convert Obsidian type img links to proper md image links
 # Further conversion will be done in the block below
 def obs_img_to_md_img(pb, page):
-    for matched_link in re.findall("(?<=\!\[\[)(.*?)(?=\]\])", page):
+    included_file_suffixes = pb.gc("included_file_suffixes", cached=True)
+
+    def convert_link(match):
+        matched_link = match.group(1)
         link = ""
         if "|" in matched_link:
             parts = matched_link.split("|")
@@ -21,13 +28,13 @@ def obs_img_to_md_img(pb, page):
         # Skip if we don't match image suffixes. Inclusions are handled at the end.
         link = matched_link.split("|")[0]
         link_without_hashtag = link.split("#")[0]
-        if len(link.split(".")) == 1 or link_without_hashtag.split(".")[-1].lower() not in pb.gc("included_file_suffixes", cached=True):
+        if len(link.split(".")) == 1 or link_without_hashtag.split(".")[-1].lower() not in included_file_suffixes:
             new_link = f'<inclusion href="{link}" />'
 
-        safe_link = re.escape("![[" + matched_link + "]]")
-        page = re.sub(safe_link, new_link, page)
+        return new_link
 
-    return page
+    # all links are replaced in one pass
+    return re.sub(r"\!\[\[(.*?)\]\]", convert_link, page)
 
 
 def add_embedded_title(pb, page, note_metadata, note_name):
@@ -48,8 +55,7 @@ def add_embedded_title(pb, page, note_metadata, note_name):
     # hide if h1 is present
     hide = False
     if pb.gc("toggles/features/embedded_note_titles/hide_on_h1"):
-        header_dict, root_element = convert_markdown_to_header_tree(page)
-        if len(root_element["content"]) > 0 and isinstance(root_element["content"][0], dict) and root_element["content"][0]["level"] == 1:
+        if SectionIndex(page).starts_with_h1():
             hide = True
 
     # hideOnMetadataField
@@ -62,3 +68,170 @@ def add_embedded_title(pb, page, note_metadata, note_name):
         return f"# {title}\n" + page
 
     return page
+
+
+def convert_note_to_markdown(pb, fo):
+    """Converts the note to markdown. Returns the markdown, the metadata of the note, and the file objects of the notes it links to."""
+    # Create an object that handles a lot of the logic of parsing the page paths, content, etc
+    md = fo.load_markdown_page("note")
+
+    # The bulk of the conversion process happens here
+    md.ConvertObsidianPageToMarkdownPage()
+
+    # The frontmatter was stripped from the obsidian note prior to conversion
+    # Add yaml frontmatter back in
+    md.page = (frontmatter.dumps(frontmatter.Post("", **md.metadata))) + "\n" + md.page
+
+    return md.page, md.metadata, md.links
+
+
+def restore_note_metadata(pb, fo, metadata):
+    """Writes metadata that was not created in this process back to pb.metadata, as the markdown -> html flow reads it from there"""
+    og_key = fo.path["note"]["og_file_relative_path"].as_posix()
+    if og_key not in pb.metadata:
+        return metadata
+
+    pb.metadata[og_key].clear()
+    pb.metadata[og_key].update(metadata)
+    return pb.metadata[og_key]
+
+
+class InclusionCache:
+    """
+    Keeps the converted markdown of included notes (![[note]]) until the end of the build, so that a note that is included by many notes
+    is only converted again when one of the inputs that its output depends on is different:
+    - the included note
+    - the include depth, which limits how deep inclusions are followed
+    - the page depth of the includer, which is used to make the links to images relative
+    - the folder depth of the markdown path of the includer, which is used to make the links to notes relative
+    The config does not change during the note -> markdown conversion, so it is not part of the key.
+
+    The sections and blocks that are included from the converted note (![[note#header]], ![[note#^block]]) are kept per link,
+    and are taken from a SectionIndex of the converted note, which is made once.
+
+    The files that the included note links to are copied the first time it is converted. When toggles/incremental_build is enabled,
+    the lookups that the conversion did are kept as well, so that they can be added to the recording of every note that reuses it.
+    Worker processes (jobs > 1) start with an empty cache of their own.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.stats = {"hits": 0, "misses": 0}
+
+    def __getstate__(self):
+        # don't send the entries along to worker processes
+        state = self.__dict__.copy()
+        state["entries"] = {}
+        state["stats"] = {"hits": 0, "misses": 0}
+        return state
+
+    @staticmethod
+    def get_key(fo, include_depth, includer_page_depth, includer_fo):
+        includer_folder_depth = includer_fo.path["markdown"]["file_relative_path"].as_posix().count("/")
+        return (fo.path["note"]["file_absolute_path"].as_posix(), include_depth, includer_page_depth, includer_folder_depth)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+        else:
+            self.stats["hits"] += 1
+        return entry
+
+    def set(self, key, included_page, recording):
+        self.entries[key] = {"page": included_page.page, "recording": recording, "included_page": included_page, "section_index": None, "sections": {}}
+        return self.entries[key]
+
+    def print_stats(self, verbosity):
+        if verbose_enough("debug", verbosity):
+            print(f"\t> INCLUSION CACHE: {self.stats['hits']} hits, {self.stats['misses']} misses")
+
+
+ntm_worker_pb = None  # set by init_ntm_worker, only in worker processes
+
+
+def init_ntm_worker(pb):
+    global ntm_worker_pb
+    ntm_worker_pb = pb
+
+
+def convert_note_in_worker(key):
+    pb = ntm_worker_pb
+    fo = pb.index.files[key]
+
+    if pb.build_manifest is not None:
+        pb.build_manifest.start_recording()
+
+    page, metadata, links = convert_note_to_markdown(pb, fo)
+
+    # hand the recording over to the main process, which owns the manifest
+    recording = None
+    if pb.build_manifest is not None:
+        recording = pb.build_manifest.recording
+        pb.build_manifest.recording = None
+
+    # file objects are copies in this process, so send back their keys
+    link_keys = [pb.index.get_file_key(x) for x in links]
+
+    return page, metadata, link_keys, recording
+
+
+class NoteConversionQueue:
+    """
+    Converts lists of notes to markdown.
+    With jobs == 1 the notes are converted one after the other. With jobs > 1 they are converted by a pool of worker processes,
+    which each get a copy of pb. The results are returned in the order of the given notes, regardless of which worker finishes first.
+    """
+
+    def __init__(self, pb, jobs=1):
+        self.pb = pb
+        self.executor = None
+
+        if jobs > 1:
+            self.executor = ProcessPoolExecutor(max_workers=jobs, initializer=init_ntm_worker, initargs=(pb,))
+
+    def convert(self, fos):
+        """Returns (markdown, metadata, links) for every given note"""
+        manifest = self.pb.build_manifest
+        results = [None] * len(fos)
+        pending = []
+
+        for i, fo in enumerate(fos):
+            # Reuse the output of the previous run when nothing that the note depends on has changed
+            if manifest is not None:
+                entry = manifest.get_reusable_entry(fo)
+                if entry is not None:
+                    results[i] = manifest.reuse_entry(fo, entry)
+                    continue
+
+            if self.executor is not None:
+                pending.append((i, fo, self.executor.submit(convert_note_in_worker, self.pb.index.get_file_key(fo))))
+                continue
+
+            if manifest is not None:
+                manifest.start_recording()
+            results[i] = convert_note_to_markdown(self.pb, fo)
+            if manifest is not None:
+                manifest.stop_recording(fo, *results[i])
+
+        for i, fo, future in pending:
+            try:
+                page, metadata, link_keys, recording = future.result()
+            except Exception:
+                self.pb.init_state(action="n2m", loop_type="note", current_fo=fo, subroutine="convert_note_to_markdown")
+                raise
+
+            metadata = restore_note_metadata(self.pb, fo, metadata)
+            links = [self.pb.index.files[key] for key in link_keys]
+
+            if manifest is not None:
+                manifest.recording = recording
+                manifest.stop_recording(fo, page, metadata, links)
+            results[i] = (page, metadata, links)
+
+        return results
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
@@ -11,6 +11,9 @@ from ..lib import slugify
 #   header_id = slugify("My Header Name")
 #   header_dict, root_element = convert_markdown_to_header_tree(markdown_content_as_string)
 #   print(PrintHeaderTree(header_dict[header_id]))
+#
+# To get several sections of the same page, index the page once instead:
+#   section = SectionIndex(markdown_content_as_string).get_section("My Header Name")
 
 
 def _newElement():
@@ -143,40 +146,201 @@ def get_referenced_block(reference, contents, rel_path_str):
     for the block that is tagged with reference `reference`,  https://help.obsidian.md/Linking+notes+and+files/Internal+links#Link+to+a+block+in+a+note
     and return only the content of that block.
     """
-    chunks = []
-    current_chunk = ""
-    last_line = ""
-    for line in contents.split("\n"):
-        if line.strip() == "":
-            # return chunk if reference is found
-            if reference == last_line.strip().rsplit(" ", maxsplit=1)[-1]:  # reference always has to be seperated by at least 1 space and end with a newline and be on the last line of a paragraph
-                clean_chunk = re.sub(r"(?<=\s|^)(\^\S*?)(?=$|\n)", "", current_chunk.strip())  # we want to get a non-empty chunk, the reference itself does not count as "non-empty", so remove this
-                if clean_chunk == "":
-                    clean_chunk = re.sub(r"(?<=\s|^)(\^\S*?)(?=$|\n)", "", chunks[-1].strip())  # current chunk is empty, get last non-empty one and remove the reference from the end
-                return clean_chunk
-
-            # add current_chunk to chunk list as long as it is not empty
-            if current_chunk.strip() != "":
-                chunks.append(current_chunk)
-
-            # start a new chunk
-            current_chunk = ""
-            last_line = ""
+    return SectionIndex(contents).get_block(reference, rel_path_str)
+
+
+def parse_header_line(line):
+    """Returns (level, title) when a line that starts with # makes a header, otherwise None (the line is then left out of the header tree)"""
+    i = line.find(" ")
+    if i == -1:
+        return None
+    return line.count("#", 0, i), line[i + 1 :]
+
+
+block_reference_pattern = re.compile(r"(?<=\s|^)(\^\S*?)(?=$|\n)")
+
+
+def remove_block_reference(chunk):
+    return block_reference_pattern.sub("", chunk.strip())
+
+
+class SectionIndex:
+    """Index of the headers and block references of a markdown page, so that a section or block of the page can be included by slicing,
+    instead of building the header tree (or going through all the blocks) again for every inclusion.
+
+    self.text is the page as PrintHeaderTree prints the root of its header tree: without the lines that start with # but don't make a header,
+    without the empty lines directly under a header (or at the start of the page), and with the headers written as "<level * #> <title>".
+    A header spans from its own line up until the next header of the same or a higher level, which is the part that its subtree prints.
+    Both indexes are made the first time they are needed.
+    """
+
+    def __init__(self, code):
+        self.code = code
+        self._text = None
+        self._headers = None  # [md_title, level, start, end, end_index], with start and end offsets in self.text, in the order of the page
+        self._blocks = None  # reference -> (chunk, previous non-empty chunk), for the first block that ends with the reference
+
+    @property
+    def text(self):
+        if self._text is None:
+            self.index_headers()
+        return self._text
+
+    @property
+    def headers(self):
+        if self._headers is None:
+            self.index_headers()
+        return self._headers
+
+    def index_headers(self):
+        lines = []
+        headers = []
+        md_titles = set()
+        open_headers = []
+        content_is_empty = True
+
+        for line in self.code.split("\n"):
+            if len(line) < 2 or line[0] != "#":
+                if content_is_empty and len(line.strip()) == 0:
+                    continue
+                lines.append(line)
+                content_is_empty = False
+                continue
+
+            header = parse_header_line(line)
+            if header is None:
+                continue
+            level, title = header
+
+            # same as convert_markdown_to_header_tree
+            md_title = slugify(title)
+            if md_title in md_titles:
+                i = 1
+                while (md_title + "_" + str(i)) in md_titles:
+                    i += 1
+                md_title = md_title + "_" + str(i)
+            md_titles.add(md_title)
+
+            # close the headers that this header ends, their end line is kept in place of the end offset until all lines are known
+            while len(open_headers) > 0 and open_headers[-1][1] >= level:
+                closed = open_headers.pop()
+                closed[3] = len(lines)
+                closed[4] = len(headers)
+
+            header = [md_title, level, len(lines), None, None]
+            headers.append(header)
+            open_headers.append(header)
+
+            lines.append(level * "#" + " " + title)
+            content_is_empty = True
+
+        for header in open_headers:
+            header[3] = len(lines)
+            header[4] = len(headers)
+
+        offsets = []
+        offset = 0
+        for line in lines:
+            offsets.append(offset)
+            offset += len(line) + 1
+
+        self._text = "\n".join(lines)
+        for header in headers:
+            header[2] = offsets[header[2]]
+            header[3] = offsets[header[3]] - 1 if header[3] < len(lines) else len(self._text)
+        self._headers = headers
+
+    def find_header(self, scope, md_title):
+        """Returns the index of the first header in the scope (a header index, or None for the whole page) that has the md_title.
+        The scope itself comes first, as in GetSubHeaderTree. The whole page has the md_title ''."""
+        if scope is None:
+            if md_title == "":
+                return scope
+            start, end = 0, len(self.headers)
         else:
-            # add on to current chunk
-            current_chunk += line
-            last_line = line
-
-    # When the referenced block ends on the last line, this block will be reached
-    if reference == last_line.strip().split(" ")[-1]:
-        clean_chunk = re.sub(r"(?<=\s|^)(\^\S*?)(?=$|\n)", "", current_chunk.strip())
-        if clean_chunk == "":
-            clean_chunk = re.sub(r"(?<=\s|^)(\^\S*?)(?=$|\n)", "", chunks[-1].strip())
+            start, end = scope, self.headers[scope][4]
+
+        for i in range(start, end):
+            if self.headers[i][0] == md_title:
+                return i
+        return False
+
+    def get_section(self, header_selector):
+        """Returns the section that the header_selector (e.g. section1#h3) points to, as PrintHeaderTree(GetSubHeaderTree(...)) would,
+        or None when it is not found"""
+        scope = None
+        while True:
+            if header_selector.count("#") == 0:
+                header_element = header_selector
+                header_selector = ""
+            else:
+                header_element, header_selector = header_selector.split("#", 1)
+
+            md_title = slugify(header_element)
+            scope = self.find_header(scope, md_title)
+            if scope is False:
+                print(f"ERROR: header with title {md_title} was not found")
+                return None
+
+            if header_selector == "":
+                break
+
+        if scope is None:
+            return self.text
+        return self.text[self.headers[scope][2] : self.headers[scope][3]]
+
+    def starts_with_h1(self):
+        """True when the first line of the page that is not empty is a h1 header"""
+        return len(self.headers) > 0 and self.headers[0][2] == 0 and self.headers[0][1] == 1
+
+    def index_blocks(self):
+        blocks = {}
+        chunks = []
+        current_chunk = ""
+        last_line = ""
+
+        for line in self.code.split("\n"):
+            if line.strip() == "":
+                # reference always has to be seperated by at least 1 space and end with a newline and be on the last line of a paragraph
+                reference = last_line.strip().rsplit(" ", maxsplit=1)[-1]
+                if reference not in blocks:
+                    blocks[reference] = (current_chunk, chunks[-1] if len(chunks) > 0 else None)
+
+                # add current_chunk to chunk list as long as it is not empty
+                if current_chunk.strip() != "":
+                    chunks.append(current_chunk)
+
+                # start a new chunk
+                current_chunk = ""
+                last_line = ""
+            else:
+                # add on to current chunk (the lines are joined without newlines)
+                current_chunk += line
+                last_line = line
+
+        # the referenced block can end on the last line
+        reference = last_line.strip().split(" ")[-1]
+        if reference not in blocks:
+            blocks[reference] = (current_chunk, chunks[-1] if len(chunks) > 0 else None)
+
+        self._blocks = blocks
+
+    def get_block(self, reference, rel_path_str):
+        """Returns the block that is tagged with the reference, without the reference"""
+        if self._blocks is None:
+            self.index_blocks()
+
+        if reference not in self._blocks:
+            return f"Unable to find section #{reference} in {rel_path_str}"
+
+        # we want to get a non-empty chunk, the reference itself does not count as "non-empty", so remove this
+        chunk, previous_chunk = self._blocks[reference]
+        clean_chunk = remove_block_reference(chunk)
+        if clean_chunk == "" and previous_chunk is not None:
+            # current chunk is empty, get last non-empty one and remove the reference from the end
+            clean_chunk = remove_block_reference(previous_chunk)
         return clean_chunk
 
-    # No reference found
-    return f"Unable to find section #{reference} in {rel_path_str}"
-
 
 # def FindHeaderTreeKey(key_list, key):
 #     # this code will find a key in the key list that is the same as the provided key
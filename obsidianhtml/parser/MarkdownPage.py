@@ -8,7 +8,8 @@ from ..lib import slugify, MalformedTags, OpenIncludedFile, bisect, strip_frontm
 from .. import note2md
 from ..core import FileObject
 
-from .HeaderTree import PrintHeaderTree, convert_markdown_to_header_tree, get_referenced_block, GetSubHeaderTree
+from .HeaderTree import SectionIndex
+from .PageRewriter import PageRewriter, insert_bare_links
 
 
 class MarkdownPage:
@@ -41,8 +42,11 @@ class MarkdownPage:
         self.codelines = []
 
         # Load contents of entrypoint and strip frontmatter yaml.
-        with open(self.src_path, encoding="utf-8") as f:
-            self.page = strip_frontmatter(f.read())
+        if self.pb.document_cache is not None:
+            self.page = self.pb.document_cache.get(self.src_path).body
+        else:
+            with open(self.src_path, encoding="utf-8") as f:
+                self.page = strip_frontmatter(f.read())
 
         key = fo.path[input_type]["og_file_relative_path"].as_posix()
         if key not in self.pb.metadata:
@@ -269,7 +273,10 @@ class MarkdownPage:
         # Further conversion will be done in the block below
         self.page = note2md.obs_img_to_md_img(self.pb, self.page)
 
-        for tag in re.findall(r'<img src=".*?/>', self.page):
+        rewriter = PageRewriter(self.page)
+        for match in re.finditer(r'<img src=".*?/>', self.page):
+            tag = match.group(0)
+
             # get template and link from tag
             # e.g. <img src="200w.gif"  width="200"> --> <img src="{link}"  width="200"> & 200w.gif
             parts = tag.split('src="')
@@ -306,12 +313,13 @@ class MarkdownPage:
             relative_path = relative_path.as_posix()
             relative_path = ("../" * page_folder_depth) + relative_path
             new_link = template.replace("{link}", urllib.parse.quote(relative_path))
-
-            safe_link = re.escape(tag)
-            self.page = re.sub(safe_link, new_link, self.page)
+            rewriter.replace(match.start(), match.end(), new_link)
+        self.page = rewriter.result()
 
         # -- [4] Handle local image/video/audio links (copy them over to output)
-        for tag, link in re.findall("(?<=\!\[(.*?)\]\()(.*?)(?=\))", self.page):
+        rewriter = PageRewriter(self.page)
+        for match in re.finditer("(?<=\!\[(.*?)\]\()(.*?)(?=\))", self.page):
+            tag, link = match.groups()
             unq_link = urllib.parse.unquote(link)
 
             # clean_link_name = urllib.parse.unquote(link).split('/')[-1].split('|')[0]
@@ -367,13 +375,16 @@ class MarkdownPage:
                 else:
                     new_link = f'<img src="{urllib.parse.quote(relative_path)}" width="{width}" alt="{alt}" title="{alt}" />'
 
-            safe_link = re.escape(f"![{tag}](" + link + ")")
-            self.page = re.sub(safe_link, new_link, self.page)
+            # replace ![tag](link)
+            rewriter.replace(match.start(1) - 2, match.end(2) + 1, new_link)
+        self.page = rewriter.result()
 
         # -- [5] Change file name in proper markdown links to path
         # And while we are busy, change the path to point to the full relative path
-        proper_links = re.findall(r"(?<=\]\()[^\s\]]+(?=\))", self.page)
-        for matched_link in proper_links:
+        rewriter = PageRewriter(self.page)
+        for match in re.finditer(r"(?<=\]\()[^\s\]]+(?=\))", self.page):
+            matched_link = match.group(0)
+
             # There is currently no way to match links containing parentheses, AND not matching the last ) in a link like ([test](link))
             if matched_link.endswith(")"):
                 matched_link = matched_link[:-1]
@@ -399,17 +410,21 @@ class MarkdownPage:
 
                 # Update link
                 new_link = "](" + urllib.parse.quote(file_link) + ")"
-                safe_link = re.escape("](" + matched_link + ")")
-                self.page = re.sub(f"(?<![\[\(])({safe_link})", new_link, self.page)
+                start = match.start() - 2
+                if start == 0 or self.page[start - 1] not in "[(":
+                    rewriter.replace(start, match.start() + len(matched_link) + 1, new_link)
 
                 if isMd is False:
                     # Copy file over to new location
                     lo.copy_file("ntm")
+        self.page = rewriter.result()
 
         # -- [6] Replace Obsidian links with proper markdown
         # This is any string in between [[ and ]], e.g. [[My Note]]
-        md_links = re.findall("(?<=\[\[).+?(?=\])", self.page)
-        for matched_link in md_links:
+        rewriter = PageRewriter(self.page)
+        for match in re.finditer("(?<=\[\[).+?(?=\])", self.page):
+            matched_link = match.group(0)
+
             rest, alias = bisect(matched_link, "|")
             simple_path, hashpart = bisect(rest, "#", squash_tail=True)  # hashpart can have more than 1 #!
             filename = simple_path.split("/")[-1]
@@ -452,7 +467,9 @@ class MarkdownPage:
                     alias = hashpart
 
             # Replace Obsidian link with proper markdown link
-            self.page = self.page.replace("[[" + matched_link + "]]", f"[{alias}]({newlink})")
+            if self.page[match.end() : match.end() + 2] == "]]":
+                rewriter.replace(match.start() - 2, match.end() + 2, f"[{alias}]({newlink})")
+        self.page = rewriter.result()
 
         # -- [7] Fix newline issue by adding three spaces before any newline
         if not self.pb.gc("toggles/strict_line_breaks"):
@@ -466,33 +483,33 @@ class MarkdownPage:
         # sort from longest to shortest to avoid links with the same base being partly overwritten
         matched_links.sort(reverse=True, key=lambda e: len(e))
 
-        for matched_link in matched_links:
-            new_md_link = f"[{matched_link}]({matched_link})"
-            safe_link = re.escape(matched_link)
-            self.page = re.sub(f"(?<![\[\(])({safe_link})", new_md_link, self.page)
+        if len(matched_links) > 0:
+            self.page = insert_bare_links(self.page, matched_links)
 
         # --- strip svg, we don't want to find "tags" in there
         self.strip_svgs()
 
         # -- [9] Remove inline tags, like #ThisIsATag
         # Inline tags are # connected to text (so no whitespace nor another #)
-        for matched_link in get_inline_tags(self.page):
-            tag = matched_link.replace(".", "")
-            new_md_str = f"**{tag}**"
-
-            if self.pb.gc("toggles/preserve_inline_tags", cached=True):
-                new_md_str = "`{_obsidian_pattern_tag_" + tag + "}`"
-
+        replacements = {}
+        for tag in get_inline_tags(self.page):
             self.add_tag(tag)
 
-            safe_str = "#" + re.escape(matched_link) + r"(?=[^\p{L}\p{N}/\-\p{Emoji_Presentation}]|$)"  # avoid head replacement error
-            self.page = re.sub(safe_str, new_md_str, self.page)
+            if tag not in replacements:
+                replacements[tag] = f"**{tag}**"
+                if self.pb.gc("toggles/preserve_inline_tags", cached=True):
+                    replacements[tag] = "`{_obsidian_pattern_tag_" + tag + "}`"
+
+        if len(replacements) > 0:
+            self.page = replace_inline_tags(self.page, replacements)
 
         # --- restore svg, we don't want to find "tags" in there
         self.restore_svgs()
 
         # -- [10] Add code inclusions
-        for matched_link in re.findall(r'(\<inclusion href="[^"]*" />)', self.page, re.MULTILINE):
+        rewriter = PageRewriter(self.page)
+        for match in re.finditer(r'(\<inclusion href="[^"]*" />)', self.page, re.MULTILINE):
+            matched_link = match.group(0)
             link = matched_link.replace('<inclusion href="', "").replace('" />', "")
 
             result = self.pb.FileFinder.GetObsidianFilePath(link, self.pb)
@@ -500,64 +517,118 @@ class MarkdownPage:
             header = result["header"]
 
             if file_object is False:
-                self.page = self.page.replace(matched_link, f"> **obsidian-html error:** Could not find page {link}.")
+                rewriter.replace(match.start(), match.end(), f"> **obsidian-html error:** Could not find page {link}.")
                 continue
 
             self.links.append(file_object)
             link_path = file_object.get_link("markdown", origin=origin)
 
             if include_depth > 3:
-                self.page = self.page.replace(matched_link, f"[{link}]({link_path}).")
+                rewriter.replace(match.start(), match.end(), f"[{link}]({link_path}).")
                 continue
 
             if not file_object.is_valid_note("note"):
                 # make download button
                 file_object.copy_file("ntm")
-                self.page = self.page.replace(matched_link, f"[{link_path}]({urllib.parse.quote(link)}|_obsidian_html_download_button_)")
+                rewriter.replace(match.start(), match.end(), f"[{link_path}]({urllib.parse.quote(link)}|_obsidian_html_download_button_)")
                 continue
 
             # Get code
-            # included_page = MarkdownPage(self.pb, file_object, 'note', self.file_tree)
-            included_page = file_object.load_markdown_page("note")
-            included_page.ConvertObsidianPageToMarkdownPage(origin=self.fo, include_depth=include_depth + 1, includer_page_depth=page_folder_depth, remove_block_references=False)
-
-            # Get subsection of code if header is present
-            if header != "":
-                # Prepare document
-                included_page.StripCodeSections()
-
-                # option: Referencing block
-                if header[0] == "^":
-                    included_page.page = get_referenced_block(header, included_page.page, included_page.rel_src_path.as_posix())
-
-                # option: Referencing header
-                else:
-                    header_dict, root_element = convert_markdown_to_header_tree(included_page.page)
-                    header_tree = GetSubHeaderTree(root_element, header)
-                    if header_tree is False:
-                        included_page.page = f"Obsidianhtml: Error: Unable to find section #{header} in {link.split('#')[0]}"
-                    else:
-                        included_page.page = PrintHeaderTree(header_tree)
+            if self.pb.build_manifest is not None:
+                self.pb.build_manifest.record_inclusion(file_object)
+            included_md = self.get_included_markdown(file_object, link, header, include_depth, page_folder_depth)
 
-                # Wrap up
-                included_page.RestoreCodeSections()
-
-            included_page.page = f"\n{included_page.page}\n"
+            included_md = f"\n{included_md}\n"
 
             if self.pb.gc("toggles/wrap_inclusions", cached=True):
-                included_page.page = f'\n<div class="inclusion" markdown="1">\n{included_page.page}\n</div>\n'
+                included_md = f'\n<div class="inclusion" markdown="1">\n{included_md}\n</div>\n'
 
-            self.page = self.page.replace(matched_link, included_page.page)
+            rewriter.replace(match.start(), match.end(), included_md)
 
             # [425] Add included references as links in graph view
             # add link to frontmatter yaml so that we can add it to the graphview
             if self.pb.gc("toggles/features/graph/show_inclusions_in_graph"):
                 self.AddInclusionLink(result["rtr_path_str"])
+        self.page = rewriter.result()
+
         # -- [1] Restore codeblocks/-lines
         self.RestoreCodeSections()
 
         return self
 
+    def get_included_markdown(self, file_object, link, header, include_depth, page_folder_depth):
+        """Returns the converted markdown of the included note, or of the header/block that the link points to.
+        The note is converted once for all the inclusions with the same inputs, see note2md.InclusionCache."""
+        manifest = self.pb.build_manifest
+        key = self.pb.inclusion_cache.get_key(file_object, include_depth, page_folder_depth, self.fo)
+
+        entry = self.pb.inclusion_cache.get(key)
+        if entry is None:
+            outer_recording = None
+            if manifest is not None:
+                outer_recording = manifest.start_inclusion_recording()
+
+            included_page = file_object.load_markdown_page("note")
+            included_page.ConvertObsidianPageToMarkdownPage(origin=self.fo, include_depth=include_depth + 1, includer_page_depth=page_folder_depth, remove_block_references=False)
+
+            recording = None
+            if manifest is not None:
+                recording = manifest.stop_inclusion_recording(outer_recording)
+
+            entry = self.pb.inclusion_cache.set(key, included_page, recording)
+        elif manifest is not None:
+            manifest.merge_recording(entry["recording"])
+
+        if header == "":
+            return entry["page"]
+
+        # the link is part of the error message when the section is not found
+        if link not in entry["sections"]:
+            entry["sections"][link] = self.get_included_section(entry, link, header)
+        return entry["sections"][link]
+
+    def get_included_section(self, entry, link, header):
+        """Returns the header/block of the converted note that the link points to"""
+        included_page = entry["included_page"]
+
+        # Prepare document, it is indexed once for all the sections that are included from it
+        if entry["section_index"] is None:
+            included_page.page = entry["page"]
+            included_page.StripCodeSections()
+            entry["section_index"] = SectionIndex(included_page.page)
+        section_index = entry["section_index"]
+
+        # option: Referencing block
+        if header[0] == "^":
+            included_page.page = section_index.get_block(header, included_page.rel_src_path.as_posix())
+
+        # option: Referencing header
+        else:
+            included_page.page = section_index.get_section(header)
+            if included_page.page is None:
+                included_page.page = f"Obsidianhtml: Error: Unable to find section #{header} in {link.split('#')[0]}"
+
+        # Wrap up
+        included_page.RestoreCodeSections()
+        return included_page.page
+
+
+def replace_inline_tags(page, replacements):
+    """Replaces #tag with replacements[tag] for all the tags in replacements, in one pass.
+    A tag is also replaced when it is followed by an underscore (e.g. #tag_suffix), and when more than one tag matches
+    at the same position (#tag_a_b for the tags tag and tag_a), the tag that comes first in replacements is used."""
+    order = {tag: i for i, tag in enumerate(replacements.keys())}
+
+    rewriter = PageRewriter(page)
+    for match in re.finditer(r"#([\p{L}\p{N}/\-\p{Emoji_Presentation}_]+)", page):
+        word = match.group(1)
+        candidates = [word[:i] for i, char in enumerate(word) if char == "_"] + [word]
+        candidates = [x for x in candidates if x in order]
+        if len(candidates) > 0:
+            tag = min(candidates, key=order.get)
+            rewriter.replace(match.start(), match.start() + len(tag) + 1, replacements[tag])
+    return rewriter.result()
+
 
 def get_inline_tags(page):
     tags = [x[1:].replace(".", "") for x in re.findall(r"(?<!\S)#[\p{L}\p{N}/\-\p{Emoji_Presentation}]*[\p{L}\-_/\p{Emoji_Presentation}][\p{L}\p{N}/\-\p{Emoji_Presentation}]*", page)]
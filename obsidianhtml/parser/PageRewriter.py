@@ -0,0 +1,52 @@
+import regex as re  # regex string finding/replacing
+
+
+class PageRewriter:
+    """Builds a new version of a page in one pass, by replacing spans of it from left to right.
+
+    Replacing a link with re.sub() or str.replace() scans (and copies) the whole page for every link. Instead, the links are found
+    with re.finditer(), and every link that should be rewritten is passed to replace(), after which result() joins the unchanged text
+    and the replacements together once. The replacement text is inserted as is (it is no re.sub() template).
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.parts = []
+        self.position = 0  # end of the last replaced span
+
+    def replace(self, start, end, text):
+        """Replaces page[start:end] with text. Spans must be passed from left to right.
+        Returns False, and replaces nothing, when the span overlaps with a span that was already replaced."""
+        if start < self.position:
+            return False
+        self.parts.append(self.page[self.position : start])
+        self.parts.append(text)
+        self.position = end
+        return True
+
+    def result(self):
+        if self.position == 0 and len(self.parts) == 0:
+            return self.page
+        return "".join(self.parts) + self.page[self.position :]
+
+
+def insert_bare_links(page, matched_links):
+    """Replaces the bare links in the page with [link](link), in one pass.
+    A link is replaced wherever it is not preceded by [ or (. When more than one link matches at the same position,
+    the one that comes first in matched_links is used."""
+    order = {}
+    for link in matched_links:
+        order.setdefault(link, len(order))
+    lengths = set(len(x) for x in order)
+
+    rewriter = PageRewriter(page)
+    for match in re.finditer(r"https*:\/\/", page):
+        start = match.start()
+        if start > 0 and page[start - 1] in "[(":
+            continue
+        candidates = [page[start : start + length] for length in lengths]
+        candidates = [x for x in candidates if x in order]
+        if len(candidates) > 0:
+            link = min(candidates, key=order.get)
+            rewriter.replace(start, start + len(link), f"[{link}]({link})")
+    return rewriter.result()
@@ -63,6 +63,9 @@ async function LoadSearchData(){
     }
 
     // try using cached data
+    // gzip_hash is the hash of the search data (lib.simpleHash), and changes whenever the search data changes.
+    // note: builds before simpleHash used blake2b wrote another hash for the same data, so after upgrading, the search_hash
+    // in localStorage does not match once, and the search data is loaded from file (and cached again) one time.
     let search_hash = ls_get('search_hash');
     if (gzip_hash == search_hash)
     {